@@ -1,7 +1,120 @@
 from django.contrib import admin
-from .models import Post, Comment, Reaction
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.contenttypes.prefetch import GenericPrefetch
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from .deletion import delete_comments, delete_posts
+from .models import Post, Comment, Reaction, REACTION_MODELS
 
 # Registra tus modelos para que aparezcan en el panel de administración
-admin.site.register(Post)
-admin.site.register(Comment)
-admin.site.register(Reaction)
+
+# Filas que el admin cuenta como mucho; por encima se muestra una estimación o este tope
+EXACT_COUNT_LIMIT = 10000
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginador para tablas grandes: el COUNT(*) exacto recorre la tabla entera en cada página.
+    - Listado sin filtros en PostgreSQL: la estimación de pg_class.reltuples (la mantiene autovacuum).
+    - En otro caso se cuentan EXACT_COUNT_LIMIT filas como mucho; más allá el número de páginas
+      queda acotado y hay que filtrar para llegar a las filas más antiguas.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.has_filters() and connections[queryset.db].vendor == 'postgresql':
+            estimate = self._estimate(queryset)
+            if estimate > EXACT_COUNT_LIMIT:
+                return estimate
+        return queryset[:EXACT_COUNT_LIMIT].count()
+
+    def _estimate(self, queryset):
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [queryset.model._meta.db_table])
+            row = cursor.fetchone()
+        # -1 si la tabla aún no se ha analizado
+        return row[0] if row else -1
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    # Sin el segundo COUNT(*) sobre la tabla entera al filtrar o buscar
+    show_full_result_count = False
+
+
+class ReactionTargetFilter(admin.SimpleListFilter):
+    """Tipo de objeto reaccionado; filtra por content_type, el prefijo del índice (content_type, object_id)."""
+    title = 'tipo de objeto'
+    parameter_name = 'target'
+
+    def lookups(self, request, model_admin):
+        return [(name, model._meta.verbose_name) for name, model in REACTION_MODELS.items()]
+
+    def queryset(self, request, queryset):
+        model = REACTION_MODELS.get(self.value())
+        if model is None:
+            return queryset
+        return queryset.filter(content_type=ContentType.objects.get_for_model(model))
+
+
+@admin.register(Post)
+class PostAdmin(LargeTableAdmin):
+    list_display = ['title', 'author', 'created_at', 'likes_count', 'dislikes_count']
+    list_select_related = ['author']
+    # Rangos de fechas sobre el índice (-created_at, -id). No se usa date_hierarchy: su primer nivel
+    # hace un DISTINCT de los años sobre todas las filas en cada visita
+    list_filter = [('created_at', admin.DateFieldListFilter)]
+    ordering = ['-created_at', '-id']
+    search_fields = ['title']  # Necesario para el autocompletado desde los comentarios
+    autocomplete_fields = ['author']
+
+    def get_queryset(self, request):
+        # El listado no muestra el cuerpo: no se lee
+        return super().get_queryset(request).defer('content')
+
+    # Borrado por conjuntos, también desde la acción "eliminar seleccionados" (ver blog/deletion.py)
+    def delete_model(self, request, obj):
+        delete_posts([obj.pk])
+
+    def delete_queryset(self, request, queryset):
+        delete_posts(queryset.values('pk'))
+
+
+@admin.register(Comment)
+class CommentAdmin(LargeTableAdmin):
+    list_display = ['__str__', 'created_at', 'likes_count', 'dislikes_count']
+    # Comment.__str__ usa el autor y el título del post: se cargan en la misma consulta
+    list_select_related = ['author', 'post']
+    # Filtro y orden recorren el índice (created_at, id), el orden al revés
+    list_filter = [('created_at', admin.DateFieldListFilter)]
+    ordering = ['-created_at', '-id']
+    autocomplete_fields = ['post', 'author']
+
+    def get_queryset(self, request):
+        # Ni el cuerpo del comentario ni el del post se muestran en el listado
+        return super().get_queryset(request).defer('content', 'post__content', 'post__excerpt')
+
+    def delete_model(self, request, obj):
+        delete_comments([obj.pk])
+
+    def delete_queryset(self, request, queryset):
+        delete_comments(queryset.values('pk'))
+
+
+@admin.register(Reaction)
+class ReactionAdmin(LargeTableAdmin):
+    list_display = ['__str__', 'created_at']
+    list_select_related = ['user', 'content_type']
+    list_filter = [ReactionTargetFilter]
+    raw_id_fields = ['user']
+
+    def get_queryset(self, request):
+        # Reaction.__str__ resuelve content_object: se precargan los destinos en lote, por tipo
+        return super().get_queryset(request).prefetch_related(
+            GenericPrefetch('content_object', [
+                Post.objects.only('id', 'title'),
+                Comment.objects.select_related('author', 'post').only('id', 'author__username', 'post__title'),
+            ]),
+        )
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog'
+
+    def ready(self):
+        # Registra los receptores de señales (invalidación de la caché de respuestas)
+        from . import signals  # noqa: F401
+        # Registra las comprobaciones de `manage.py check`
+        from . import checks  # noqa: F401
@@ -0,0 +1,57 @@
+# blog/authentication.py
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+from .profiling import timer
+
+
+def get_cache():
+    return caches[settings.BLOG_AUTH_CACHE]
+
+
+def token_cache_key(key):
+    # Nunca se usa el token en claro como clave de caché
+    return 'blog:auth:' + hashlib.sha256(key.encode()).hexdigest()
+
+
+def forget_tokens(keys):
+    """Descarta de la caché la resolución de los tokens dados."""
+    get_cache().delete_many([token_cache_key(key) for key in keys])
+
+
+def user_token_keys(user_id):
+    return list(Token.objects.filter(user_id=user_id).values_list('key', flat=True))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication que guarda en caché el token ya resuelto (con su usuario), para no
+    consultar authtoken_token y auth_user en cada petición. Las señales de blog/signals.py lo
+    invalidan al borrar el token (logout, rotación) y al guardar el usuario; para que eso llegue a
+    todos los workers la caché debe ser compartida (ver BLOG_AUTH_CACHE_TIMEOUT y blog/checks.py).
+    """
+
+    def authenticate(self, request):
+        with timer('auth'):
+            return super().authenticate(request)
+
+    def authenticate_credentials(self, key):
+        timeout = settings.BLOG_AUTH_CACHE_TIMEOUT
+        if not timeout:
+            return super().authenticate_credentials(key)
+
+        cache = get_cache()
+        cache_key = token_cache_key(key)
+        token = cache.get(cache_key)
+        if token is None:
+            user, token = super().authenticate_credentials(key)
+            cache.set(cache_key, token, timeout)
+        elif not token.user.is_active:
+            raise AuthenticationFailed('User inactive or deleted.')
+        return token.user, token
@@ -0,0 +1,74 @@
+# blog/benchmarks.py
+
+import math
+import time
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def percentile(values, pct):
+    """Percentil `pct` (0-100) de `values` por el método del rango más cercano."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def latency_summary(latencies_ms):
+    """Resumen p50/p95/p99 y máximo de una lista de latencias en milisegundos."""
+    return {
+        'p50_ms': round(percentile(latencies_ms, 50), 2),
+        'p95_ms': round(percentile(latencies_ms, 95), 2),
+        'p99_ms': round(percentile(latencies_ms, 99), 2),
+        'max_ms': round(max(latencies_ms), 2),
+    }
+
+
+def measure(client, method, url, data=None, iterations=50, warmup=5):
+    """
+    Lanza `iterations` peticiones en proceso con el cliente de pruebas (tras `warmup` de
+    calentamiento) y devuelve latencias, consultas SQL por petición y bytes de respuesta.
+    """
+    def send():
+        if method == 'GET':
+            return client.get(url, data)
+        return getattr(client, method.lower())(url, data, format='json')
+
+    for _ in range(warmup):
+        send()
+
+    latencies, queries, sizes, statuses = [], [], [], set()
+    for _ in range(iterations):
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            response = send()
+            latencies.append((time.perf_counter() - started) * 1000)
+        queries.append(len(ctx.captured_queries))
+        sizes.append(len(response.content))
+        statuses.add(response.status_code)
+    return {
+        **latency_summary(latencies),
+        'queries': max(queries),
+        'bytes': max(sizes),
+        'statuses': sorted(statuses),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Regresiones de `results` frente a `baseline` (ambos {nombre: medidas}). La latencia p95 y
+    los bytes admiten un margen relativo `tolerance`; las consultas SQL no admiten ninguno.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if current['queries'] > previous['queries']:
+            regressions.append(f"{name}: {previous['queries']} -> {current['queries']} consultas")
+        for key in ('p95_ms', 'bytes'):
+            if current[key] > previous[key] * (1 + tolerance):
+                regressions.append(f'{name}: {key} {previous[key]} -> {current[key]}')
+    return regressions
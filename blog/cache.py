@@ -0,0 +1,129 @@
+# blog/cache.py
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+# Todo lo que guarda la caché de respuestas vive bajo este prefijo
+PREFIX = 'blog'
+# Ámbito que forma parte de todas las claves: invalidarlo descarta la caché entera
+GLOBAL_SCOPE = 'all'
+
+
+def get_cache():
+    return caches[settings.BLOG_RESPONSE_CACHE]
+
+
+def _generation_key(scope):
+    return f'{PREFIX}:gen:{scope}'
+
+
+def get_generations(scopes):
+    """
+    Generación actual de cada ámbito. Si una clave no existe (primer uso o desalojo) se crea
+    con la hora actual en milisegundos, así nunca se reutiliza una generación anterior.
+    """
+    cache = get_cache()
+    keys = [_generation_key(scope) for scope in scopes]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, time.time_ns() // 1_000_000, timeout=None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+def _bump(scopes):
+    cache = get_cache()
+    for scope in scopes:
+        key = _generation_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # La clave no existía: cualquier generación nueva deja obsoletas las entradas previas
+            cache.add(key, time.time_ns() // 1_000_000, timeout=None)
+
+
+def invalidate(*scopes):
+    """
+    Invalida en O(1) todas las respuestas cacheadas de los ámbitos dados incrementando su generación.
+    Se incrementa ya (para los lectores que lleguen durante la transacción) y otra vez al hacer
+    commit (para descartar lo que esos lectores hayan cacheado con datos aún sin confirmar).
+    """
+    _bump(scopes)
+    transaction.on_commit(lambda: _bump(scopes))
+
+
+def invalidate_all():
+    invalidate(GLOBAL_SCOPE)
+
+
+def _count(stat):
+    # Desactivado por defecto: cada acierto sería una lectura más una escritura en la caché
+    if not settings.BLOG_RESPONSE_CACHE_STATS:
+        return
+    cache = get_cache()
+    key = f'{PREFIX}:stats:{stat}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+def get_stats():
+    """
+    Aciertos y fallos acumulados de la caché de respuestas, si BLOG_RESPONSE_CACHE_STATS está activo
+    (None si no). Se guardan en la propia caché: con locmemcache:// son los del proceso que responde;
+    solo con un backend compartido suman los de todos los workers.
+    """
+    if not settings.BLOG_RESPONSE_CACHE_STATS:
+        return {'hits': None, 'misses': None, 'hit_ratio': None}
+    cache = get_cache()
+    hits = cache.get(f'{PREFIX}:stats:hit', 0)
+    misses = cache.get(f'{PREFIX}:stats:miss', 0)
+    total = hits + misses
+    return {'hits': hits, 'misses': misses, 'hit_ratio': round(hits / total, 4) if total else None}
+
+
+class CachedListMixin:
+    """
+    Cachea el resultado serializado de `list` por página (URL completa) y por usuario, bajo la
+    generación actual de los ámbitos que devuelve get_cache_scopes(). Las escrituras invalidan
+    incrementando la generación (ver blog/signals.py y blog/counters.py).
+    Si la vista calcula un ETag (ConditionalGetMixin) también forma parte de la clave.
+    """
+
+    def get_cache_scopes(self):
+        """Ámbitos de los que depende el listado; None para no cachearlo."""
+        return None
+
+    def list(self, request, *args, **kwargs):
+        scopes = self.get_cache_scopes()
+        if scopes is None or not settings.BLOG_RESPONSE_CACHE_TIMEOUT:
+            return super().list(request, *args, **kwargs)
+
+        scopes = [GLOBAL_SCOPE, *scopes]
+        generations = get_generations(scopes)
+        parts = [
+            request.get_full_path(), str(request.user.pk), getattr(self, 'etag', ''),
+            *(f'{scope}={generation}' for scope, generation in zip(scopes, generations)),
+        ]
+        digest = hashlib.sha1('\n'.join(parts).encode()).hexdigest()
+        key = f'{PREFIX}:resp:{self.basename}:{digest}'
+
+        cache = get_cache()
+        data = cache.get(key)
+        if data is not None:
+            _count('hit')
+            return Response(data)
+
+        _count('miss')
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.BLOG_RESPONSE_CACHE_TIMEOUT)
+        return response
@@ -0,0 +1,47 @@
+# blog/checks.py
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Tags, Warning, register
+from django.utils.module_loading import import_string
+
+
+@register(Tags.caches)
+def check_auth_cache(app_configs, **kwargs):
+    """La caché de tokens solo se invalida bien si todos los workers comparten el backend."""
+    if settings.BLOG_AUTH_CACHE_TIMEOUT and isinstance(caches[settings.BLOG_AUTH_CACHE], LocMemCache):
+        return [Warning(
+            'BLOG_AUTH_CACHE_TIMEOUT está activo sobre una caché en memoria del proceso.',
+            hint=(
+                'Un logout o la desactivación de un usuario solo invalidan la caché del worker que '
+                'los atiende. Usa un CACHE_URL compartido (redis://...) o AUTH_CACHE_TIMEOUT=0.'
+            ),
+            id='blog.W001',
+        )]
+    return []
+
+
+@register(Tags.caches)
+def check_events_backend(app_configs, **kwargs):
+    """Los eventos se publican en el proceso wsgi que escribe y se sirven desde el asgi."""
+    from .events import CacheBackend, LocalBackend
+
+    backend = import_string(settings.BLOG_EVENTS_BACKEND)
+    if issubclass(backend, LocalBackend) and settings.BLOG_SERVER_MODE == 'asgi':
+        return [Error(
+            'BLOG_EVENTS_BACKEND es LocalBackend con SERVER_MODE=asgi.',
+            hint=(
+                'Las escrituras llegan al servicio wsgi y LocalBackend no sale de su proceso: el flujo '
+                'nunca recibiría eventos. Usa EVENTS_BACKEND=blog.events.CacheBackend con un CACHE_URL '
+                'compartido.'
+            ),
+            id='blog.E001',
+        )]
+    if issubclass(backend, CacheBackend) and isinstance(caches[settings.BLOG_EVENTS_CACHE], LocMemCache):
+        return [Error(
+            'BLOG_EVENTS_BACKEND es CacheBackend sobre una caché en memoria del proceso.',
+            hint='Los eventos no llegarían a otros procesos. Usa un CACHE_URL compartido (redis://...).',
+            id='blog.E002',
+        )]
+    return []
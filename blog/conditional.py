@@ -0,0 +1,76 @@
+# blog/conditional.py
+
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import quote_etag
+
+from .ranking import ranking_version
+
+
+def fingerprint(queryset):
+    """
+    Huella barata de un conjunto de filas: número de filas y fechas máximas de edición y de
+    cambio de contadores de reacciones. Cualquier alta, baja, edición o reacción la cambia
+    sin necesidad de serializar nada (las altas y bajas de comentarios marcan reactions_updated_at
+    de su post, ver blog/ranking.py).
+    """
+    fields = {'count': Count('pk'), 'updated': Max('updated_at'), 'reacted': Max('reactions_updated_at')}
+    return queryset.order_by().aggregate(**fields)
+
+
+class ConditionalGetMixin:
+    """
+    Emite ETag en list/retrieve y responde 304 Not Modified cuando el cliente ya tiene la versión
+    actual, sin ejecutar la consulta ni la serialización de la respuesta.
+    Las vistas definen get_list_fingerprints() y get_object_fingerprints().
+
+    No se emite Last-Modified ni se atiende If-Modified-Since: ninguna fecha avanza con todos los
+    cambios (bajas, comentarios que cambian comments_count, rerank) y la cabecera solo tiene
+    resolución de un segundo. La huella del ETag sí cambia con todos ellos.
+    """
+
+    def get_list_fingerprints(self):
+        return [fingerprint(self.filter_queryset(self.get_queryset()))]
+
+    def get_ranking_fingerprints(self):
+        """Versión de rerank, solo para ?ordering=trending: es la única ordenación que cambia con él."""
+        ordering_param = getattr(self.paginator, 'ordering_param', None)
+        if ordering_param and self.request.query_params.get(ordering_param) == 'trending':
+            return [{'ranked': ranking_version()}]
+        return []
+
+    def get_object_fingerprints(self):
+        lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        queryset = self.get_queryset().filter(**{self.lookup_field: lookup})
+        found = fingerprint(queryset)
+        return [found] if found['count'] else None
+
+    def list(self, request, *args, **kwargs):
+        fingerprints = self.get_list_fingerprints() + self.get_ranking_fingerprints()
+        return self.conditional_response(request, fingerprints, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(request, self.get_object_fingerprints(), super().retrieve, *args, **kwargs)
+
+    def conditional_response(self, request, fingerprints, respond, *args, **kwargs):
+        if fingerprints is None:
+            return respond(request, *args, **kwargs)
+
+        # La respuesta depende de la URL completa (cursor, filtros) y del usuario (my_reaction)
+        parts = [request.get_full_path(), str(request.user.pk)]
+        parts += ['|'.join(str(value) for value in f.values()) for f in fingerprints]
+        etag = quote_etag(hashlib.sha1('\n'.join(parts).encode()).hexdigest())
+
+        # Disponible para CachedListMixin, que lo usa como parte de la clave
+        self.etag = etag
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = respond(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            # Que el navegador revalide siempre y que ninguna caché compartida mezcle usuarios
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ['Authorization', 'Cookie'])
+        return response
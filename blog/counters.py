@@ -0,0 +1,162 @@
+# blog/counters.py
+
+from collections import defaultdict
+
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+
+from .cache import invalidate, invalidate_all
+from .events import publish
+from .models import Comment, Reaction
+from .ranking import ranking_updates, refresh_hot_scores
+
+
+def reaction_delta(is_like, sign):
+    """Argumentos para adjust_reaction_counters: +1/-1 en el contador del tipo de reacción."""
+    return {'likes': sign} if is_like else {'dislikes': sign}
+
+
+def adjust_reaction_counters(content_type, object_id, likes=0, dislikes=0):
+    """
+    Suma (o resta) likes/dislikes al objeto reaccionado con una sola sentencia UPDATE.
+    Usa expresiones F() para que las actualizaciones concurrentes no se pisen.
+    Debe llamarse dentro de la misma transacción que modifica la reacción.
+    También marca reactions_updated_at, que forma parte del ETag de los listados, y recalcula
+    score y hot_score en la misma sentencia (ver blog/ranking.py).
+    """
+    return adjust_many_reaction_counters(content_type, [object_id], likes=likes, dislikes=dislikes)
+
+
+def adjust_many_reaction_counters(content_type, object_ids, likes=0, dislikes=0):
+    """Como adjust_reaction_counters, con el mismo incremento para varios objetos en un solo UPDATE."""
+    if not (likes or dislikes) or not object_ids:
+        return 0
+    now = timezone.now()
+    model = content_type.model_class()
+    updates = {'reactions_updated_at': now, **ranking_updates(model, now, likes=likes, dislikes=dislikes)}
+    if likes:
+        updates['likes_count'] = F('likes_count') + likes
+    if dislikes:
+        updates['dislikes_count'] = F('dislikes_count') + dislikes
+    updated = model.objects.filter(pk__in=object_ids).update(**updates)
+    invalidate_reaction_targets(model, object_ids)
+    publish('counts', lambda: reaction_counts(model, object_ids))
+    return updated
+
+
+def release_reactions(reactions):
+    """
+    Descuenta de los contadores las reacciones de `reactions` antes de que se borren por otra vía
+    (p. ej. en cascada al borrar su usuario). Debe llamarse en la transacción del borrado. Bloquea
+    las filas para que un toggle concurrente no las descuente también, y hace un UPDATE por tipo de
+    objeto y de reacción: un usuario reacciona como mucho una vez a cada objeto.
+    """
+    groups = defaultdict(list)
+    rows = reactions.select_for_update().values_list('content_type_id', 'is_like', 'object_id')
+    for content_type_id, is_like, object_id in rows:
+        groups[content_type_id, is_like].append(object_id)
+    for (content_type_id, is_like), object_ids in groups.items():
+        content_type = ContentType.objects.get_for_id(content_type_id)
+        adjust_many_reaction_counters(content_type, object_ids, **reaction_delta(is_like, -1))
+
+
+def reaction_counts(model, object_ids):
+    """Contadores actuales de los objetos, en el formato del evento 'counts'."""
+    rows = model.objects.filter(pk__in=object_ids).values_list('pk', 'likes_count', 'dislikes_count')
+    return {'items': [
+        {'content_type': model._meta.model_name, 'object_id': pk, 'likes_count': likes, 'dislikes_count': dislikes}
+        for pk, likes, dislikes in rows
+    ]}
+
+
+def invalidate_reaction_targets(model, object_ids):
+    """Invalida las respuestas cacheadas que muestran los contadores de los objetos."""
+    if model is Comment:
+        post_ids = set(Comment.objects.filter(pk__in=object_ids).values_list('post_id', flat=True))
+        invalidate('comments', *(f'comments:{post_id}' for post_id in post_ids))
+    else:
+        invalidate('posts')
+
+
+def _comment_aggregate(aggregate):
+    """
+    Subconsulta correlacionada con `aggregate` sobre los comentarios de cada post. A diferencia de
+    un Count('comments') en la consulta principal, no multiplica filas con otros JOIN y cada post
+    se resuelve con una búsqueda en un índice que empieza por post.
+    """
+    comments = (
+        Comment.objects
+        .filter(post=OuterRef('pk'))
+        .order_by()
+        .values('post')
+        .annotate(value=aggregate)
+        .values('value')
+    )
+    return Subquery(comments)
+
+
+# Estadísticas de comentarios de cada post, como anotaciones (ver comment_stats)
+COMMENT_STATS = {
+    'comments_count': lambda: Coalesce(_comment_aggregate(Count('pk')), Value(0)),
+    'last_comment_at': lambda: _comment_aggregate(Max('created_at')),  # Índice (post, created_at)
+    'commenters_count': lambda: Coalesce(_comment_aggregate(Count('author', distinct=True)), Value(0)),  # Índice (post, author)
+}
+
+
+def comment_stats(names=None):
+    """Anotaciones para un QuerySet de posts con las estadísticas de `names` (por defecto todas)."""
+    return {name: build() for name, build in COMMENT_STATS.items() if names is None or name in names}
+
+
+def _reaction_count(content_type, is_like):
+    """Subconsulta correlacionada con el número real de reacciones de cada fila."""
+    reactions = (
+        Reaction.objects
+        .filter(content_type=content_type, object_id=OuterRef('pk'), is_like=is_like)
+        .order_by()
+        .values('object_id')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(reactions), Value(0))
+
+
+def recount_reaction_counters(model, batch_size=1000, dry_run=False):
+    """
+    Recalcula los contadores de `model` a partir de la tabla de reacciones y corrige
+    las filas desviadas. Recorre la tabla por rangos de pk para no bloquearla entera.
+    Devuelve el número de filas que estaban desviadas.
+    """
+    content_type = ContentType.objects.get_for_model(model)
+    likes = _reaction_count(content_type, True)
+    dislikes = _reaction_count(content_type, False)
+
+    repaired = 0
+    last_pk = 0
+    while True:
+        batch = list(
+            model.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not batch:
+            break
+        last_pk = batch[-1]
+        drifted = (
+            model.objects
+            .filter(pk__in=batch)
+            .annotate(real_likes=likes, real_dislikes=dislikes)
+            .filter(~Q(likes_count=F('real_likes')) | ~Q(dislikes_count=F('real_dislikes')))
+            .values_list('pk', flat=True)
+        )
+        drifted = list(drifted)
+        if drifted and not dry_run:
+            model.objects.filter(pk__in=drifted).update(
+                likes_count=likes, dislikes_count=dislikes, score=likes - dislikes, reactions_updated_at=timezone.now(),
+            )
+            # hot_score depende de los contadores ya corregidos: otra sentencia
+            refresh_hot_scores(model, drifted)
+        repaired += len(drifted)
+    if repaired and not dry_run:
+        invalidate_all()
+    return repaired
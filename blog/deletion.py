@@ -0,0 +1,128 @@
+# blog/deletion.py
+
+"""
+Borrado de posts y comentarios por conjuntos.
+
+QuerySet.delete() y Model.delete() pasan por el Collector de Django: como Comment tiene receptores
+de señales, carga cada comentario y emite pre/post_delete fila a fila (caché, índice de búsqueda,
+eventos), y sus reacciones se recogen a través de la GenericRelation. En un post con miles de
+comentarios eso son miles de sentencias con los bloqueos retenidos todo el tiempo.
+
+Aquí se borra con unas pocas sentencias DELETE por conjuntos dentro de una transacción (reacciones,
+comentarios, posts, en ese orden) y los efectos de las señales se aplican una sola vez para todo
+el lote. Reaction no tiene señales ni dependientes, así que su QuerySet.delete() público ya es un
+único DELETE (fast delete); para comentarios y posts no hay equivalente público (ver _raw_delete,
+que vuelve a QuerySet.delete() si Django retira esa API privada).
+"""
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import router, transaction
+from django.db.models import Exists, OuterRef, QuerySet
+
+from .cache import invalidate
+from .events import publish
+from .models import Post, Comment, Reaction, REACTION_MODELS
+from .ranking import refresh_hot_scores
+from .search import unindex_objects
+
+# Ids por sentencia al desindexar (SQLite limita el número de parámetros)
+CHUNK_SIZE = 500
+
+# QuerySet._raw_delete es privado: si una versión de Django lo retira se borra con QuerySet.delete()
+HAS_RAW_DELETE = hasattr(QuerySet, '_raw_delete')
+
+
+def _raw_delete(queryset):
+    """
+    DELETE directo, sin Collector ni señales: los dependientes ya se han borrado explícitamente.
+    QuerySet._raw_delete(using) es API privada de Django (la que usa el Collector en sus fast
+    deletes); si desaparece se usa QuerySet.delete(), más lento (señales fila a fila) pero correcto.
+    DeletionTests.test_raw_delete_api avisa si cambia al actualizar Django.
+    """
+    if not HAS_RAW_DELETE:
+        # Solo las filas del propio modelo, como _raw_delete: sus dependientes ya no existen
+        _, per_model = queryset.delete()
+        return per_model.get(queryset.model._meta.label, 0)
+    # Devuelve None si la consulta no puede coincidir con nada (p. ej. pk__in=[])
+    return queryset._raw_delete(router.db_for_write(queryset.model)) or 0
+
+
+def _unindex(model, pks):
+    for start in range(0, len(pks), CHUNK_SIZE):
+        unindex_objects(model, pks[start:start + CHUNK_SIZE])
+
+
+def _delete_reactions(model, object_ids):
+    """Reacciones de los objetos de `model` cuyos ids devuelve `object_ids` (lista o subconsulta)."""
+    content_type = ContentType.objects.get_for_model(model)
+    deleted, _ = Reaction.objects.filter(content_type=content_type, object_id__in=object_ids).delete()
+    return deleted
+
+
+def delete_comments(comment_ids):
+    """Borra los comentarios y sus reacciones. Devuelve el número de filas borradas por modelo."""
+    comments = Comment.objects.filter(pk__in=comment_ids)
+    with transaction.atomic():
+        rows = list(comments.values_list('pk', 'post_id'))
+        pks = [pk for pk, _ in rows]
+        deleted = {'reactions': _delete_reactions(Comment, pks), 'comments': _raw_delete(comments)}
+        _unindex(Comment, pks)
+        refresh_hot_scores(Post, {post_id for _, post_id in rows})
+        invalidate('comments', *{f'comments:{post_id}' for _, post_id in rows})
+        for pk, post_id in rows:
+            publish('comment', {'action': 'deleted', 'id': pk, 'post': post_id})
+    return deleted
+
+
+def delete_posts(post_ids):
+    """
+    Borra los posts con todos sus comentarios y las reacciones de ambos.
+    Devuelve el número de filas borradas por modelo.
+    """
+    posts = Post.objects.filter(pk__in=post_ids)
+    with transaction.atomic():
+        pks = list(posts.values_list('pk', flat=True))
+        comments = Comment.objects.filter(post_id__in=pks)
+        comment_pks = list(comments.values_list('pk', flat=True))
+        deleted = {
+            # Las reacciones de los comentarios, con una subconsulta en lugar de la lista de ids
+            'reactions': _delete_reactions(Comment, comments.values('pk')) + _delete_reactions(Post, pks),
+            'comments': _raw_delete(comments),
+            'posts': _raw_delete(posts),
+        }
+        _unindex(Comment, comment_pks)
+        _unindex(Post, pks)
+        invalidate('posts', 'comments', *(f'comments:{pk}' for pk in pks))
+        # Los comentarios desaparecen con su post: basta con el evento del post
+        for pk in pks:
+            publish('post', {'action': 'deleted', 'id': pk})
+    return deleted
+
+
+def purge_orphan_reactions(batch_size=1000, dry_run=False):
+    """
+    Borra las reacciones cuyo objeto ya no existe (p. ej. tras borrados con SQL o QuerySet.update).
+    Recorre cada tipo por rangos de object_id siguiendo el índice (content_type, object_id);
+    cada rango se borra en su propia transacción para no retener bloqueos.
+    Devuelve el número de reacciones huérfanas por nombre de modelo.
+    """
+    purged = {}
+    for name, model in REACTION_MODELS.items():
+        content_type = ContentType.objects.get_for_model(model)
+        reactions = Reaction.objects.filter(content_type=content_type).order_by('object_id')
+        target_exists = Exists(model.objects.filter(pk=OuterRef('object_id')))
+        purged[name] = 0
+        last_object_id = -1
+        while True:
+            batch = list(reactions.filter(object_id__gt=last_object_id).values_list('object_id', flat=True)[:batch_size])
+            if not batch:
+                break
+            # El rango llega hasta el último object_id del lote incluido: ningún objeto queda partido entre lotes
+            in_range = reactions.filter(object_id__gt=last_object_id, object_id__lte=batch[-1])
+            orphans = in_range.filter(~target_exists)
+            if dry_run:
+                purged[name] += orphans.count()
+            else:
+                purged[name] += orphans.delete()[0]
+            last_object_id = batch[-1]
+    return purged
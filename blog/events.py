@@ -0,0 +1,238 @@
+# blog/events.py
+
+"""
+Eventos en vivo para la SPA (Server-Sent Events en /api/events/).
+
+Las escrituras publican deltas pequeños al confirmar su transacción:
+- 'post' y 'comment': {action: created|updated|deleted, id, ..., data: objeto serializado}
+- 'counts': {items: [{content_type, object_id, likes_count, dislikes_count}, ...]}
+- 'resync': el cliente se ha perdido eventos y debe recargar.
+
+Cada evento se codifica una sola vez como mensaje SSE y el backend (BLOG_EVENTS_BACKEND) lo
+reparte a las suscripciones abiertas:
+- LocalBackend: colas en memoria del proceso. Solo llega a los clientes del mismo worker, así
+  que no sirve cuando el flujo lo atiende un servicio asgi aparte (ver gunicorn.conf.py).
+- CacheBackend: secuencia de eventos en una caché compartida (Redis, Memcached...) que cada
+  suscripción consulta periódicamente; sirve con varios workers o instancias.
+"""
+
+import asyncio
+import threading
+from functools import lru_cache
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from .renderers import FastJSONRenderer
+
+TICKET_SALT = 'blog.events'
+# Eventos que una suscripción lenta puede acumular antes de pedirle que recargue
+QUEUE_SIZE = 256
+
+
+def encode(event_type, data):
+    """Mensaje SSE listo para enviar."""
+    return b'event: ' + event_type.encode() + b'\ndata: ' + FastJSONRenderer().render(data) + b'\n\n'
+
+
+RESYNC = encode('resync', {})
+
+
+class LocalBackend:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = set()
+
+    def active(self):
+        # Sin nadie escuchando no merece la pena ni serializar el evento
+        return bool(self.subscriptions)
+
+    def publish(self, message):
+        with self.lock:
+            subscriptions = list(self.subscriptions)
+        for subscription in subscriptions:
+            subscription.offer(message)
+
+    def subscribe(self):
+        return LocalSubscription(self)
+
+
+class LocalSubscription:
+    """Cola de una conexión SSE. Se llena desde cualquier hilo y se lee desde su bucle de eventos."""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def __enter__(self):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(QUEUE_SIZE)
+        with self.backend.lock:
+            self.backend.subscriptions.add(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        with self.backend.lock:
+            self.backend.subscriptions.discard(self)
+
+    def offer(self, message):
+        try:
+            self.loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:
+            # Bucle ya cerrado: la conexión terminó
+            self.__exit__()
+
+    def _put(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # El cliente no da abasto: se descarta lo pendiente y se le pide recargar
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+    async def get(self, timeout):
+        """Siguiente mensaje, o None si no llega ninguno en `timeout` segundos."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class CacheBackend:
+    """
+    Cada evento se guarda en la caché BLOG_EVENTS_CACHE bajo un número de secuencia (cache.incr,
+    atómico en los backends compartidos) durante BLOG_EVENTS_RETENTION segundos. La caché debe ser
+    compartida entre el proceso que escribe (wsgi) y el que sirve el flujo (asgi): ver blog.E002.
+    """
+    sequence_key = 'blog:events:seq'
+
+    def get_cache(self):
+        return caches[settings.BLOG_EVENTS_CACHE]
+
+    def message_key(self, sequence):
+        return f'blog:events:{sequence}'
+
+    def active(self):
+        # Los suscriptores pueden estar en otro proceso: se publica siempre
+        return True
+
+    def publish(self, message):
+        cache = self.get_cache()
+        cache.add(self.sequence_key, 0, timeout=None)
+        sequence = cache.incr(self.sequence_key)
+        cache.set(self.message_key(sequence), message, settings.BLOG_EVENTS_RETENTION)
+
+    def subscribe(self):
+        return CacheSubscription(self)
+
+
+class CacheSubscription:
+    def __init__(self, backend):
+        self.backend = backend
+        self.pending = []
+
+    def __enter__(self):
+        self.cache = self.backend.get_cache()
+        self.last = None
+        self.missing = None  # Número sin evento en la última consulta
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    async def _poll(self):
+        current = await self.cache.aget(self.backend.sequence_key, 0)
+        if self.last is None or current < self.last:
+            # Primera consulta, o la secuencia se ha reiniciado: se empieza desde aquí
+            self.last = current
+            return
+        if current - self.last > QUEUE_SIZE:
+            self.pending.append(RESYNC)
+            self.last = current
+            return
+        keys = [self.backend.message_key(sequence) for sequence in range(self.last + 1, current + 1)]
+        found = await self.cache.aget_many(keys)
+        for key in keys:
+            if key not in found:
+                break
+            self.pending.append(found[key])
+            self.last += 1
+            self.missing = None
+        else:
+            return
+        # publish() reserva el número con incr y guarda el evento después: un hueco puede ser un
+        # evento a medio publicar. Se vuelve a mirar en la siguiente consulta y, si sigue sin
+        # aparecer (caducado), se pide recargar
+        if self.missing == self.last + 1:
+            self.pending.append(RESYNC)
+            self.last = current
+            self.missing = None
+        else:
+            self.missing = self.last + 1
+
+    async def get(self, timeout):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        if self.last is None:
+            await self._poll()
+        while not self.pending:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return None
+            await asyncio.sleep(min(settings.BLOG_EVENTS_POLL_INTERVAL, remaining))
+            await self._poll()
+        return self.pending.pop(0)
+
+
+@lru_cache
+def _load_backend(path):
+    return import_string(path)()
+
+
+def get_backend():
+    return _load_backend(settings.BLOG_EVENTS_BACKEND)
+
+
+def publish(event_type, data):
+    """
+    Publica un evento al confirmar la transacción en curso. `data` puede ser una función que
+    lo construya: solo se llama si hay suscriptores y ya con los datos confirmados.
+    """
+    backend = get_backend()
+    if not backend.active():
+        return
+
+    def send():
+        payload = data() if callable(data) else data
+        if payload is not None:
+            backend.publish(encode(event_type, payload))
+    transaction.on_commit(send)
+
+
+def issue_ticket(user):
+    """
+    Credencial de corta duración para abrir /api/events/. EventSource no permite cabeceras, así
+    que va en la URL; por eso no se usa el token de la API, que acabaría en los logs de acceso.
+    """
+    return signing.dumps(user.pk, salt=TICKET_SALT)
+
+
+def read_ticket(ticket):
+    """Id del usuario del ticket, o None si es inválido o ha caducado."""
+    try:
+        return signing.loads(ticket, salt=TICKET_SALT, max_age=settings.BLOG_EVENTS_TICKET_MAX_AGE)
+    except signing.BadSignature:
+        return None
+
+
+async def stream(subscription):
+    """Mensajes SSE de la suscripción, con un comentario de latido cuando no hay actividad."""
+    with subscription:
+        # Tiempo de reconexión para EventSource y un primer envío para que el proxy abra el flujo
+        yield f'retry: {settings.BLOG_EVENTS_RETRY_MS}\n\n'.encode()
+        while True:
+            message = await subscription.get(settings.BLOG_EVENTS_HEARTBEAT)
+            yield message if message is not None else b': ping\n\n'
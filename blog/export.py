@@ -0,0 +1,186 @@
+# blog/export.py
+
+"""
+Exportación e importación del blog completo en NDJSON (un objeto JSON por línea).
+
+Cada línea lleva `type` ('user', 'post', 'comment' o 'reaction') y los ids originales;
+las referencias entre objetos usan esos ids y la importación los reasigna. El orden de
+salida (usuarios, posts, comentarios, reacciones) garantiza que al importar cada objeto
+llega después de aquello a lo que apunta.
+
+La exportación recorre cada tabla con QuerySet.iterator() y .values(), sin instanciar
+modelos ni acumular filas: la memoria es constante sea cual sea el tamaño del blog.
+"""
+
+import datetime
+import json
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils.dateparse import parse_datetime
+
+from .cache import invalidate_all
+from .models import Post, Comment, Reaction, REACTION_MODELS, make_excerpt, reaction_content_type_ids
+from .ranking import rerank
+from .search import rebuild
+
+CHUNK_SIZE = 2000
+
+USER_FIELDS = ['id', 'username', 'email', 'first_name', 'last_name', 'is_active', 'date_joined']
+POST_FIELDS = ['id', 'title', 'content', 'author_id', 'created_at', 'updated_at', 'likes_count', 'dislikes_count']
+COMMENT_FIELDS = ['id', 'post_id', 'author_id', 'content', 'created_at', 'updated_at', 'likes_count', 'dislikes_count']
+REACTION_FIELDS = ['id', 'content_type_id', 'object_id', 'user_id', 'is_like', 'created_at']
+
+
+def export_rows(chunk_size=CHUNK_SIZE):
+    """Genera los objetos del blog como diccionarios, en orden de dependencias."""
+    for row in User.objects.order_by('id').values(*USER_FIELDS).iterator(chunk_size=chunk_size):
+        yield {'type': 'user', **row}
+    for row in Post.objects.order_by('id').values(*POST_FIELDS).iterator(chunk_size=chunk_size):
+        yield {'type': 'post', **row}
+    for row in Comment.objects.order_by('id').values(*COMMENT_FIELDS).iterator(chunk_size=chunk_size):
+        yield {'type': 'comment', **row}
+
+    # El modelo reaccionado por nombre, resuelto una sola vez en lugar de cargar cada GenericForeignKey
+    model_names = {content_type_id: name for name, content_type_id in reaction_content_type_ids().items()}
+    reactions = Reaction.objects.order_by('id').values(*REACTION_FIELDS)
+    for row in reactions.iterator(chunk_size=chunk_size):
+        row['model'] = model_names.get(row.pop('content_type_id'))
+        if row['model'] is not None:
+            yield {'type': 'reaction', **row}
+
+
+class ExportEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        # DjangoJSONEncoder recorta a milisegundos: una copia de seguridad conserva la precisión completa
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def export_lines(chunk_size=CHUNK_SIZE):
+    """Como export_rows(), ya codificado: una línea NDJSON (str con salto de línea) por objeto."""
+    encoder = ExportEncoder(ensure_ascii=False, separators=(',', ':'))
+    for row in export_rows(chunk_size):
+        yield encoder.encode(row) + '\n'
+
+
+class Importer:
+    """
+    Importa líneas NDJSON de export_lines() con bulk_create por lotes. Los ids nuevos se
+    guardan en un mapa id original -> id nuevo por tipo para reescribir las referencias.
+    Los usuarios se emparejan por username; los que no existen se crean sin contraseña utilizable.
+    """
+
+    def __init__(self, batch_size=CHUNK_SIZE):
+        self.batch_size = batch_size
+        self.ids = {'user': {}, 'post': {}, 'comment': {}}
+        self.counts = {'user': 0, 'post': 0, 'comment': 0, 'reaction': 0}
+        self.skipped = 0
+        self.pending = []
+        self.pending_type = None
+        self.content_types = reaction_content_type_ids()
+        self.unusable_password = make_password(None)
+
+    def run(self, lines):
+        with transaction.atomic():
+            for line in lines:
+                if line.strip():
+                    self.add(json.loads(line))
+            self.flush()
+        # bulk_create no emite señales: índice de búsqueda, relevancia y caché se ponen al día al final
+        for model in (Post, Comment):
+            rebuild(model)
+            rerank(model)
+        invalidate_all()
+        return self.counts
+
+    def add(self, row):
+        row_type = row.pop('type')
+        if row_type not in self.counts:
+            raise ValueError(f'Tipo de objeto desconocido: {row_type!r}')
+        if row_type != self.pending_type or len(self.pending) >= self.batch_size:
+            self.flush()
+            self.pending_type = row_type
+        self.pending.append(row)
+
+    def flush(self):
+        if self.pending:
+            self.counts[self.pending_type] += getattr(self, f'_import_{self.pending_type}s')(self.pending)
+            self.pending = []
+
+    def _import_users(self, rows):
+        existing = dict(User.objects.filter(username__in=[row['username'] for row in rows]).values_list('username', 'id'))
+        new_rows = [row for row in rows if row['username'] not in existing]
+        created = User.objects.bulk_create([
+            User(
+                password=self.unusable_password, date_joined=parse_datetime(row['date_joined']),
+                **{k: v for k, v in row.items() if k not in ('id', 'date_joined')},
+            )
+            for row in new_rows
+        ])
+        existing.update((user.username, user.id) for user in created)
+        for row in rows:
+            self.ids['user'][row['id']] = existing[row['username']]
+        return len(created)
+
+    def _create(self, model, kind, objects, rows, timestamps=('created_at',)):
+        # auto_now/auto_now_add pisan las fechas en bulk_create: se restauran después con un
+        # UPDATE por fila vía executemany (bulk_update construye un CASE enorme, mucho más lento)
+        originals = [[getattr(obj, name) for name in timestamps] for obj in objects]
+        created = model.objects.bulk_create(objects)
+        quote, adapt = connection.ops.quote_name, connection.ops.adapt_datetimefield_value
+        assignments = ', '.join(f'{quote(name)} = %s' for name in timestamps)
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'UPDATE {quote(model._meta.db_table)} SET {assignments} WHERE id = %s',
+                [[adapt(value) for value in values] + [obj.id] for obj, values in zip(created, originals)],
+            )
+        if kind is not None:
+            for row, obj in zip(rows, created):
+                self.ids[kind][row['id']] = obj.id
+        return len(created)
+
+    def _import_posts(self, rows):
+        users = self.ids['user']
+        objects = [
+            Post(
+                title=row['title'], content=row['content'], excerpt=make_excerpt(row['content']),
+                author_id=users[row['author_id']],
+                created_at=parse_datetime(row['created_at']), updated_at=parse_datetime(row['updated_at']),
+                likes_count=row['likes_count'], dislikes_count=row['dislikes_count'],
+            )
+            for row in rows
+        ]
+        return self._create(Post, 'post', objects, rows, timestamps=('created_at', 'updated_at'))
+
+    def _import_comments(self, rows):
+        users, posts = self.ids['user'], self.ids['post']
+        objects = [
+            Comment(
+                post_id=posts[row['post_id']], author_id=users[row['author_id']], content=row['content'],
+                created_at=parse_datetime(row['created_at']), updated_at=parse_datetime(row['updated_at']),
+                likes_count=row['likes_count'], dislikes_count=row['dislikes_count'],
+            )
+            for row in rows
+        ]
+        return self._create(Comment, 'comment', objects, rows, timestamps=('created_at', 'updated_at'))
+
+    def _import_reactions(self, rows):
+        users = self.ids['user']
+        objects = []
+        for row in rows:
+            if row['model'] not in REACTION_MODELS:
+                raise ValueError(f"Modelo de reacción desconocido: {row['model']!r}")
+            object_id = self.ids[row['model']].get(row['object_id'])
+            if object_id is None:
+                # Reacción huérfana en el origen (su objeto ya no existe): no se importa
+                self.skipped += 1
+                continue
+            objects.append(Reaction(
+                content_type_id=self.content_types[row['model']], object_id=object_id,
+                user_id=users[row['user_id']], is_like=row['is_like'], created_at=parse_datetime(row['created_at']),
+            ))
+        return self._create(Reaction, None, objects, rows)
@@ -0,0 +1,108 @@
+# blog/management/commands/benchmark.py
+
+import json
+import platform
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.test.utils import override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from blog.benchmarks import compare, measure
+from blog.models import Post, Comment, Reaction
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide en proceso los endpoints principales de la API (latencia p50/p95/p99, consultas SQL '
+        'y bytes por respuesta) y opcionalmente compara con una línea base JSON: falla si hay regresiones. '
+        'Usar sobre datos de generate_data.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50, help='Peticiones medidas por endpoint.')
+        parser.add_argument('--warmup', type=int, default=5, help='Peticiones de calentamiento por endpoint.')
+        parser.add_argument('--only', nargs='+', help='Endpoints a medir (por nombre).')
+        parser.add_argument('--output', help='Guarda los resultados en este fichero JSON (sirve como línea base).')
+        parser.add_argument('--baseline', help='Fichero JSON de una ejecución anterior con el que comparar.')
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='Margen relativo admitido en p95 y bytes (por defecto 0.25 = 25%%).')
+        parser.add_argument('--with-cache', action='store_true',
+                            help='Deja activa la caché de respuestas (por defecto se desactiva para medir las consultas).')
+
+    def handle(self, *args, **options):
+        # El post con más comentarios: el caso más caro de detalle, comentarios y reacciones
+        hot_post = Post.objects.annotate(num_comments=Count('comments')).order_by('-num_comments', '-id').first()
+        if hot_post is None:
+            raise CommandError('No hay posts: ejecuta antes manage.py generate_data.')
+
+        scenarios = {
+            'posts_list': ('GET', '/api/posts/', None),
+            'post_detail': ('GET', f'/api/posts/{hot_post.id}/', None),
+            'comments_of_post': ('GET', '/api/comments/', {'post': hot_post.id}),
+            'feed': ('GET', '/api/feed/', None),
+            'search': ('GET', '/api/search/', {'q': 'café'}),
+            'reaction_toggle': ('POST', '/api/reactions/',
+                                {'content_type': 'post', 'object_id': hot_post.id, 'is_like': True}),
+        }
+        if options['only']:
+            unknown = set(options['only']) - set(scenarios)
+            if unknown:
+                raise CommandError(f"Endpoints desconocidos: {', '.join(sorted(unknown))}")
+            scenarios = {name: scenarios[name] for name in options['only']}
+
+        user, _ = User.objects.get_or_create(username='benchmark')
+        token, _ = Token.objects.get_or_create(user=user)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+        overrides = {'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver']}
+        if not options['with_cache']:
+            overrides['BLOG_RESPONSE_CACHE_TIMEOUT'] = 0
+
+        results = {}
+        with override_settings(**overrides):
+            for name, (method, url, data) in scenarios.items():
+                results[name] = measure(client, method, url, data, options['iterations'], options['warmup'])
+                if method == 'POST' and (options['iterations'] + options['warmup']) % 2:
+                    # Un número impar de toggles dejaría la reacción creada: se deshace
+                    client.post(url, data, format='json')
+                self._write_row(name, results[name])
+
+        if options['output']:
+            report = {
+                'meta': {
+                    'python': platform.python_version(),
+                    'database': settings.DATABASES['default']['ENGINE'],
+                    'posts': Post.objects.count(),
+                    'comments': Comment.objects.count(),
+                    'reactions': Reaction.objects.count(),
+                    'iterations': options['iterations'],
+                },
+                'results': results,
+            }
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"Resultados guardados en {options['output']}")
+
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)['results']
+            regressions = compare(results, baseline, options['tolerance'])
+            if regressions:
+                raise CommandError('Regresiones frente a la línea base:\n  ' + '\n  '.join(regressions))
+            self.stdout.write(self.style.SUCCESS('Sin regresiones frente a la línea base.'))
+
+    def _write_row(self, name, result):
+        line = (
+            f"{name:<18} p50 {result['p50_ms']:>8} ms  p95 {result['p95_ms']:>8} ms  "
+            f"p99 {result['p99_ms']:>8} ms  {result['queries']:>3} consultas  {result['bytes']:>8} bytes"
+        )
+        if any(code >= 400 for code in result['statuses']):
+            line += f"  (HTTP {result['statuses']})"
+            self.stdout.write(self.style.WARNING(line))
+        else:
+            self.stdout.write(line)
@@ -0,0 +1,28 @@
+# blog/management/commands/export_blog.py
+
+from django.core.management.base import BaseCommand
+
+from blog.export import CHUNK_SIZE, export_lines
+
+
+class Command(BaseCommand):
+    help = 'Exporta usuarios, posts, comentarios y reacciones en NDJSON con memoria constante.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', '-o', help='Fichero de salida (por defecto, la salida estándar).')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Filas leídas por viaje a la base de datos.')
+
+    def handle(self, *args, output, chunk_size, **options):
+        if output:
+            with open(output, 'w', encoding='utf-8') as stream:
+                count = self._export(stream.write, chunk_size)
+        else:
+            count = self._export(lambda line: self.stdout.write(line, ending=''), chunk_size)
+        self.stderr.write(f'{count} objetos exportados')
+
+    def _export(self, write, chunk_size):
+        count = 0
+        for line in export_lines(chunk_size):
+            write(line)
+            count += 1
+        return count
@@ -0,0 +1,114 @@
+# blog/management/commands/generate_data.py
+
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.cache import invalidate_all
+from blog.models import Post, Comment, Reaction, make_excerpt
+from blog.ranking import rerank
+from blog.search import rebuild
+
+WORDS = (
+    'blog privado nota viaje idea código café libro música proyecto semana trabajo ciudad '
+    'familia receta película foto montaña playa tarde noche mañana lectura pregunta respuesta '
+    'error prueba cambio mejora versión servidor cliente datos consulta índice caché'
+).split()
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera datos sintéticos para pruebas de rendimiento: usuarios, posts y comentarios y '
+        'reacciones con distribución de ley de potencias (pocos posts concentran casi toda la actividad).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200, help='Usuarios a crear (por defecto 200).')
+        parser.add_argument('--posts', type=int, default=1000, help='Posts a crear (por defecto 1000).')
+        parser.add_argument('--max-comments', type=int, default=200, help='Máximo de comentarios por post.')
+        parser.add_argument('--alpha', type=float, default=1.2,
+                            help='Exponente de Pareto: menor = cola más larga (por defecto 1.2).')
+        parser.add_argument('--batch-size', type=int, default=500, help='Posts por lote (por defecto 500).')
+        parser.add_argument('--seed', type=int, default=0, help='Semilla, para generar siempre los mismos datos.')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.alpha = options['alpha']
+        self.post_ct = ContentType.objects.get_for_model(Post)
+        self.comment_ct = ContentType.objects.get_for_model(Comment)
+
+        self.users = self._create_users(options['users'])
+        # Autores con pesos de Zipf: unos pocos escriben la mayoría de los posts
+        self.author_weights = [1 / rank for rank in range(1, len(self.users) + 1)]
+
+        totals = {'posts': 0, 'comments': 0, 'reactions': 0}
+        remaining = options['posts']
+        while remaining > 0:
+            size = min(options['batch_size'], remaining)
+            with transaction.atomic():
+                for key, count in self._create_batch(size, options['max_comments']).items():
+                    totals[key] += count
+            remaining -= size
+            self.stdout.write(f"{totals['posts']} posts, {totals['comments']} comentarios, "
+                              f"{totals['reactions']} reacciones")
+
+        # bulk_create no emite señales: índice de búsqueda, relevancia y caché de respuestas se ponen al día aquí
+        for model in (Post, Comment):
+            rebuild(model)
+            rerank(model)
+        invalidate_all()
+        self.stdout.write(self.style.SUCCESS(
+            f"Creados {len(self.users)} usuarios, {totals['posts']} posts, "
+            f"{totals['comments']} comentarios y {totals['reactions']} reacciones"
+        ))
+
+    def _create_users(self, count):
+        # Sin contraseña utilizable: hashear miles de contraseñas dominaría el tiempo de generación
+        start = User.objects.filter(username__startswith='gen_').count()
+        password = make_password(None)
+        users = [User(username=f'gen_{start + i}', password=password) for i in range(count)]
+        return User.objects.bulk_create(users, batch_size=1000)
+
+    def _power_law(self, maximum):
+        """Entero en [0, maximum] con cola de Pareto: la mayoría cerca de 0, unos pocos enormes."""
+        return min(maximum, int(self.rng.paretovariate(self.alpha)) - 1)
+
+    def _text(self, words):
+        return ' '.join(self.rng.choices(WORDS, k=words))
+
+    def _reactions(self, obj, content_type):
+        """Reacciones de usuarios distintos para `obj`; deja sus contadores coherentes."""
+        users = self.rng.sample(self.users, self._power_law(len(self.users)))
+        reactions = []
+        for user in users:
+            is_like = self.rng.random() < 0.8
+            reactions.append(Reaction(user=user, content_type=content_type, object_id=obj.pk, is_like=is_like))
+        likes = sum(1 for reaction in reactions if reaction.is_like)
+        return reactions, likes, len(reactions) - likes
+
+    def _create_batch(self, size, max_comments):
+        authors = self.rng.choices(self.users, weights=self.author_weights, k=size)
+        contents = [self._text(self.rng.randint(30, 300)) for _ in authors]
+        # bulk_create no llama a save(): el extracto se calcula aquí
+        posts = Post.objects.bulk_create([
+            Post(title=self._text(5).capitalize(), content=content, excerpt=make_excerpt(content), author=author)
+            for author, content in zip(authors, contents)
+        ], batch_size=1000)
+        comments = Comment.objects.bulk_create([
+            Comment(post=post, author=self.rng.choice(self.users), content=self._text(self.rng.randint(5, 60)))
+            for post in posts
+            for _ in range(self._power_law(max_comments))
+        ], batch_size=1000)
+
+        reactions = []
+        for model, objects, content_type in ((Post, posts, self.post_ct), (Comment, comments, self.comment_ct)):
+            for obj in objects:
+                obj_reactions, obj.likes_count, obj.dislikes_count = self._reactions(obj, content_type)
+                reactions.extend(obj_reactions)
+            model.objects.bulk_update(objects, ['likes_count', 'dislikes_count'], batch_size=1000)
+        Reaction.objects.bulk_create(reactions, batch_size=1000)
+        return {'posts': len(posts), 'comments': len(comments), 'reactions': len(reactions)}
@@ -0,0 +1,33 @@
+# blog/management/commands/import_blog.py
+
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.export import CHUNK_SIZE, Importer
+
+
+class Command(BaseCommand):
+    help = (
+        'Importa un volcado NDJSON de export_blog en una sola transacción, con bulk_create por lotes. '
+        'Los ids se reasignan; los usuarios se emparejan por username.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help="Fichero NDJSON ('-' para la entrada estándar).")
+        parser.add_argument('--batch-size', type=int, default=CHUNK_SIZE, help='Filas por bulk_create.')
+
+    def handle(self, *args, input, batch_size, **options):
+        importer = Importer(batch_size=batch_size)
+        stream = sys.stdin if input == '-' else open(input, encoding='utf-8')
+        try:
+            counts = importer.run(stream)
+        except (ValueError, KeyError) as exc:
+            raise CommandError(f'Volcado no válido: {exc!r}')
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        self.stdout.write(self.style.SUCCESS(
+            f"Importados {counts['user']} usuarios nuevos, {counts['post']} posts, {counts['comment']} comentarios "
+            f"y {counts['reaction']} reacciones ({importer.skipped} reacciones huérfanas omitidas)"
+        ))
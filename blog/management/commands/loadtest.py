@@ -0,0 +1,71 @@
+# blog/management/commands/loadtest.py
+
+import http.client
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.benchmarks import latency_summary
+
+
+class Command(BaseCommand):
+    help = (
+        'Prueba de carga contra un servidor en marcha (p. ej. gunicorn -c gunicorn.conf.py). '
+        'Lanza peticiones GET concurrentes con conexiones keep-alive y muestra rendimiento y latencias.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='+', help='URLs a probar, p. ej. http://127.0.0.1:8080/api/feed/')
+        parser.add_argument('--requests', type=int, default=500, help='Peticiones por URL (por defecto 500).')
+        parser.add_argument('--concurrency', type=int, default=8, help='Clientes en paralelo (por defecto 8).')
+        parser.add_argument('--token', help='Token de API para enviar en la cabecera Authorization.')
+
+    def handle(self, *args, **options):
+        headers = {'Connection': 'keep-alive'}
+        if options['token']:
+            headers['Authorization'] = f"Token {options['token']}"
+
+        for url in options['urls']:
+            parts = urlsplit(url)
+            if parts.scheme not in ('http', 'https'):
+                raise CommandError(f'URL no soportada: {url}')
+            path = parts.path + (f'?{parts.query}' if parts.query else '')
+            result = self._run(parts, path, headers, options['requests'], options['concurrency'])
+            summary = latency_summary(result['latencies'])
+            self.stdout.write(
+                f"{url}: {result['rps']:.1f} req/s, errores {result['errors']}, "
+                f"p50 {summary['p50_ms']} ms, p95 {summary['p95_ms']} ms, p99 {summary['p99_ms']} ms"
+            )
+
+    def _run(self, parts, path, headers, total, concurrency):
+        local = threading.local()
+        connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+
+        def one_request(_):
+            # Una conexión persistente por hilo, como haría un navegador
+            if getattr(local, 'conn', None) is None:
+                local.conn = connection_class(parts.netloc, timeout=30)
+            started = time.perf_counter()
+            try:
+                local.conn.request('GET', path, headers=headers)
+                response = local.conn.getresponse()
+                response.read()
+                ok = response.status < 400
+            except (OSError, http.client.HTTPException):
+                local.conn.close()
+                local.conn = None
+                ok = False
+            return (time.perf_counter() - started) * 1000, ok
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(one_request, range(total)))
+        elapsed = time.perf_counter() - started
+        return {
+            'latencies': [latency for latency, _ in results],
+            'errors': sum(1 for _, ok in results if not ok),
+            'rps': total / elapsed,
+        }
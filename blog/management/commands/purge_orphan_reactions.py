@@ -0,0 +1,21 @@
+# blog/management/commands/purge_orphan_reactions.py
+
+from django.core.management.base import BaseCommand
+
+from blog.deletion import purge_orphan_reactions
+
+
+class Command(BaseCommand):
+    help = (
+        'Borra por lotes las reacciones huérfanas: las que apuntan a un post o comentario que ya no existe.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Reacciones por lote (por defecto 1000).')
+        parser.add_argument('--dry-run', action='store_true', help='Solo cuenta las huérfanas, sin borrarlas.')
+
+    def handle(self, *args, **options):
+        purged = purge_orphan_reactions(batch_size=options['batch_size'], dry_run=options['dry_run'])
+        verb = 'encontradas' if options['dry_run'] else 'borradas'
+        for name, count in purged.items():
+            self.stdout.write(f'{name}: {count} reacciones huérfanas {verb}')
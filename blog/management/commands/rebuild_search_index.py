@@ -0,0 +1,19 @@
+# blog/management/commands/rebuild_search_index.py
+
+from django.core.management.base import BaseCommand
+
+from blog.models import Post, Comment
+from blog.search import get_backend, rebuild
+
+
+class Command(BaseCommand):
+    help = 'Regenera el índice de búsqueda de texto completo de posts y comentarios.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Filas indexadas por sentencia.')
+
+    def handle(self, *args, batch_size, **options):
+        self.stdout.write(f'Motor de búsqueda: {type(get_backend()).__name__}')
+        for model in (Post, Comment):
+            count = rebuild(model, batch_size=batch_size)
+            self.stdout.write(f'{model._meta.verbose_name_plural}: {count} filas indexadas')
@@ -0,0 +1,22 @@
+# blog/management/commands/recount_reactions.py
+
+from django.core.management.base import BaseCommand
+
+from blog.counters import recount_reaction_counters
+from blog.models import Post, Comment
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los contadores likes_count/dislikes_count de posts y comentarios y corrige desviaciones.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Filas por lote (por defecto 1000).')
+        parser.add_argument('--dry-run', action='store_true', help='Solo informa de las desviaciones, sin corregirlas.')
+
+    def handle(self, *args, **options):
+        for model in (Post, Comment):
+            drifted = recount_reaction_counters(
+                model, batch_size=options['batch_size'], dry_run=options['dry_run'],
+            )
+            verb = 'desviados' if options['dry_run'] else 'corregidos'
+            self.stdout.write(f'{model._meta.verbose_name_plural}: {drifted} {verb}')
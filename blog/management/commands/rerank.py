@@ -0,0 +1,28 @@
+# blog/management/commands/rerank.py
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.models import Post, Comment
+from blog.ranking import rerank
+
+
+class Command(BaseCommand):
+    help = (
+        'Vuelve a decaer hot_score (?ordering=trending) de los posts y comentarios recientes. '
+        'Prográmalo cada pocos minutos (cron, Cloud Scheduler...).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours', type=int, default=settings.BLOG_TRENDING_WINDOW_HOURS,
+            help='Filas creadas en las últimas N horas (por defecto BLOG_TRENDING_WINDOW_HOURS).',
+        )
+        parser.add_argument('--all', action='store_true', help='Toda la tabla (p. ej. tras cambiar la fórmula).')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Filas por sentencia (por defecto 1000).')
+
+    def handle(self, *args, **options):
+        hours = None if options['all'] else options['hours']
+        for model in (Post, Comment):
+            updated = rerank(model, hours=hours, batch_size=options['batch_size'])
+            self.stdout.write(f'{model._meta.verbose_name_plural}: {updated} reordenados')
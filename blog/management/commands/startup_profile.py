@@ -0,0 +1,90 @@
+# blog/management/commands/startup_profile.py
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.warmup import PHASES
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide el arranque en frío en un intérprete nuevo: importación de Django, configuración, '
+        'carga de la aplicación, cada fase de blog/warmup.py y las primeras peticiones, con y sin '
+        'calentamiento. Sirve para detectar regresiones en el tiempo de arranque.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=3, help='Arranques por variante; se muestra la mediana.')
+        parser.add_argument('--server-mode', choices=['wsgi', 'asgi'], default=os.environ.get('SERVER_MODE', 'wsgi'),
+                            help='Aplicación a cargar (por defecto SERVER_MODE).')
+        parser.add_argument('--imports', type=int, default=15, metavar='N',
+                            help='Muestra los N módulos más lentos de importar (0 para omitirlos).')
+        parser.add_argument('--output', help='Guarda los resultados en este fichero JSON.')
+
+    def handle(self, *args, **options):
+        if options['runs'] < 1:
+            raise CommandError('--runs debe ser al menos 1.')
+        results = {}
+        imports = []
+        for variant, warm in (('cold', False), ('warm', True)):
+            runs = [self._run(options['server_mode'], warm) for _ in range(options['runs'])]
+            imports = imports or runs[0]['imports']
+            results[variant] = {
+                name: statistics.median(run['timings'][name] for run in runs) for name in runs[0]['timings']
+            }
+            results[variant]['statuses'] = runs[0]['statuses']
+
+        self._write_table(results)
+        if options['imports']:
+            self.stdout.write("\nMódulos más lentos de importar (tiempo propio, primer arranque):")
+            for module, microseconds in sorted(imports, key=lambda item: -item[1])[:options['imports']]:
+                self.stdout.write(f'  {microseconds / 1000:8.1f} ms  {module}')
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump({'server_mode': options['server_mode'], 'results': results, 'imports': imports}, output, indent=2)
+            self.stdout.write(f"Resultados guardados en {options['output']}")
+
+    def _run(self, server_mode, warm):
+        code = f'from blog.warmup import profile_startup; profile_startup({server_mode!r}, {warm!r})'
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'private_blog_project.settings')}
+        completed = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', code],
+            capture_output=True, text=True, cwd=settings.BASE_DIR, env=env,
+        )
+        if completed.returncode:
+            raise CommandError(f'El arranque medido falló:\n{completed.stderr[-2000:]}')
+        report = json.loads(completed.stdout)
+        report['timings'] = dict(report['timings'])
+        # -X importtime escribe en stderr "import time: propio | acumulado | módulo" (en microsegundos)
+        report['imports'] = []
+        for line in completed.stderr.splitlines():
+            if line.startswith('import time:') and '|' in line:
+                own, _, module = line.removeprefix('import time:').split('|')
+                if own.strip().isdigit():
+                    report['imports'].append((module.strip(), int(own)))
+        return report
+
+    def _write_table(self, results):
+        cold, warm = results['cold'], results['warm']
+        startup = [name for name in cold if name != 'statuses' and 'request' not in name]
+        warmup = [f'warmup: {name}' for name, _ in PHASES]
+        requests = [name for name in cold if 'request' in name]
+
+        def row(label, cold_value, warm_value):
+            cold_text = f'{cold_value * 1000:>9.1f} ms' if cold_value is not None else f"{'-':>12}"
+            self.stdout.write(f'{label:<28}{cold_text}{warm_value * 1000:>9.1f} ms')
+
+        self.stdout.write(f"{'fase':<28}{'en frío':>12}{'calentado':>12}")
+        for name in startup + warmup:
+            row(name, cold.get(name), warm[name])
+        row('listo para atender', sum(cold[name] for name in startup), sum(warm[name] for name in startup + warmup))
+        for name in requests:
+            row(name, cold[name], warm[name])
+        statuses = ', '.join(f'{path} {status}' for path, status in cold['statuses'].items())
+        self.stdout.write(f'Respuestas: {statuses}')
@@ -0,0 +1,113 @@
+# blog/middleware.py
+
+import cProfile
+import json
+import logging
+import os
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from . import profiling
+
+logger = logging.getLogger('blog.profiling')
+
+
+class QueryRecorder:
+    """execute_wrapper que cuenta las consultas SQL y suma su duración."""
+
+    def __init__(self):
+        self.count = 0
+        self.elapsed_ms = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.elapsed_ms += (time.perf_counter() - started) * 1000
+            self.count += 1
+
+
+class ProfilingMiddleware:
+    """
+    Perfilado opt-in por petición (BLOG_PROFILING). Para una muestra de las peticiones
+    (BLOG_PROFILING_SAMPLE_RATE) mide consultas y tiempo SQL, autenticación, serialización,
+    renderizado y total, y los publica en la cabecera Server-Timing y en una línea JSON del
+    logger 'blog.profiling'. Con BLOG_PROFILING_CPROFILE_MS > 0 ejecuta además la petición bajo
+    cProfile y guarda el volcado en BLOG_PROFILING_DIR si supera ese umbral.
+
+    Desactivado, Django lo descarta al arrancar (MiddlewareNotUsed): coste cero por petición.
+    """
+
+    def __init__(self, get_response):
+        if not settings.BLOG_PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = settings.BLOG_PROFILING_SAMPLE_RATE
+        self.cprofile_ms = settings.BLOG_PROFILING_CPROFILE_MS
+
+    def __call__(self, request):
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        profiler = cProfile.Profile() if self.cprofile_ms else None
+        token = profiling.start()
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(recorder))
+                if profiler:
+                    profiler.enable()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    if profiler:
+                        profiler.disable()
+        finally:
+            total_ms = (time.perf_counter() - started) * 1000
+            timings = profiling.stop(token)
+
+        metrics = {
+            'total': total_ms,
+            'db': recorder.elapsed_ms,
+            **timings,
+        }
+        response['Server-Timing'] = ', '.join(
+            f'{name};dur={elapsed:.1f}' + (f';desc="{recorder.count} queries"' if name == 'db' else '')
+            for name, elapsed in metrics.items()
+        )
+        match = request.resolver_match
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'queries': recorder.count,
+            **{f'{name}_ms': round(elapsed, 2) for name, elapsed in metrics.items()},
+        }))
+        if profiler and total_ms >= self.cprofile_ms:
+            self._dump(profiler, request, total_ms)
+        return response
+
+    def process_template_response(self, request, response):
+        # El renderizado (DRF incluido) ocurre después de la vista: se mide con un callback
+        if profiling.is_active():
+            started = time.perf_counter()
+            response.add_post_render_callback(
+                lambda r: profiling.add('render', (time.perf_counter() - started) * 1000)
+            )
+        return response
+
+    def _dump(self, profiler, request, total_ms):
+        os.makedirs(settings.BLOG_PROFILING_DIR, exist_ok=True)
+        name = request.path.strip('/').replace('/', '_') or 'index'
+        path = os.path.join(settings.BLOG_PROFILING_DIR, f'{time.strftime("%Y%m%d-%H%M%S")}-{name}-{total_ms:.0f}ms.prof')
+        profiler.dump_stats(path)
+        logger.warning('Petición lenta (%.0f ms), perfil en %s', total_ms, path)
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.3 on 2026-10-18 00:58
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    # Rellena los contadores nuevos con una sola sentencia UPDATE por modelo y columna
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    Reaction = apps.get_model('blog', 'Reaction')
+    for model_name in ('post', 'comment'):
+        content_type = ContentType.objects.filter(app_label='blog', model=model_name).first()
+        if content_type is None:
+            continue # Base de datos nueva: todavía no hay reacciones
+        model = apps.get_model('blog', model_name)
+        counts = {}
+        for field, is_like in (('likes_count', True), ('dislikes_count', False)):
+            reactions = (
+                Reaction.objects
+                .filter(content_type=content_type, object_id=OuterRef('pk'), is_like=is_like)
+                .order_by()
+                .values('object_id')
+                .annotate(total=Count('pk'))
+                .values('total')
+            )
+            counts[field] = Coalesce(Subquery(reactions), Value(0))
+        model.objects.update(**counts)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_cursor_pagination_indexes'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='dislikes_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='dislikes_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
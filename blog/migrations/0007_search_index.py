@@ -0,0 +1,54 @@
+# Generated by Django 5.2.3 on 2026-10-18 01:24
+
+from django.conf import settings
+from django.db import migrations
+
+# Copia congelada del esquema de blog/search.py: la migración no debe cambiar si lo hace el módulo
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE blog_post_fts USING fts5(title, content, tokenize='unicode61 remove_diacritics 2')",
+    "CREATE VIRTUAL TABLE blog_comment_fts USING fts5(content, tokenize='unicode61 remove_diacritics 2')",
+    "INSERT INTO blog_post_fts (rowid, title, content) SELECT id, title, content FROM blog_post",
+    "INSERT INTO blog_comment_fts (rowid, content) SELECT id, content FROM blog_comment",
+]
+SQLITE_REVERSE = [
+    "DROP TABLE IF EXISTS blog_post_fts",
+    "DROP TABLE IF EXISTS blog_comment_fts",
+]
+POSTGRESQL_FORWARD = [
+    "ALTER TABLE blog_post ADD COLUMN search_vector tsvector",
+    "ALTER TABLE blog_comment ADD COLUMN search_vector tsvector",
+    "UPDATE blog_post SET search_vector = "
+    "setweight(to_tsvector(%(config)s::regconfig, coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector(%(config)s::regconfig, coalesce(content, '')), 'B')",
+    "UPDATE blog_comment SET search_vector = "
+    "setweight(to_tsvector(%(config)s::regconfig, coalesce(content, '')), 'B')",
+    "CREATE INDEX blog_post_search_idx ON blog_post USING GIN (search_vector)",
+    "CREATE INDEX blog_comment_search_idx ON blog_comment USING GIN (search_vector)",
+]
+POSTGRESQL_REVERSE = [
+    "ALTER TABLE blog_post DROP COLUMN IF EXISTS search_vector",
+    "ALTER TABLE blog_comment DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        statements = statements_by_vendor.get(schema_editor.connection.vendor, [])
+        for statement in statements:
+            params = {'config': settings.BLOG_SEARCH_CONFIG} if '%(config)s' in statement else None
+            schema_editor.execute(statement, params)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_conditional_get_timestamps'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRESQL_FORWARD}),
+            _run({'sqlite': SQLITE_REVERSE, 'postgresql': POSTGRESQL_REVERSE}),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.3 on 2026-10-18 01:32
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+BATCH_SIZE = 1000
+
+
+def backfill_excerpts(apps, schema_editor):
+    # Copia de blog.models.make_excerpt: la migración no debe cambiar si lo hace el modelo
+    Post = apps.get_model('blog', 'Post')
+    batch = []
+    for post in Post.objects.only('id', 'content').iterator(chunk_size=BATCH_SIZE):
+        post.excerpt = Truncator(' '.join(post.content.split())).chars(280)
+        batch.append(post)
+        if len(batch) == BATCH_SIZE:
+            Post.objects.bulk_update(batch, ['excerpt'])
+            batch = []
+    Post.objects.bulk_update(batch, ['excerpt'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, default='', editable=False, max_length=280),
+        ),
+        migrations.RunPython(backfill_excerpts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 5.2.3 on 2026-10-18 02:23
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+BATCH_SIZE = 1000
+# Copia de la fórmula de blog/ranking.py con sus valores por defecto: la migración no debe
+# cambiar si lo hacen el código o la configuración
+GRAVITY = 1.8
+COMMENT_WEIGHT = 2
+
+
+def backfill_scores(apps, schema_editor):
+    now = timezone.now()
+    connection = schema_editor.connection
+    quote = connection.ops.quote_name
+    for name in ('Post', 'Comment'):
+        model = apps.get_model('blog', name)
+        rows = model.objects.order_by().values_list('id', 'created_at', 'likes_count', 'dislikes_count')
+        if name == 'Post':
+            rows = rows.annotate(comment_total=models.Count('comments'))
+        else:
+            rows = rows.annotate(comment_total=models.Value(0))
+        # Un UPDATE por fila con executemany: bulk_update construye un CASE enorme, mucho más lento
+        sql = f'UPDATE {quote(model._meta.db_table)} SET score = %s, hot_score = %s WHERE id = %s'
+        batch = []
+        for pk, created_at, likes, dislikes, comment_total in rows.iterator(chunk_size=BATCH_SIZE):
+            score = likes - dislikes
+            age_hours = (now - created_at).total_seconds() / 3600
+            batch.append([score, (score + COMMENT_WEIGHT * comment_total + 1) / (age_hours + 2) ** GRAVITY, pk])
+            if len(batch) == BATCH_SIZE:
+                with connection.cursor() as cursor:
+                    cursor.executemany(sql, batch)
+                batch = []
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_post_excerpt'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='hot_score',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='score',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='hot_score',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='score',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        # Antes de crear los índices: rellenar sin ellos es más rápido
+        migrations.RunPython(backfill_scores, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', '-score', '-id'], name='blog_commen_post_id_807360_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', '-hot_score', '-id'], name='blog_commen_post_id_b68322_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-score', '-id'], name='blog_post_score_2573d0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-hot_score', '-id'], name='blog_post_hot_sco_5d76e3_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.3 on 2026-10-18 03:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_comment_post_author_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RankingVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('ranked_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
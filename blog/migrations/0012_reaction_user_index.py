@@ -0,0 +1,20 @@
+# Generated by Django 5.2.3 on 2026-10-18 03:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_ranking_version'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reaction',
+            index=models.Index(fields=['user', '-id'], name='blog_reacti_user_id_2ca8b9_idx'),
+        ),
+    ]
@@ -1,40 +1,105 @@
 # blog/models.py
 
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User # Importamos el modelo de usuario de Django
 from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation  # Importa GenericForeignKey
 from django.contrib.contenttypes.models import ContentType  # ¡Importa ContentType desde aquí!
+from django.utils.text import Truncator
+
+# Longitud máxima del extracto que se guarda con cada post
+EXCERPT_LENGTH = 280
+
+
+def make_excerpt(text):
+    """Extracto en texto plano de `text`: espacios normalizados y cortado con '…'."""
+    return Truncator(' '.join(text.split())).chars(EXCERPT_LENGTH)
+
+
+def hot_score(activity, age_hours):
+    """Relevancia con decaimiento temporal; la misma fórmula en SQL está en blog/ranking.py."""
+    return (activity + 1) / (age_hours + 2) ** settings.BLOG_TRENDING_GRAVITY
 
 
 # Modelo para las publicaciones del blog
 class Post(models.Model):
     title = models.CharField(max_length=200) # Título de la publicación
     content = models.TextField() # Contenido del blog
+    excerpt = models.CharField(max_length=EXCERPT_LENGTH, blank=True, default='', editable=False) # Extracto precalculado para los listados
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='blog_posts') # Relación con el autor (tú)
     created_at = models.DateTimeField(auto_now_add=True) # Fecha y hora de creación (automático)
     updated_at = models.DateTimeField(auto_now=True) # Fecha y hora de última actualización (automático)
     reactions = GenericRelation('Reaction')
+    # Contadores desnormalizados de reacciones (ver blog/counters.py)
+    likes_count = models.PositiveIntegerField(default=0, editable=False)
+    dislikes_count = models.PositiveIntegerField(default=0, editable=False)
+    reactions_updated_at = models.DateTimeField(null=True, blank=True, editable=False) # Último cambio de los contadores
+    # Ordenaciones ?ordering=top y ?ordering=trending, mantenidas con los contadores (ver blog/ranking.py)
+    score = models.IntegerField(default=0, editable=False)
+    hot_score = models.FloatField(default=0, editable=False)
 
     class Meta:
         ordering = ['-created_at'] # Ordenar los posts por fecha de creación descendente
+        indexes = [
+            # Índice para la paginación por cursor (created_at, id)
+            models.Index(fields=['-created_at', '-id']),
+            models.Index(fields=['-score', '-id']),
+            models.Index(fields=['-hot_score', '-id']),
+        ]
 
     def __str__(self):
         return self.title # Representación legible del objeto
 
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            self.hot_score = hot_score(0, 0)
+        # El extracto se recalcula con el contenido (salvo que el contenido no se haya cargado)
+        if 'content' not in self.get_deferred_fields():
+            self.excerpt = make_excerpt(self.content)
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'content' in update_fields:
+                kwargs['update_fields'] = {*update_fields, 'excerpt'}
+        super().save(*args, **kwargs)
+
 # Modelo para los comentarios
 class Comment(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='comments') # Relación con la publicación a la que pertenece
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='blog_comments') # Relación con el autor del comentario
     content = models.TextField() # Contenido del comentario
     created_at = models.DateTimeField(auto_now_add=True) # Fecha y hora de creación (automático)
+    updated_at = models.DateTimeField(auto_now=True) # Fecha y hora de última actualización (automático)
     reactions = GenericRelation('Reaction')
+    # Contadores desnormalizados de reacciones (ver blog/counters.py)
+    likes_count = models.PositiveIntegerField(default=0, editable=False)
+    dislikes_count = models.PositiveIntegerField(default=0, editable=False)
+    reactions_updated_at = models.DateTimeField(null=True, blank=True, editable=False) # Último cambio de los contadores
+    # Ordenaciones ?ordering=top y ?ordering=trending, mantenidas con los contadores (ver blog/ranking.py)
+    score = models.IntegerField(default=0, editable=False)
+    hot_score = models.FloatField(default=0, editable=False)
 
     class Meta:
         ordering = ['created_at'] # Ordenar los comentarios por fecha de creación ascendente
+        indexes = [
+            # Sirve el listado de comentarios de un post ya ordenado por fecha
+            models.Index(fields=['post', 'created_at']),
+            # Índice para la paginación por cursor del listado global
+            models.Index(fields=['created_at', 'id']),
+            # Autores distintos de los comentarios de un post sin leer la tabla (commenters_count)
+            models.Index(fields=['post', 'author']),
+            # Los comentarios de un post por relevancia
+            models.Index(fields=['post', '-score', '-id']),
+            models.Index(fields=['post', '-hot_score', '-id']),
+        ]
 
     def __str__(self):
         return f'Comment by {self.author.username} on {self.post.title}' # Representación legible
 
+    def save(self, *args, **kwargs):
+        # Recién creado: sin actividad y con edad cero
+        if self._state.adding:
+            self.hot_score = hot_score(0, 0)
+        super().save(*args, **kwargs)
+
 # Modelo para las reacciones (Me Gusta/No Me Gusta)
 class Reaction(models.Model):
     # Campo para el objeto al que se le da "like" o "dislike"
@@ -60,10 +125,35 @@ class Reaction(models.Model):
 
         # Optimiza consultas y borrados filtrando por el objeto relacionado
         indexes = [
-            models.Index(fields=['content_type', 'object_id'])
+            models.Index(fields=['content_type', 'object_id']),
+            # Paginación por cursor de las reacciones de cada usuario (ver ReactionCursorPagination)
+            models.Index(fields=['user', '-id']),
         ]
 
     def __str__(self):
         reaction_type = "Like" if self.is_like else "Dislike"
         return f'{self.user.username} {reaction_type}d {self.content_object}'
-    
\ No newline at end of file
+
+
+# Versión de las ordenaciones ?ordering=trending (una sola fila, ver blog/ranking.py)
+class RankingVersion(models.Model):
+    # El comando rerank la incrementa cada vez que vuelve a decaer hot_score; forma parte del ETag
+    # de los listados ordenados por trending y solo de esos
+    version = models.PositiveBigIntegerField(default=0)
+    ranked_at = models.DateTimeField(null=True, blank=True)
+
+
+# Modelos que admiten reacciones, por el nombre con el que los identifica la API
+REACTION_MODELS = {
+    'post': Post,
+    'comment': Comment,
+}
+
+
+def reaction_content_type_ids():
+    """
+    IDs de ContentType de los modelos que admiten reacciones, por nombre.
+    ContentType.objects cachea la resolución en memoria del proceso: tras la primera
+    llamada no hay consultas a la base de datos.
+    """
+    return {name: ContentType.objects.get_for_model(model).id for name, model in REACTION_MODELS.items()}
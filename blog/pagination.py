@@ -0,0 +1,142 @@
+# blog/pagination.py
+
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import Cursor, CursorPagination
+
+
+class BlogCursorPagination(CursorPagination):
+    """
+    Paginación por cursor (keyset): estable aunque se inserten filas entre páginas
+    y con coste constante por página gracias a los índices compuestos de cada modelo.
+
+    A diferencia del CursorPagination de DRF, que solo guarda la primera columna y recorre los
+    empates con OFFSET, el cursor guarda la posición completa (valor, id) y la página siguiente
+    se filtra con Q(valor__lt=v) | Q(valor=v, id__lt=id): sin OFFSET aunque miles de filas
+    empaten (p. ej. score 0 en ?ordering=top). La cota redundante valor__lte=v permite al
+    planificador empezar a recorrer el índice en el empate en lugar de filtrar desde su principio.
+    """
+    page_size = settings.BLOG_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = settings.BLOG_MAX_PAGE_SIZE
+    # ?ordering=<nombre> elige entre estas ordenaciones, cada una con su índice; sin él, `ordering`.
+    # Todas terminan en el id, así que la posición de cada fila es única
+    ordering_param = 'ordering'
+    orderings = {}
+
+    def get_ordering(self, request, queryset, view):
+        name = request.query_params.get(self.ordering_param)
+        if not name:
+            return self.ordering
+        if name not in self.orderings:
+            raise ValidationError({self.ordering_param: f"Debe ser uno de: {', '.join(self.orderings)}."})
+        return self.orderings[name]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        current_position = self.cursor and self.cursor.position
+
+        # Hacia atrás se recorre el orden invertido desde la posición y luego se da la vuelta a la página
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(f[1:] if f.startswith('-') else '-' + f for f in ordering)
+        queryset = queryset.order_by(*ordering)
+        if current_position is not None:
+            queryset = queryset.filter(self._after(queryset.model, ordering, current_position))
+
+        # Una fila de más indica si hay otra página
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        following_position = None
+        if len(results) > len(self.page):
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.next_position = current_position is not None, current_position
+            self.has_previous, self.previous_position = following_position is not None, following_position
+        else:
+            self.has_next, self.next_position = following_position is not None, following_position
+            self.has_previous, self.previous_position = current_position is not None, current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def link_after(self, base_url, instance):
+        """Enlace a la página que sigue a `instance` en la ordenación por defecto, sin petición previa."""
+        self.base_url = base_url
+        position = self._get_position_from_instance(instance, self.ordering)
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        if cursor is None:
+            return None
+        # Con posiciones únicas los enlaces nunca llevan desplazamiento: se ignora el que venga
+        return Cursor(offset=0, reverse=cursor.reverse, position=cursor.position)
+
+    def _after(self, model, ordering, position):
+        """Filas posteriores a `position` en `ordering`: comparación lexicográfica columna a columna."""
+        try:
+            values = json.loads(position)
+            if not isinstance(values, list) or len(values) != len(ordering):
+                raise ValueError
+            condition, equal = Q(), {}
+            for field, value in zip(ordering, values):
+                name = field.lstrip('-')
+                value = model._meta.get_field(name).to_python(value)
+                lookup = 'lt' if field.startswith('-') else 'gt'
+                condition |= Q(**equal, **{f'{name}__{lookup}': value})
+                if not equal:
+                    bound = Q(**{f'{name}__{lookup}e': value})
+                equal[name] = value
+        except (TypeError, ValueError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return bound & condition
+
+    def _get_position_from_instance(self, instance, ordering):
+        names = [field.lstrip('-') for field in ordering]
+        if isinstance(instance, dict):
+            values = [instance[name] for name in names]
+        else:
+            values = [getattr(instance, name) for name in names]
+        return json.dumps([str(value) for value in values], separators=(',', ':'))
+
+
+class PostCursorPagination(BlogCursorPagination):
+    # Mismo orden que Post.Meta.ordering, con el id como desempate
+    ordering = ('-created_at', '-id')
+    orderings = {
+        'newest': ordering,
+        'top': ('-score', '-id'),
+        'trending': ('-hot_score', '-id'),
+    }
+
+
+class CommentCursorPagination(BlogCursorPagination):
+    # Mismo orden que Comment.Meta.ordering, con el id como desempate
+    ordering = ('created_at', 'id')
+    orderings = {
+        'oldest': ordering,
+        'newest': ('-created_at', '-id'),
+        'top': ('-score', '-id'),
+        'trending': ('-hot_score', '-id'),
+    }
+
+
+class ReactionCursorPagination(BlogCursorPagination):
+    # Las más recientes primero; el id crece con la fecha y tiene índice propio (y (user, -id))
+    ordering = ('-id',)
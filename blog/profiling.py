@@ -0,0 +1,53 @@
+# blog/profiling.py
+
+"""
+Medición de fases de una petición para ProfilingMiddleware (blog/middleware.py).
+
+Fuera de una petición perfilada `timer()` no hace nada más que leer una ContextVar,
+así que el código instrumentado no paga nada cuando el perfilado está desactivado.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Tiempos (ms) de la petición en curso; None si no se está perfilando
+_timings = ContextVar('blog_profiling_timings', default=None)
+# Fases abiertas, para no contar dos veces una fase anidada (p. ej. serializadores anidados)
+_open = ContextVar('blog_profiling_open', default=frozenset())
+
+
+def start():
+    """Empieza a acumular tiempos en el contexto actual; devuelve el token para `stop`."""
+    return _timings.set({})
+
+
+def stop(token):
+    timings = _timings.get()
+    _timings.reset(token)
+    return timings
+
+
+def is_active():
+    return _timings.get() is not None
+
+
+def add(name, elapsed_ms):
+    timings = _timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + elapsed_ms
+
+
+@contextmanager
+def timer(name):
+    """Acumula en `name` el tiempo del bloque, si la petición se está perfilando."""
+    if not is_active() or name in _open.get():
+        yield
+        return
+    token = _open.set(_open.get() | {name})
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        add(name, (time.perf_counter() - started) * 1000)
+        _open.reset(token)
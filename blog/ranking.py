@@ -0,0 +1,135 @@
+# blog/ranking.py
+
+"""
+Ordenaciones por relevancia de posts y comentarios (?ordering=top y ?ordering=trending).
+
+- score: likes - dislikes.
+- hot_score: actividad con decaimiento temporal, al estilo de Hacker News:
+      (actividad + 1) / (horas desde la creación + 2) ** BLOG_TRENDING_GRAVITY
+  La actividad es el score, y en los posts además BLOG_TRENDING_COMMENT_WEIGHT por comentario.
+  El +1 hace que, entre filas sin actividad, mande la fecha.
+
+Las dos columnas se recalculan en la misma sentencia UPDATE que cambia los contadores de
+reacciones (blog/counters.py) y, para los posts, al crear o borrar comentarios. Como el tiempo
+pasa sin que haya escrituras, el comando rerank vuelve a decaer hot_score periódicamente para
+las filas de las últimas BLOG_TRENDING_WINDOW_HOURS horas; las anteriores conservan su último
+valor, ya casi nulo. Cada pasada incrementa RankingVersion, que solo entra en el ETag (y por
+tanto en la clave de la caché de respuestas) de los listados ?ordering=trending. Ambas columnas
+tienen índice con el id como desempate, así que una página ordenada por relevancia cuesta lo
+mismo que una cronológica.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, DateTimeField, F, FloatField, Func, Max, Min, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Power
+from django.utils import timezone
+
+from .models import RankingVersion
+
+
+class HoursSince(Func):
+    """Horas transcurridas (con decimales) desde la columna `expression` hasta `now`, un datetime."""
+    output_field = FloatField()
+
+    def __init__(self, expression, now):
+        super().__init__(expression, Value(now, output_field=DateTimeField()))
+
+    def _compile(self, compiler, template):
+        since, now = (compiler.compile(arg) for arg in self.get_source_expressions())
+        # Todas las plantillas usan `now` antes que `since`: el orden de los parámetros es fijo
+        return template % {'now': now[0], 'since': since[0]}, [*now[1], *since[1]]
+
+    def as_sql(self, compiler, connection, **extra_context):
+        # MySQL/MariaDB
+        return self._compile(compiler, '(-TIMESTAMPDIFF(MICROSECOND, %(now)s, %(since)s) / 3600000000.0)')
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self._compile(compiler, '((julianday(%(now)s) - julianday(%(since)s)) * 24.0)')
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self._compile(compiler, '(EXTRACT(EPOCH FROM (%(now)s - %(since)s)) / 3600.0)')
+
+
+def score_expression(likes=0, dislikes=0):
+    """likes - dislikes de la fila, con los incrementos que aplica la misma sentencia."""
+    return (F('likes_count') + likes) - (F('dislikes_count') + dislikes)
+
+
+def _comment_count(model):
+    """Subconsulta correlacionada con los comentarios de cada post (índice (post, created_at))."""
+    comments = model._meta.get_field('comments').related_model
+    counts = (
+        comments.objects
+        .filter(post=OuterRef('pk'))
+        .order_by()
+        .values('post')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts), Value(0))
+
+
+def hot_score_expression(model, now, likes=0, dislikes=0):
+    """hot_score de cada fila en el instante `now` (ver blog.models.hot_score)."""
+    activity = score_expression(likes, dislikes)
+    if model._meta.model_name == 'post':
+        activity = activity + settings.BLOG_TRENDING_COMMENT_WEIGHT * _comment_count(model)
+    age = HoursSince(F('created_at'), now)
+    return (activity + 1) / Power(age + 2, settings.BLOG_TRENDING_GRAVITY)
+
+
+def ranking_updates(model, now, likes=0, dislikes=0):
+    """
+    Asignaciones para el UPDATE que suma likes/dislikes: en SQL la parte derecha ve los valores
+    previos de la fila, así que los incrementos se aplican también aquí.
+    """
+    return {
+        'score': score_expression(likes, dislikes),
+        'hot_score': hot_score_expression(model, now, likes, dislikes),
+    }
+
+
+def refresh_hot_scores(model, pks):
+    """
+    Recalcula hot_score de las filas dadas (p. ej. los posts cuyos comentarios han cambiado) y marca
+    reactions_updated_at, que forma parte del ETag: así cambia también con comments_count.
+    """
+    now = timezone.now()
+    return model.objects.filter(pk__in=pks).update(hot_score=hot_score_expression(model, now), reactions_updated_at=now)
+
+
+def ranking_version():
+    """Versión actual de ?ordering=trending: una consulta por clave primaria."""
+    return RankingVersion.objects.filter(pk=1).values_list('version', flat=True).first() or 0
+
+
+def bump_ranking_version():
+    now = timezone.now()
+    if not RankingVersion.objects.filter(pk=1).update(version=F('version') + 1, ranked_at=now):
+        RankingVersion.objects.get_or_create(pk=1, defaults={'version': 1, 'ranked_at': now})
+
+
+def rerank(model, hours=None, batch_size=1000):
+    """
+    Vuelve a decaer hot_score (y corrige score) de las filas creadas en las últimas `hours` horas,
+    o de toda la tabla si es None, con una sentencia UPDATE por rango de pk para no retener
+    bloqueos. Devuelve el número de filas actualizadas.
+    """
+    now = timezone.now()
+    rows = model.objects.all()
+    if hours is not None:
+        rows = rows.filter(created_at__gte=now - timedelta(hours=hours))
+    bounds = rows.aggregate(first=Min('pk'), last=Max('pk'))
+    if bounds['first'] is None:
+        return 0
+
+    updates = {'score': score_expression(), 'hot_score': hot_score_expression(model, now)}
+    updated = 0
+    for start in range(bounds['first'], bounds['last'] + 1, batch_size):
+        updated += rows.filter(pk__gte=start, pk__lt=start + batch_size).update(**updates)
+    if updated:
+        # Solo cambia el orden de ?ordering=trending: el resto de listados conserva su ETag y su caché
+        bump_ranking_version()
+    return updated
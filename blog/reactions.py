@@ -0,0 +1,221 @@
+# blog/reactions.py
+
+import threading
+from contextlib import nullcontext
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .counters import adjust_many_reaction_counters, adjust_reaction_counters, reaction_delta
+from .models import Reaction
+
+# Resultados posibles de toggle_reaction
+CREATED = 'created'
+UPDATED = 'updated'
+DELETED = 'deleted'
+
+# SQLite admite un único escritor: serializar los toggles del proceso evita errores de
+# "database is locked" entre hilos en lugar de reintentar a ciegas
+_sqlite_lock = threading.Lock()
+
+
+def toggle_reaction(user, content_type, object_id, is_like):
+    """
+    Aplica la lógica de toggle de una reacción de forma atómica y sin carreras:
+    - si no existe, la crea;
+    - si existe con el mismo tipo, la elimina;
+    - si existe con el otro tipo, la cambia.
+    Actualiza los contadores del objeto en la misma transacción.
+    Devuelve (resultado, reacción); la reacción es None cuando se elimina.
+    """
+    if connection.vendor == 'postgresql':
+        with transaction.atomic():
+            action, reaction = _toggle_postgresql(user, content_type, object_id, is_like)
+            _apply_counters(action, content_type, object_id, is_like)
+    else:
+        with _sqlite_lock if connection.vendor == 'sqlite' else nullcontext():
+            action, reaction = _toggle_portable(user, content_type, object_id, is_like)
+    return action, reaction
+
+
+def delete_reaction(reaction):
+    """
+    Borra la reacción y descuenta su tipo actual de los contadores, solo si la borra esta llamada:
+    un toggle o un DELETE concurrente de la misma reacción ya la habrá descontado.
+    Devuelve True si se ha borrado.
+    """
+    with _sqlite_lock if connection.vendor == 'sqlite' else nullcontext():
+        with transaction.atomic():
+            # El tipo puede haber cambiado desde que se leyó `reaction`: se relee con la fila bloqueada
+            rows = Reaction.objects.select_for_update().filter(pk=reaction.pk)
+            is_like = rows.values_list('is_like', flat=True).first()
+            if is_like is None:
+                return False
+            deleted, _ = rows.delete()
+            if deleted:
+                adjust_reaction_counters(reaction.content_type, reaction.object_id, **reaction_delta(is_like, -1))
+            return bool(deleted)
+
+
+def _apply_counters(action, content_type, object_id, is_like):
+    if action == CREATED:
+        adjust_reaction_counters(content_type, object_id, **reaction_delta(is_like, 1))
+    elif action == DELETED:
+        adjust_reaction_counters(content_type, object_id, **reaction_delta(is_like, -1))
+    else:
+        adjust_reaction_counters(
+            content_type, object_id, **reaction_delta(is_like, 1), **reaction_delta(not is_like, -1),
+        )
+
+
+def _columns():
+    opts = Reaction._meta
+    quote = connection.ops.quote_name
+    names = ['content_type', 'object_id', 'user', 'is_like', 'created_at', 'id']
+    return quote(opts.db_table), {name: quote(opts.get_field(name).column) for name in names}
+
+
+def _toggle_postgresql(user, content_type, object_id, is_like):
+    """
+    Una o dos sentencias: DELETE ... RETURNING si la reacción es del mismo tipo y, si no,
+    INSERT ... ON CONFLICT DO UPDATE, que crea o cambia el tipo en un solo paso.
+    """
+    table, col = _columns()
+    key = [content_type.id, object_id, user.id]
+    delete_sql = (
+        f'DELETE FROM {table} WHERE {col["content_type"]} = %s AND {col["object_id"]} = %s '
+        f'AND {col["user"]} = %s AND {col["is_like"]} = %s RETURNING {col["id"]}'
+    )
+    upsert_sql = (
+        f'INSERT INTO {table} ({col["content_type"]}, {col["object_id"]}, {col["user"]}, '
+        f'{col["is_like"]}, {col["created_at"]}) VALUES (%s, %s, %s, %s, %s) '
+        f'ON CONFLICT ({col["content_type"]}, {col["object_id"]}, {col["user"]}) '
+        f'DO UPDATE SET {col["is_like"]} = EXCLUDED.{col["is_like"]} '
+        f'WHERE {table}.{col["is_like"]} <> EXCLUDED.{col["is_like"]} '
+        f'RETURNING {col["id"]}, {col["created_at"]}, (xmax = 0)'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(delete_sql, key + [is_like])
+        if cursor.fetchone():
+            return DELETED, None
+        cursor.execute(upsert_sql, key + [is_like, timezone.now()])
+        row = cursor.fetchone()
+        if row is None:
+            # Un toggle idéntico y concurrente acaba de crear la misma reacción:
+            # en orden serial este toggle la elimina
+            cursor.execute(delete_sql, key + [is_like])
+            return DELETED, None
+    reaction_id, created_at, inserted = row
+    reaction = Reaction(
+        id=reaction_id, user=user, content_type=content_type,
+        object_id=object_id, is_like=is_like, created_at=created_at,
+    )
+    return (CREATED if inserted else UPDATED), reaction
+
+
+def _toggle_portable(user, content_type, object_id, is_like):
+    """
+    Alternativa para el resto de bases de datos: bloquea la fila existente (si la base de datos
+    lo permite) y, si dos inserciones chocan contra unique_reaction, reintenta leyendo la ganadora.
+    """
+    lookup = {'user': user, 'content_type': content_type, 'object_id': object_id}
+    for attempt in range(3):
+        try:
+            with transaction.atomic():
+                existing = Reaction.objects.select_for_update().filter(**lookup).first()
+                if existing is None:
+                    reaction = Reaction.objects.create(is_like=is_like, **lookup)
+                    action = CREATED
+                elif existing.is_like == is_like:
+                    existing.delete()
+                    reaction, action = None, DELETED
+                else:
+                    Reaction.objects.filter(pk=existing.pk).update(is_like=is_like)
+                    existing.is_like = is_like
+                    reaction, action = existing, UPDATED
+                _apply_counters(action, content_type, object_id, is_like)
+                return action, reaction
+        except IntegrityError:
+            if attempt == 2:
+                raise
+
+
+
+def batch_toggle_reactions(user, operations):
+    """
+    Aplica en orden una lista de toggles [(content_type, object_id, is_like), ...] del mismo
+    usuario, en una transacción y con SQL por conjuntos: se bloquean las reacciones existentes,
+    se calcula en Python el estado final de cada objeto y se aplican un INSERT masivo, un DELETE
+    y como mucho dos UPDATE, más un UPDATE de contadores por cada incremento distinto.
+    Devuelve (acciones, estados): la acción de cada operación, en orden, y el estado final
+    (True, False o None) de cada (content_type, object_id) afectado.
+    """
+    with _sqlite_lock if connection.vendor == 'sqlite' else nullcontext():
+        for attempt in range(3):
+            try:
+                with transaction.atomic():
+                    return _batch_toggle(user, operations)
+            except IntegrityError:
+                # Un toggle concurrente insertó una de las reacciones: se repite con el estado nuevo
+                if attempt == 2:
+                    raise
+
+
+def _batch_toggle(user, operations):
+    object_ids = {}
+    for content_type, object_id, _ in operations:
+        object_ids.setdefault(content_type, set()).add(object_id)
+    targets = Q()
+    for content_type, ids in object_ids.items():
+        targets |= Q(content_type=content_type, object_id__in=ids)
+    existing = {
+        (reaction.content_type_id, reaction.object_id): reaction
+        for reaction in Reaction.objects.select_for_update().filter(targets, user=user)
+    }
+    initial = {key: reaction.is_like for key, reaction in existing.items()}
+
+    # Estado de cada objeto tras aplicar los toggles en el orden en que llegaron
+    state = dict(initial)
+    actions = []
+    for content_type, object_id, is_like in operations:
+        key = (content_type.id, object_id)
+        current = state.get(key)
+        if current == is_like:
+            state[key] = None
+            actions.append(DELETED)
+        else:
+            state[key] = is_like
+            actions.append(CREATED if current is None else UPDATED)
+
+    now = timezone.now()
+    to_create, to_delete, to_like, to_dislike = [], [], [], []
+    deltas = {}
+    for key, final in state.items():
+        before = initial.get(key)
+        if before == final:
+            continue
+        if before is None:
+            to_create.append(Reaction(
+                user=user, content_type_id=key[0], object_id=key[1], is_like=final, created_at=now,
+            ))
+        elif final is None:
+            to_delete.append(existing[key].pk)
+        else:
+            (to_like if final else to_dislike).append(existing[key].pk)
+        delta = (int(final is True) - int(before is True), int(final is False) - int(before is False))
+        deltas.setdefault((key[0], delta), []).append(key[1])
+
+    Reaction.objects.bulk_create(to_create)
+    if to_delete:
+        Reaction.objects.filter(pk__in=to_delete).delete()
+    if to_like:
+        Reaction.objects.filter(pk__in=to_like).update(is_like=True)
+    if to_dislike:
+        Reaction.objects.filter(pk__in=to_dislike).update(is_like=False)
+    for (content_type_id, (likes, dislikes)), object_ids in deltas.items():
+        adjust_many_reaction_counters(
+            ContentType.objects.get_for_id(content_type_id), object_ids, likes=likes, dislikes=dislikes,
+        )
+    return actions, state
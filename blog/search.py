@@ -0,0 +1,186 @@
+# blog/search.py
+
+"""
+Búsqueda de texto completo sobre posts y comentarios.
+
+- PostgreSQL: columna tsvector `search_vector` (fuera del modelo) con índice GIN.
+- SQLite: tablas virtuales FTS5 `blog_post_fts` y `blog_comment_fts` (rowid = id de la fila).
+- Otros motores: icontains, sin índice.
+
+Las tablas/columnas las crea la migración 0007; las señales de blog/signals.py las mantienen
+al guardar/borrar y el comando rebuild_search_index las regenera en bloque.
+"""
+
+import re
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+
+from .models import Post, Comment
+
+# Campos indexados de cada modelo, con su peso (el título pesa más que el cuerpo)
+SEARCH_FIELDS = {
+    Post: [('title', 'A', 10.0), ('content', 'B', 1.0)],
+    Comment: [('content', 'B', 1.0)],
+}
+# Límite de términos por consulta, para que una q enorme no dispare el coste
+MAX_TERMS = 16
+TERM_RE = re.compile(r'\w+')
+
+
+def search_terms(query):
+    return TERM_RE.findall(query or '')[:MAX_TERMS]
+
+
+def _columns(model):
+    return [name for name, _, _ in SEARCH_FIELDS[model]]
+
+
+class SQLiteBackend:
+    @staticmethod
+    def table(model):
+        return f'{model._meta.db_table}_fts'
+
+    def index(self, model, pks):
+        table, columns = self.table(model), _columns(model)
+        source = model._meta.db_table
+        with connection.cursor() as cursor:
+            placeholders = ', '.join(['%s'] * len(pks))
+            cursor.execute(f'DELETE FROM {table} WHERE rowid IN ({placeholders})', pks)
+            cursor.execute(
+                f'INSERT INTO {table} (rowid, {", ".join(columns)}) '
+                f'SELECT id, {", ".join(columns)} FROM {source} WHERE id IN ({placeholders})',
+                pks,
+            )
+
+    def unindex(self, model, pks):
+        placeholders = ', '.join(['%s'] * len(pks))
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table(model)} WHERE rowid IN ({placeholders})', pks)
+
+    def search(self, model, terms, limit):
+        # Cada término entre comillas (sin operadores FTS5 del usuario); el último como prefijo
+        match = ' '.join(f'"{term}"' for term in terms) + '*'
+        weights = ', '.join(str(weight) for _, _, weight in SEARCH_FIELDS[model])
+        table = self.table(model)
+        with connection.cursor() as cursor:
+            # bm25() es menor cuanto más relevante; se invierte para que rank crezca con la relevancia
+            cursor.execute(
+                f'SELECT rowid, -bm25({table}, {weights}) AS rank FROM {table} '
+                f'WHERE {table} MATCH %s ORDER BY rank DESC, rowid DESC LIMIT %s',
+                [match, limit],
+            )
+            return cursor.fetchall()
+
+    def rebuild(self, model, batch_size):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table(model)}')
+        pks = list(model.objects.order_by('pk').values_list('pk', flat=True))
+        for start in range(0, len(pks), batch_size):
+            self.index(model, pks[start:start + batch_size])
+        return len(pks)
+
+
+class PostgreSQLBackend:
+    @staticmethod
+    def vector_sql(model):
+        return ' || '.join(
+            f"setweight(to_tsvector(%s::regconfig, coalesce({name}, '')), '{weight}')"
+            for name, weight, _ in SEARCH_FIELDS[model]
+        )
+
+    def _config_params(self, model):
+        return [settings.BLOG_SEARCH_CONFIG] * len(SEARCH_FIELDS[model])
+
+    def index(self, model, pks):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {model._meta.db_table} SET search_vector = {self.vector_sql(model)} '
+                f'WHERE id = ANY(%s)',
+                self._config_params(model) + [list(pks)],
+            )
+
+    def unindex(self, model, pks):
+        # El vector vive en la propia fila: se va con ella
+        pass
+
+    def search(self, model, terms, limit):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT id, ts_rank_cd(search_vector, query) AS rank '
+                f'FROM {model._meta.db_table}, to_tsquery(%s::regconfig, %s) query '
+                f'WHERE search_vector @@ query ORDER BY rank DESC, id DESC LIMIT %s',
+                [settings.BLOG_SEARCH_CONFIG, ' & '.join(terms) + ':*', limit],
+            )
+            return cursor.fetchall()
+
+    def rebuild(self, model, batch_size):
+        pks = list(model.objects.order_by('pk').values_list('pk', flat=True))
+        for start in range(0, len(pks), batch_size):
+            self.index(model, pks[start:start + batch_size])
+        return len(pks)
+
+
+class FallbackBackend:
+    """Sin índice de texto: filtro icontains (recorrido secuencial) y sin ranking."""
+
+    def index(self, model, pks):
+        pass
+
+    def unindex(self, model, pks):
+        pass
+
+    def search(self, model, terms, limit):
+        condition = Q()
+        for term in terms:
+            condition &= Q(*[Q(**{f'{name}__icontains': term}) for name in _columns(model)], _connector=Q.OR)
+        pks = model.objects.filter(condition).order_by('-pk').values_list('pk', flat=True)[:limit]
+        return [(pk, None) for pk in pks]
+
+    def rebuild(self, model, batch_size):
+        return 0
+
+
+BACKENDS = {
+    'sqlite': SQLiteBackend(),
+    'postgresql': PostgreSQLBackend(),
+}
+
+
+def get_backend():
+    return BACKENDS.get(connection.vendor, FallbackBackend())
+
+
+def index_objects(model, pks):
+    if pks:
+        get_backend().index(model, list(pks))
+
+
+def unindex_objects(model, pks):
+    if pks:
+        get_backend().unindex(model, list(pks))
+
+
+def search(model, query, limit):
+    """
+    Busca `query` en los objetos de `model` y los devuelve ordenados por relevancia,
+    con el atributo `search_rank` (None si el motor no calcula ranking).
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+    ranks = dict(get_backend().search(model, terms, limit))
+    objects = model.objects.select_related('author').in_bulk(ranks)
+    results = []
+    for pk, rank in ranks.items():
+        if pk in objects:
+            objects[pk].search_rank = rank
+            results.append(objects[pk])
+    return results
+
+
+def rebuild(model, batch_size=1000):
+    # En una transacción: las búsquedas concurrentes nunca ven el índice a medio reconstruir
+    with transaction.atomic():
+        return get_backend().rebuild(model, batch_size)
@@ -1,39 +1,295 @@
 # blog/serializers.py
 
+from operator import attrgetter
+
 from rest_framework import serializers
-from .models import Post, Comment, Reaction
+from rest_framework.fields import SkipField
+from rest_framework.relations import PKOnlyObject
+from .models import Post, Comment, Reaction, REACTION_MODELS
+from .pagination import CommentCursorPagination
+from .profiling import timer
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Q
+from django.urls import reverse
+
+
+def load_my_reactions(context, objects):
+    """
+    Resuelve con una sola consulta la reacción del usuario actual sobre `objects`
+    (posts y/o comentarios) y la guarda en context['my_reactions'] por (content_type_id, object_id).
+    La consulta filtra por (content_type, object_id, user), cubierta por la restricción unique_reaction.
+    """
+    resolved = context.setdefault('my_reactions', {})
+    request = context.get('request')
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return
+
+    pending = {}
+    for obj in objects:
+        key = (ContentType.objects.get_for_model(obj).id, obj.pk)
+        if key not in resolved:
+            resolved[key] = None
+            pending.setdefault(key[0], []).append(obj.pk)
+    if not pending:
+        return
+
+    targets = Q()
+    for content_type_id, object_ids in pending.items():
+        targets |= Q(content_type_id=content_type_id, object_id__in=object_ids)
+    reactions = Reaction.objects.filter(targets, user=user).values_list('content_type_id', 'object_id', 'is_like')
+    for content_type_id, object_id, is_like in reactions:
+        resolved[(content_type_id, object_id)] = 'like' if is_like else 'dislike'
+
+
+# Campos cuyo valor en el modelo ya es el tipo JSON final: el camino rápido los copia tal cual
+PASSTHROUGH_FIELDS = (serializers.CharField, serializers.IntegerField, serializers.BooleanField)
+_SKIP = object()
+
+
+class FastReadMixin:
+    """
+    Camino rápido de solo lectura para listados. La forma de leer cada campo se compila una vez
+    por serializador (atributo directo, método, serializador anidado...) y cada fila se convierte
+    sin pasar por get_attribute/to_representation genéricos de DRF. El resultado es el mismo.
+    """
+
+    def get_read_plan(self):
+        plan = getattr(self, '_read_plan', None)
+        if plan is None:
+            plan = self._read_plan = [(field.field_name, self._compile_getter(field)) for field in self._readable_fields]
+        return plan
+
+    def _compile_getter(self, field):
+        simple = len(field.source_attrs) == 1
+        if isinstance(field, serializers.SerializerMethodField):
+            return getattr(self, field.method_name)
+        if simple and isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field is None:
+            return attrgetter(self.Meta.model._meta.get_field(field.source).attname)
+        # Las anotaciones pueden faltar (objeto sin anotar): el camino genérico las omite, como DRF
+        annotated = field.source in getattr(self.Meta, 'annotated_fields', ())
+        if simple and isinstance(field, PASSTHROUGH_FIELDS) and not annotated:
+            return attrgetter(field.source)
+        if simple and isinstance(field, FastReadMixin):
+            read, nested = attrgetter(field.source), field
+
+            def get_nested(instance):
+                value = read(instance)
+                return None if value is None else nested.fast_representation(value)
+            return get_nested
+
+        def get_generic(instance):
+            try:
+                attribute = field.get_attribute(instance)
+            except SkipField:
+                return _SKIP
+            check_for_none = attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+            return None if check_for_none is None else field.to_representation(attribute)
+        return get_generic
+
+    def fast_representation(self, instance):
+        ret = {}
+        for name, getter in self.get_read_plan():
+            value = getter(instance)
+            if value is not _SKIP:
+                ret[name] = value
+        return ret
+
+
+class SparseFieldsMixin:
+    """
+    Acepta `fields=[...]` al construir el serializador y devuelve solo esos campos
+    (sparse fieldsets). Con many=True el argumento llega a cada hijo.
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    def get_only_fields(self):
+        """
+        Columnas que necesitan los campos actuales, en formato de QuerySet.only(); None si
+        algún campo no se puede traducir a columnas (entonces no se recorta la consulta).
+        """
+        model = self.Meta.model
+        only = {model._meta.pk.name}
+        for field in self.fields.values():
+            if field.source == '*':
+                continue  # Calculado a partir del objeto (p. ej. my_reaction): basta con la pk
+            if field.source in getattr(self.Meta, 'annotated_fields', ()):
+                continue  # Anotación que añade la vista a la consulta: no es una columna
+            try:
+                model_field = model._meta.get_field(field.source)
+            except FieldDoesNotExist:
+                return None
+            if isinstance(field, SparseFieldsMixin):
+                nested = field.get_only_fields()
+                if nested is None:
+                    return None
+                only.update(f'{field.source}__{name}' for name in nested)
+            else:
+                only.add(model_field.name)
+        return only
+
+
+class MyReactionListSerializer(serializers.ListSerializer):
+    """Precarga la reacción del usuario para toda la página antes de serializar cada fila."""
 
+    def to_representation(self, data):
+        rows = list(data.all() if hasattr(data, 'all') else data)
+        targets = []
+        for row in rows:
+            targets.extend(self.child.get_reaction_targets(row))
+        with timer('serialize'):
+            if 'my_reaction' in self.child.fields:
+                load_my_reactions(self.context, targets)
+            if isinstance(self.child, FastReadMixin):
+                return [self.child.fast_representation(row) for row in rows]
+            return super().to_representation(rows)
 
-class UserSerializer(serializers.ModelSerializer):
+
+class MyReactionMixin(serializers.Serializer):
+    """Añade `my_reaction` ('like', 'dislike' o None) para el usuario que hace la petición."""
+    my_reaction = serializers.SerializerMethodField()
+
+    def to_representation(self, instance):
+        with timer('serialize'):
+            return super().to_representation(instance)
+
+    def get_reaction_targets(self, obj):
+        # Objetos cuya reacción se precarga junto con `obj` al serializar una lista
+        return [obj]
+
+    def get_my_reaction(self, obj):
+        key = (ContentType.objects.get_for_model(obj).id, obj.pk)
+        resolved = self.context.setdefault('my_reactions', {})
+        if key not in resolved:
+            # Serialización individual (detalle): una consulta para este objeto
+            load_my_reactions(self.context, [obj])
+        return resolved.get(key)
+
+
+
+class UserSerializer(SparseFieldsMixin, FastReadMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username']
 
-class PostSerializer(serializers.ModelSerializer):
+class PostSerializer(SparseFieldsMixin, FastReadMixin, MyReactionMixin, serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
-    likes_count = serializers.IntegerField(read_only=True, default=0)
-    dislikes_count = serializers.IntegerField(read_only=True, default=0)
+    # Anotaciones de blog.counters.comment_stats; se omiten si el objeto no las trae (p. ej. recién creado)
+    comments_count = serializers.IntegerField(read_only=True)
+    last_comment_at = serializers.DateTimeField(read_only=True)
+    commenters_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Post
-        fields = ['id', 'title', 'content', 'author', 'created_at', 'updated_at', 'likes_count', 'dislikes_count']
-        read_only_fields = ['author']
+        list_serializer_class = MyReactionListSerializer
+        fields = [
+            'id', 'title', 'content', 'excerpt', 'author', 'created_at', 'updated_at', 'likes_count', 'dislikes_count',
+            'comments_count', 'last_comment_at', 'commenters_count', 'my_reaction',
+        ]
+        read_only_fields = ['author', 'excerpt', 'likes_count', 'dislikes_count']
+        annotated_fields = ['comments_count', 'last_comment_at', 'commenters_count']
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsMixin, FastReadMixin, MyReactionMixin, serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
-    likes_count = serializers.IntegerField(read_only=True, default=0)
-    dislikes_count = serializers.IntegerField(read_only=True, default=0)
 
     class Meta:
         model = Comment
-        fields = ['id', 'post', 'author', 'content', 'created_at', 'likes_count', 'dislikes_count']
-        read_only_fields = ['author']
+        list_serializer_class = MyReactionListSerializer
+        fields = ['id', 'post', 'author', 'content', 'created_at', 'likes_count', 'dislikes_count', 'my_reaction']
+        read_only_fields = ['author', 'likes_count', 'dislikes_count']
+
+class FeedPostSerializer(PostSerializer):
+    """
+    Post con sus primeros BLOG_FEED_COMMENTS comentarios embebidos, para el endpoint /api/feed/.
+    comments_next enlaza con la página de /api/comments/?post= que sigue al último embebido
+    (None si ya están todos), con la que el cliente carga el resto.
+    """
+    # feed_comments: Prefetch recortada de FeedViewSet
+    comments = CommentSerializer(source='feed_comments', many=True, read_only=True)
+    comments_next = serializers.SerializerMethodField()
+
+    class Meta(PostSerializer.Meta):
+        fields = PostSerializer.Meta.fields + ['comments', 'comments_next']
+
+    def get_comments_next(self, obj):
+        comments = obj.feed_comments
+        if len(comments) >= getattr(obj, 'comments_count', 0):
+            return None
+        url = f"{reverse('comment-list')}?post={obj.pk}"
+        request = self.context.get('request')
+        if request is not None:
+            url = request.build_absolute_uri(url)
+        if not comments:
+            return url
+        return CommentCursorPagination().link_after(url, comments[len(comments) - 1])
+
+    def get_reaction_targets(self, obj):
+        # Las reacciones de los comentarios embebidos se resuelven en la misma consulta que las del post
+        return [obj, *obj.feed_comments]
+
+class ReactionTargetField(serializers.Field):
+    """
+    Tipo de objeto reaccionado. Acepta el nombre del modelo ('post' o 'comment') o,
+    por compatibilidad, el id numérico del ContentType. Se resuelve con la caché en
+    memoria de ContentType, sin consultar la base de datos.
+    """
+    default_error_messages = {
+        'invalid': 'Tipo de contenido no soportado para reacción: "{value}".',
+    }
+
+    def get_attribute(self, instance):
+        # Evita cargar el ContentType relacionado solo para devolver su id
+        return instance.content_type_id
+
+    def to_representation(self, value):
+        return value
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) and not data.isdigit():
+            model = REACTION_MODELS.get(data.lower())
+        else:
+            try:
+                content_type = ContentType.objects.get_for_id(int(data))
+            except (TypeError, ValueError, ContentType.DoesNotExist):
+                self.fail('invalid', value=data)
+            model = content_type.model_class()
+            if model not in REACTION_MODELS.values():
+                model = None
+        if model is None:
+            self.fail('invalid', value=data)
+        return ContentType.objects.get_for_model(model)
+
 
 class ReactionSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
+    content_type = ReactionTargetField()
 
     class Meta:
         model = Reaction
         fields = ['id', 'content_type', 'object_id', 'user', 'is_like', 'created_at']
-        read_only_fields = ['user']
\ No newline at end of file
+        read_only_fields = ['user']
+
+    def validate(self, attrs):
+        # Sin esta comprobación se crearían reacciones huérfanas (ver purge_orphan_reactions)
+        model = attrs['content_type'].model_class()
+        if not model.objects.filter(pk=attrs['object_id']).exists():
+            raise serializers.ValidationError({'object_id': f'No existe ningún {model._meta.verbose_name} con ese id.'})
+        return attrs
+
+class ReactionOperationSerializer(serializers.Serializer):
+    """Un toggle dentro de /api/reactions/batch/."""
+    content_type = ReactionTargetField()
+    object_id = serializers.IntegerField(min_value=1)
+    is_like = serializers.BooleanField()
+
+
+class ReactionBatchSerializer(serializers.Serializer):
+    operations = ReactionOperationSerializer(many=True, allow_empty=False, max_length=settings.BLOG_REACTION_BATCH_MAX)
@@ -0,0 +1,96 @@
+# blog/signals.py
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import forget_tokens, user_token_keys
+from .cache import invalidate
+from .counters import release_reactions
+from .events import publish
+from .models import Post, Comment, Reaction
+from .ranking import refresh_hot_scores
+from .search import index_objects, unindex_objects
+from .serializers import CommentSerializer, PostSerializer
+
+# Lo que se publica de cada objeto: my_reaction depende de quién escucha, así que no va
+EVENT_SERIALIZERS = {
+    Post: (PostSerializer, [name for name in PostSerializer.Meta.fields if name != 'my_reaction']),
+    Comment: (CommentSerializer, [name for name in CommentSerializer.Meta.fields if name != 'my_reaction']),
+}
+
+
+@receiver([post_save, post_delete], sender=Post)
+def invalidate_post_caches(sender, instance, **kwargs):
+    invalidate('posts')
+
+
+@receiver([post_save, post_delete], sender=Comment)
+def invalidate_comment_caches(sender, instance, **kwargs):
+    invalidate('comments', f'comments:{instance.post_id}')
+
+
+@receiver([post_save, post_delete], sender=Comment)
+def rerank_commented_post(sender, instance, signal, created=False, **kwargs):
+    # Altas y bajas cambian el hot_score del post, que cuenta sus comentarios; las ediciones no
+    if signal is post_delete or created:
+        refresh_hot_scores(Post, [instance.post_id])
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def index_for_search(sender, instance, **kwargs):
+    index_objects(sender, [instance.pk])
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+def unindex_for_search(sender, instance, **kwargs):
+    unindex_objects(sender, [instance.pk])
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def publish_saved(sender, instance, created, **kwargs):
+    def event():
+        serializer_class, fields = EVENT_SERIALIZERS[sender]
+        return {
+            'action': 'created' if created else 'updated', 'id': instance.pk,
+            'data': serializer_class(instance, fields=fields).data,
+        }
+    publish(sender._meta.model_name, event)
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+def publish_deleted(sender, instance, **kwargs):
+    event = {'action': 'deleted', 'id': instance.pk}
+    if sender is Comment:
+        event['post'] = instance.post_id
+    publish(sender._meta.model_name, event)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_token_cache(sender, instance, **kwargs):
+    # Logout o rotación del token; se repite al hacer commit por si otra petición lo recacheó entretanto
+    keys = [instance.key]
+    forget_tokens(keys)
+    transaction.on_commit(lambda: forget_tokens(keys))
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_token_cache(sender, instance, created, **kwargs):
+    # Desactivación, cambio de contraseña o de permisos: el usuario cacheado queda obsoleto
+    if not created:
+        keys = user_token_keys(instance.pk)
+        forget_tokens(keys)
+        transaction.on_commit(lambda: forget_tokens(keys))
+
+
+@receiver(pre_delete, sender=User)
+def release_user_reactions(sender, instance, **kwargs):
+    # El Collector borra sus reacciones en cascada sin pasar por blog/reactions.py: se descuentan
+    # aquí, dentro de la transacción del borrado y antes de que desaparezcan
+    release_reactions(Reaction.objects.filter(user=instance))
@@ -11,10 +11,27 @@ const errorMessage = document.getElementById('error-message');
 const logoutButton = document.getElementById('logout-button');
 const postsList = document.getElementById('posts-list');
 
+const postsSentinel = document.getElementById('posts-sentinel');
+
 let authToken = localStorage.getItem('authToken'); // Recupera el token si existe
 
-// Mapeo dinámico de ContentType IDs
-let contentTypeMap = {};
+// Estado de la carga incremental de posts (paginación por cursor)
+let nextPostsUrl = null;
+let isLoadingPosts = false;
+let postsObserver = null;
+
+// IDs de ContentType de los modelos que admiten reacciones, embebidos por el servidor en index.html.
+// La API de reacciones acepta el nombre del modelo ('post'/'comment'), así que no hace falta pedirlos.
+const contentTypeMap = readContentTypeMap();
+
+function readContentTypeMap() {
+    try {
+        return JSON.parse(document.getElementById('content-types').textContent);
+    } catch (error) {
+        // index.html servido sin procesar (p. ej. como estático): bastan los nombres
+        return { post: 'post', comment: 'comment' };
+    }
+}
 
 // --- Funciones de Autenticación ---
 
@@ -48,9 +65,19 @@ async function login(username, password) {
 function logout() {
     authToken = null;
     localStorage.removeItem('authToken'); // Elimina el token
+    responseCache.clear(); // Las respuestas guardadas dependen del usuario
+    pendingReactions = []; // Las reacciones pendientes son del usuario que sale
+    reactionRetries = 0;
+    clearTimeout(reactionFlushTimer);
+    disconnectEvents();
+    localStorage.removeItem('pendingReactions');
     loginSection.style.display = 'block';
     blogContentSection.style.display = 'none';
     postsList.innerHTML = '<p>Cargando posts...</p>'; // Limpia el contenido
+    nextPostsUrl = null;
+    if (postsObserver) {
+        postsObserver.disconnect();
+    }
     hideErrorMessage();
 }
 
@@ -91,20 +118,28 @@ function getCsrfToken() {
  * Actualiza los conteos de likes/dislikes en la UI para un elemento específico.
  * @param {string} type - 'post' o 'comment'
  * @param {string} id - ID del post o comentario
- * @param {object} counts - Objeto con { likes_count, dislikes_count }
+ * @param {object} counts - Objeto con { likes_count, dislikes_count, my_reaction }
  */
 function updateReactionCountsInUI(type, id, counts) {
     let container;
+    // El elemento puede no estar en pantalla (p. ej. reacción enviada desde la cola tras recargar)
     if (type === 'post') {
-        container = document.querySelector(`.post-item .like-button[data-id="${id}"]`).closest('.post-item');
+        container = document.querySelector(`.post-item .like-button[data-id="${id}"]`)?.closest('.post-item');
     } else if (type === 'comment') {
         // Busca el comentario dentro de todos los comments-list para asegurar que sea el correcto
-        container = document.querySelector(`.comment-item .like-button[data-id="${id}"]`).closest('.comment-item');
+        container = document.querySelector(`.comment-item .like-button[data-id="${id}"]`)?.closest('.comment-item');
     }
 
     if (container) {
         container.querySelector('.like-count').textContent = counts.likes_count;
         container.querySelector('.dislike-count').textContent = counts.dislikes_count;
+        // Solo los botones propios del elemento, no los de sus comentarios
+        // Los eventos en vivo no traen my_reaction (depende de quién escucha): se conserva la del DOM
+        if ('my_reaction' in counts) {
+            const buttons = container.querySelector(':scope > .reactions-container');
+            buttons.querySelector('.like-button').classList.toggle('active', counts.my_reaction === 'like');
+            buttons.querySelector('.dislike-button').classList.toggle('active', counts.my_reaction === 'dislike');
+        }
     }
 }
 
@@ -145,40 +180,41 @@ async function apiFetch(url, options = {}) {
     return response;
 }
 
-// Obtiene los IDs de ContentType para posts y comentarios
-async function fetchContentTypeMap() {
-    try {
-        const response = await apiFetch(`${API_BASE_URL}content-types/`);
-        if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
-        contentTypeMap = await response.json();
-    } catch (error) {
-        console.error('Error al obtener ContentType IDs:', error);
+// Última respuesta de cada URL con su ETag, para GET condicionales
+const responseCache = new Map();
+
+// GET condicional: si el servidor responde 304 Not Modified se reutiliza la respuesta guardada
+async function fetchJson(url) {
+    const cached = responseCache.get(url);
+    const headers = {};
+    if (cached?.etag) {
+        headers['If-None-Match'] = cached.etag;
+    }
+    // 'no-store': la revalidación la gestionamos aquí, no la caché HTTP del navegador
+    const response = await apiFetch(url, { headers, cache: 'no-store' });
+    if (response.status === 304 && cached) {
+        return cached.data;
     }
+    if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
+    const data = await response.json();
+    responseCache.set(url, {
+        etag: response.headers.get('ETag'),
+        data
+    });
+    return data;
 }
 
-
-async function fetchPosts() {
+// Obtiene una página del feed: posts con sus comentarios embebidos.
+// La API pagina por cursor y devuelve { results, next, previous }
+async function fetchFeed(url = `${API_BASE_URL}feed/`) {
     try {
-        const response = await apiFetch(`${API_BASE_URL}posts/`);
-        if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
-        return await response.json();
+        return await fetchJson(url);
     } catch (error) {
         console.error('Error al obtener posts:', error);
         if (error.message !== 'Unauthorized') { // No mostrar error si ya manejó el logout
             showErrorMessage('Error al cargar las publicaciones.');
         }
-        return [];
-    }
-}
-
-async function fetchComments(postId) {
-    try {
-        const response = await apiFetch(`${API_BASE_URL}comments/?post=${postId}`);
-        if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
-        return await response.json();
-    } catch (error) {
-        console.error(`Error al obtener comentarios para post ${postId}:`, error);
-        return [];
+        return { results: [], next: null };
     }
 }
 
@@ -199,118 +235,333 @@ async function postComment(postId, content) {
     }
 }
 
-async function postReaction(contentType, objectId, isLike) {
-    try {
-        const typeId = contentTypeMap[contentType];
-        if (!typeId) {
-            throw new Error('Tipo de contenido no soportado para reacción.');
-        }
+// Reacciones pendientes de enviar. Los clics se acumulan y se envían juntos en una sola
+// petición a reactions/batch/; la cola se guarda en localStorage para no perderla si la red cae.
+// Si la red o el servidor fallan, los reintentos se espacian el doble cada vez, hasta un máximo.
+const REACTION_FLUSH_DELAY_MS = 250;
+const REACTION_RETRY_MAX_DELAY_MS = 60000;
+let pendingReactions = JSON.parse(localStorage.getItem('pendingReactions') || '[]');
+let reactionFlushTimer = null;
+let isFlushingReactions = false;
+let reactionRetries = 0; // Fallos seguidos desde el último lote enviado
+
+function savePendingReactions() {
+    localStorage.setItem('pendingReactions', JSON.stringify(pendingReactions));
+}
+
+function scheduleReactionFlush() {
+    const delay = Math.min(REACTION_FLUSH_DELAY_MS * 2 ** reactionRetries, REACTION_RETRY_MAX_DELAY_MS);
+    clearTimeout(reactionFlushTimer);
+    reactionFlushTimer = setTimeout(flushReactions, delay);
+}
+
+function queueReaction(contentType, objectId, isLike) {
+    if (!(contentType in contentTypeMap)) {
+        console.error('Tipo de contenido no soportado para reacción:', contentType);
+        return;
+    }
+    pendingReactions.push({ content_type: contentType, object_id: Number(objectId), is_like: isLike });
+    savePendingReactions();
+    if (reactionRetries === 0) {
+        scheduleReactionFlush();
+    } // Si no, ya hay un reintento programado que se llevará también este clic
+}
 
-        const response = await apiFetch(`${API_BASE_URL}reactions/`, {
+async function flushReactions() {
+    if (isFlushingReactions || pendingReactions.length === 0 || !isAuthenticated()) {
+        return;
+    }
+    isFlushingReactions = true;
+    // El servidor aplica las operaciones en orden, así que el resultado es el de los clics uno a uno
+    const operations = pendingReactions;
+    pendingReactions = [];
+    savePendingReactions();
+    let failed = false;
+    try {
+        const response = await apiFetch(`${API_BASE_URL}reactions/batch/`, {
             method: 'POST',
-            body: JSON.stringify({
-                content_type: typeId,
-                object_id: objectId,
-                is_like: isLike
-            })
+            body: JSON.stringify({ operations })
         });
+        if (response.status >= 500) {
+            failed = true;
+        } else if (!response.ok) {
+            // Un 4xx no mejora reintentándolo: el lote rechazado se descarta
+            reactionRetries = 0;
+            console.error('Reacciones rechazadas:', response.status);
+            showErrorMessage('No se pudo enviar la reacción.');
+        } else {
+            reactionRetries = 0;
+            const data = await response.json();
+            data.counts.forEach(item => updateReactionCountsInUI(item.content_type, item.object_id, item));
+        }
+    } catch (error) {
+        console.error('Error al enviar reacciones:', error);
+        // Fallo de red; tras un 401 (error 'Unauthorized') logout() ya ha vaciado la cola
+        failed = error instanceof TypeError;
+    } finally {
+        isFlushingReactions = false;
+    }
+    if (failed) {
+        // Se devuelven a la cola, delante de los clics nuevos, y se reintenta más tarde
+        pendingReactions = operations.concat(pendingReactions);
+        savePendingReactions();
+        reactionRetries++;
+    }
+    // Reintento, o clics llegados mientras se enviaba el lote. Sin conexión espera al evento 'online'
+    if (pendingReactions.length > 0 && navigator.onLine) {
+        scheduleReactionFlush();
+    }
+}
+
+window.addEventListener('online', () => {
+    reactionRetries = 0;
+    flushReactions();
+});
+
+
+// --- Cambios en Vivo (Server-Sent Events) ---
+
+// Otras pestañas y usuarios ven los comentarios, ediciones y reacciones nuevas sin recargar:
+// el servidor envía solo el cambio y aquí se aplica sobre el DOM.
+let eventSource = null;
+let isConnectingEvents = false;
 
-        // La API de Django/DRF para ReactionViewSet manejará la lógica de toggle (crear/actualizar/eliminar)
-        // La API devolverá 201 (Created), 200 (OK/Updated), o 204 (No Content/Deleted)
+async function connectEvents() {
+    if (!window.EventSource || eventSource || isConnectingEvents || !isAuthenticated()) {
+        return;
+    }
+    isConnectingEvents = true;
+    try {
+        // EventSource no envía cabeceras: el flujo se abre con un ticket de corta duración
+        const response = await apiFetch(`${API_BASE_URL}events/ticket/`, { method: 'POST' });
+        if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
         if (response.status === 204) {
-            return { action: 'deleted' };
+            return; // Servidor sin eventos en vivo (modo wsgi)
         }
-        if (!response.ok) {
-            // Si la reacción ya existe y es del mismo tipo, la API la elimina y devuelve 204.
-            // Si hay otro tipo de error, lo lanzamos.
-            const errorData = await response.json();
-            throw new Error(`HTTP error! status: ${response.status}. Details: ${JSON.stringify(errorData)}`);
+        const { ticket } = await response.json();
+        eventSource = new EventSource(`${API_BASE_URL}events/?ticket=${encodeURIComponent(ticket)}`);
+    } catch (error) {
+        console.error('Error al conectar los eventos en vivo:', error);
+        return;
+    } finally {
+        isConnectingEvents = false;
+    }
+
+    eventSource.addEventListener('post', e => handlePostEvent(JSON.parse(e.data)));
+    eventSource.addEventListener('comment', e => handleCommentEvent(JSON.parse(e.data)));
+    eventSource.addEventListener('counts', e => {
+        JSON.parse(e.data).items.forEach(item => updateReactionCountsInUI(item.content_type, item.object_id, item));
+    });
+    // Se han perdido eventos: lo único seguro es recargar
+    eventSource.addEventListener('resync', () => displayBlogContent());
+    eventSource.onerror = () => {
+        // EventSource reconecta solo; si el servidor rechaza la conexión (ticket caducado) hace falta uno nuevo
+        if (eventSource && eventSource.readyState === EventSource.CLOSED) {
+            eventSource = null;
+            setTimeout(connectEvents, 5000);
         }
-        return { action: 'created_or_updated', data: await response.json() };
+    };
+}
 
-    } catch (error) {
-        console.error('Error al enviar reacción:', error);
-        if (error.message !== 'Unauthorized') {
-            showErrorMessage('No se pudo enviar la reacción.');
+function disconnectEvents() {
+    if (eventSource) {
+        eventSource.close();
+        eventSource = null;
+    }
+}
+
+function handlePostEvent(event) {
+    const element = postsList.querySelector(`.post-item[data-id="${event.id}"]`);
+    if (event.action === 'deleted') {
+        element?.remove();
+    } else if (event.action === 'created') {
+        if (!element) {
+            if (!postsList.querySelector('.post-item')) {
+                postsList.innerHTML = ''; // Quita "No hay publicaciones disponibles."
+            }
+            renderPost({ ...event.data, comments: [] }, true);
+            attachEventListeners();
         }
-        return null;
+    } else if (element) {
+        // Texto, nunca HTML: el contenido lo escriben los usuarios
+        element.querySelector('.post-title').textContent = event.data.title;
+        element.querySelector('.post-content').textContent = event.data.content;
+    }
+}
+
+function handleCommentEvent(event) {
+    if (event.action === 'created') {
+        addCommentToUI(event.data);
+        return;
+    }
+    const element = postsList.querySelector(`.comment-item[data-id="${event.id}"]`);
+    if (event.action === 'deleted') {
+        if (element) {
+            adjustCommentsCount(event.post, -1);
+            element.remove();
+        }
+    } else if (element) {
+        element.querySelector('.comment-content').textContent = event.data.content;
     }
 }
 
+function adjustCommentsCount(postId, delta) {
+    const count = postsList.querySelector(`.comments-section[data-post-id="${postId}"] .comments-count`);
+    if (count) {
+        count.textContent = Number(count.textContent) + delta;
+    }
+}
+
+// Añade un comentario al final de los de su post, si el post está en pantalla y el comentario aún no
+function addCommentToUI(comment) {
+    const list = postsList.querySelector(`.comments-section[data-post-id="${comment.post}"] .comments-list`);
+    if (!list || list.querySelector(`.comment-item[data-id="${comment.id}"]`)) {
+        return;
+    }
+    if (!list.querySelector('.comment-item')) {
+        list.innerHTML = ''; // Quita "No hay comentarios."
+    }
+    list.appendChild(renderComment(comment));
+    adjustCommentsCount(comment.post, 1);
+    attachEventListeners();
+}
+
 
 // --- Renderizado del Contenido del Blog ---
 
+// Marca el botón de la reacción que ya hizo el usuario actual
+function activeClass(item, reaction) {
+    return item.my_reaction === reaction ? ' active' : '';
+}
+
+function renderComment(comment) {
+    const commentElement = document.createElement('div');
+    commentElement.className = 'comment-item';
+    commentElement.dataset.id = comment.id;
+    commentElement.innerHTML = `
+        <p><strong class="comment-author"></strong> <span class="comment-content"></span></p>
+        <div class="reactions-container">
+            <button class="like-button${activeClass(comment, 'like')}" data-type="comment" data-id="${comment.id}" data-is-like="true">
+                👍 <span class="like-count">${comment.likes_count}</span>
+            </button>
+            <button class="dislike-button${activeClass(comment, 'dislike')}" data-type="comment" data-id="${comment.id}" data-is-like="false">
+                👎 <span class="dislike-count">${comment.dislikes_count}</span>
+            </button>
+        </div>
+    `;
+    // Los textos de los usuarios (también los que llegan por /api/events/) se asignan como texto
+    commentElement.querySelector('.comment-author').textContent = `${comment.author ? comment.author.username : 'Desconocido'}:`;
+    commentElement.querySelector('.comment-content').textContent = comment.content;
+    return commentElement;
+}
+
+function renderPost(post, prepend = false) {
+    const postElement = document.createElement('div');
+    postElement.className = 'post-item';
+    postElement.dataset.id = post.id;
+    postElement.innerHTML = `
+        <h3 class="post-title"></h3>
+        <p>Autor: <span class="post-author"></span></p>
+        <p class="post-content"></p>
+        <p><small>Publicado: ${new Date(post.created_at).toLocaleDateString()}</small></p>
+        <div class="reactions-container">
+            <button class="like-button${activeClass(post, 'like')}" data-type="post" data-id="${post.id}" data-is-like="true">
+                👍 <span class="like-count">${post.likes_count}</span>
+            </button>
+            <button class="dislike-button${activeClass(post, 'dislike')}" data-type="post" data-id="${post.id}" data-is-like="false">
+                👎 <span class="dislike-count">${post.dislikes_count}</span>
+            </button>
+        </div>
+        <div class="comments-section" data-post-id="${post.id}">
+            <h4>Comentarios (<span class="comments-count">${post.comments_count ?? post.comments.length}</span>):</h4>
+            <div class="comments-list"></div>
+            <form class="comment-form">
+                <textarea placeholder="Deja tu comentario..." required></textarea>
+                <button type="submit">Enviar Comentario</button>
+            </form>
+        </div>
+    `;
+    postElement.querySelector('.post-title').textContent = post.title;
+    postElement.querySelector('.post-author').textContent = post.author ? post.author.username : 'Desconocido';
+    postElement.querySelector('.post-content').textContent = post.content;
+    if (prepend) {
+        postsList.prepend(postElement);
+    } else {
+        postsList.appendChild(postElement);
+    }
+
+    // El feed embebe los primeros comentarios; comments_next enlaza con la página del resto
+    const commentsListElement = postElement.querySelector('.comments-list');
+    if (post.comments.length > 0) {
+        post.comments.forEach(comment => commentsListElement.appendChild(renderComment(comment)));
+    } else {
+        commentsListElement.innerHTML = '<p>No hay comentarios.</p>';
+    }
+    if (post.comments_next) {
+        const moreButton = document.createElement('button');
+        moreButton.className = 'more-comments-button';
+        moreButton.textContent = 'Ver más comentarios';
+        moreButton.dataset.next = post.comments_next;
+        commentsListElement.after(moreButton);
+    }
+}
+
+// Carga y renderiza la siguiente página de posts, si la hay
+async function loadNextPostsPage() {
+    if (isLoadingPosts || !nextPostsUrl) {
+        return;
+    }
+    isLoadingPosts = true;
+    try {
+        const page = await fetchFeed(nextPostsUrl);
+        nextPostsUrl = page.next;
+        page.results.forEach(renderPost);
+        // Adjuntar event listeners para comentarios y reacciones de los posts nuevos
+        attachEventListeners();
+    } finally {
+        isLoadingPosts = false;
+    }
+}
+
+// Observa el final de la lista para pedir más posts al hacer scroll
+function observePostsSentinel() {
+    if (postsObserver) {
+        postsObserver.disconnect();
+    }
+    postsObserver = new IntersectionObserver(async (entries) => {
+        if (entries.some(entry => entry.isIntersecting)) {
+            await loadNextPostsPage();
+        }
+    }, { rootMargin: '400px' });
+    postsObserver.observe(postsSentinel);
+}
+
 async function displayBlogContent() {
     if (isAuthenticated()) {
-        if (!contentTypeMap.post || !contentTypeMap.comment) {
-            await fetchContentTypeMap();
-        }
         loginSection.style.display = 'none';
         blogContentSection.style.display = 'block';
         postsList.innerHTML = '<p>Cargando publicaciones...</p>'; // Mensaje de carga
 
-        const posts = await fetchPosts();
+        const page = await fetchFeed();
         postsList.innerHTML = ''; // Limpiar mensaje de carga
 
-        if (posts.length === 0) {
+        if (page.results.length === 0) {
             postsList.innerHTML = '<p>No hay publicaciones disponibles.</p>';
             return;
         }
 
-        for (const post of posts) {
-            const postElement = document.createElement('div');
-            postElement.className = 'post-item';
-            postElement.innerHTML = `
-                <h3>${post.title}</h3>
-                <p>Autor: ${post.author ? post.author.username : 'Desconocido'}</p>
-                <p>${post.content}</p>
-                <p><small>Publicado: ${new Date(post.created_at).toLocaleDateString()}</small></p>
-                <div class="reactions-container">
-                    <button class="like-button" data-type="post" data-id="${post.id}" data-is-like="true">
-                        👍 <span class="like-count">${post.likes_count}</span>
-                    </button>
-                    <button class="dislike-button" data-type="post" data-id="${post.id}" data-is-like="false">
-                        👎 <span class="dislike-count">${post.dislikes_count}</span>
-                    </button>
-                </div>
-                <div class="comments-section" data-post-id="${post.id}">
-                    <h4>Comentarios:</h4>
-                    <div class="comments-list"></div>
-                    <form class="comment-form">
-                        <textarea placeholder="Deja tu comentario..." required></textarea>
-                        <button type="submit">Enviar Comentario</button>
-                    </form>
-                </div>
-            `;
-            postsList.appendChild(postElement);
-
-            // Cargar comentarios para cada post
-            const commentsListElement = postElement.querySelector('.comments-list');
-            const comments = await fetchComments(post.id);
-            if (comments.length > 0) {
-                comments.forEach(comment => {
-                    const commentElement = document.createElement('div');
-                    commentElement.className = 'comment-item';
-                    commentElement.innerHTML = `
-                        <p><strong>${comment.author ? comment.author.username : 'Desconocido'}:</strong> ${comment.content}</p>
-                        <div class="reactions-container">
-                            <button class="like-button" data-type="comment" data-id="${comment.id}" data-is-like="true">
-                                👍 <span class="like-count">${comment.likes_count}</span>
-                            </button>
-                            <button class="dislike-button" data-type="comment" data-id="${comment.id}" data-is-like="false">
-                                👎 <span class="dislike-count">${comment.dislikes_count}</span>
-                            </button>
-                        </div>
-                    `;
-                    commentsListElement.appendChild(commentElement);
-                });
-            } else {
-                commentsListElement.innerHTML = '<p>No hay comentarios.</p>';
-            }
-        }
-        // Después de renderizar todos los posts, adjuntar event listeners para comentarios y reacciones
+        page.results.forEach(renderPost);
+        // Después de renderizar la primera página, adjuntar event listeners para comentarios y reacciones
         attachEventListeners();
 
+        // El resto de páginas se carga a medida que el usuario hace scroll
+        nextPostsUrl = page.next;
+        observePostsSentinel();
+
+        // Reacciones que quedaron en cola en una sesión anterior sin conexión
+        flushReactions();
+        connectEvents();
+
     } else {
         loginSection.style.display = 'block';
         blogContentSection.style.display = 'none';
@@ -326,7 +577,13 @@ loginForm.addEventListener('submit', async (e) => {
     await login(username, password);
 });
 
-logoutButton.addEventListener('click', () => {
+logoutButton.addEventListener('click', async () => {
+    // Revoca el token en el servidor (y en su caché de autenticación) antes de olvidarlo aquí
+    try {
+        await apiFetch(`${API_BASE_URL}logout/`, { method: 'POST' });
+    } catch (error) {
+        console.error('Error al revocar el token:', error);
+    }
     logout();
 });
 
@@ -341,6 +598,38 @@ function attachEventListeners() {
         button.removeEventListener('click', handleReactionClick);
         button.addEventListener('click', handleReactionClick);
     });
+
+    document.querySelectorAll('.more-comments-button').forEach(button => {
+        button.removeEventListener('click', handleMoreCommentsClick);
+        button.addEventListener('click', handleMoreCommentsClick);
+    });
+}
+
+// Carga la siguiente página de comentarios de un post del feed
+async function handleMoreCommentsClick(e) {
+    const button = e.currentTarget;
+    const list = button.closest('.comments-section').querySelector('.comments-list');
+    button.disabled = true;
+    try {
+        const page = await fetchJson(button.dataset.next);
+        page.results
+            // Los que ya llegaron en vivo no se repiten
+            .filter(comment => !list.querySelector(`.comment-item[data-id="${comment.id}"]`))
+            .forEach(comment => list.appendChild(renderComment(comment)));
+        attachEventListeners();
+        if (page.next) {
+            button.dataset.next = page.next;
+            button.disabled = false;
+        } else {
+            button.remove();
+        }
+    } catch (error) {
+        console.error('Error al cargar comentarios:', error);
+        button.disabled = false;
+        if (error.message !== 'Unauthorized') {
+            showErrorMessage('No se pudieron cargar los comentarios.');
+        }
+    }
 }
 
 async function handleCommentSubmit(e) {
@@ -354,9 +643,8 @@ async function handleCommentSubmit(e) {
         const newComment = await postComment(postId, content);
         if (newComment) {
             textarea.value = ''; // Limpiar textarea
-            // Opcional: Podríamos insertar el comentario directamente en el DOM
-            // Para simplificar y asegurar consistencia, recargamos la sección de blog.
-            await displayBlogContent();
+            // Se inserta directamente; si el evento en vivo llega después, se ignora por su id
+            addCommentToUI(newComment);
         }
     }
 }
@@ -367,34 +655,8 @@ async function handleReactionClick(e) {
     const id = button.dataset.id;
     const isLike = button.dataset.isLike === 'true'; // Convertir string a booleano
 
-    const result = await postReaction(type, id, isLike);
-    if (result) {
-        // Después de una reacción, en lugar de recargar TODO el blog,
-        // podríamos buscar el post/comentario afectado y actualizar SOLO sus conteos.
-        // Para esta versión, haremos una recarga más eficiente.
-
-        // Refrescar solo los conteos del elemento afectado
-        // Primero, obtener los datos actualizados de ese post/comment específico
-        let updatedItem;
-        if (type === 'post') {
-            const response = await apiFetch(`${API_BASE_URL}posts/${id}/`);
-            if (response.ok) {
-                updatedItem = await response.json();
-            }
-        } else if (type === 'comment') {
-            const response = await apiFetch(`${API_BASE_URL}comments/${id}/`);
-            if (response.ok) {
-                updatedItem = await response.json();
-            }
-        }
-
-        if (updatedItem) {
-            updateReactionCountsInUI(type, id, {
-                likes_count: updatedItem.likes_count,
-                dislikes_count: updatedItem.dislikes_count
-            });
-        }
-    }
+    // La respuesta del lote trae los conteos actualizados: no hace falta volver a pedir el elemento
+    queueReaction(type, id, isLike);
 }
 
 // --- Inicialización ---
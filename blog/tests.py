@@ -1,10 +1,62 @@
+import inspect
+import json
+import os
+import tempfile
+import threading
+import time
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
 from django.contrib.auth.models import User
 from django.contrib.contenttypes.models import ContentType
-from rest_framework import status
+from rest_framework import serializers, status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.authtoken.models import Token
 from rest_framework.test import APITestCase
-from django.test import SimpleTestCase
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.models import Prefetch, QuerySet
+from django.db.models.signals import post_delete
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+
+from .models import EXCERPT_LENGTH, Post, Comment, Reaction, hot_score
+from .cache import invalidate
+from .counters import comment_stats
+from .checks import check_auth_cache, check_events_backend
+from . import deletion, events
+from .pagination import PostCursorPagination
+from .reactions import delete_reaction, toggle_reaction
+from .export import Importer
+from .renderers import FastJSONRenderer
+from .serializers import CommentSerializer, FeedPostSerializer, PostSerializer
+from .warmup import PHASES, warm_up
+
 
-from .models import Post, Comment, Reaction
+class QueryCountMixin:
+    """
+    Utilidades para detectar N+1: el número de consultas de un listado no debe
+    crecer con el número de filas devueltas.
+    """
+
+    def get_with_query_count(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, len(ctx.captured_queries)
+
+    def assertQueryCountDoesNotScale(self, url, add_rows):
+        """Mide `url`, llama a `add_rows()` para añadir filas y comprueba que el coste no cambia."""
+        response, before = self.get_with_query_count(url)
+        add_rows()
+        response_after, after = self.get_with_query_count(url)
+        self.assertGreater(len(response_after.content), len(response.content), "add_rows() no añadió filas visibles")
+        self.assertEqual(after, before, f"{url}: {before} consultas antes y {after} después de añadir filas")
 
 
 class PostViewSetTests(APITestCase):
@@ -17,7 +69,7 @@ class PostViewSetTests(APITestCase):
         Post.objects.create(title="Second Post", content="More", author=self.user2)
         response = self.client.get("/api/posts/")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)
+        self.assertEqual(len(response.data["results"]), 2)
 
     def test_post_creation_requires_authentication(self):
         data = {"title": "New", "content": "New content"}
@@ -74,6 +126,269 @@ class CommentViewSetTests(APITestCase):
         self.assertEqual(response.data["content"], "Updated")
 
 
+@override_settings(BLOG_RESPONSE_CACHE_TIMEOUT=0) # Se mide el coste de la consulta, no de la caché
+class CommentFilterTests(APITestCase):
+    def setUp(self):
+        self.user1 = User.objects.create_user(username="user1", password="pass123")
+        self.user2 = User.objects.create_user(username="user2", password="pass123")
+        self.post = Post.objects.create(title="Post", content="Content", author=self.user1)
+        self.other_post = Post.objects.create(title="Other", content="Content", author=self.user1)
+        for i in range(3):
+            Comment.objects.create(post=self.post, author=self.user1, content=f"Comment {i}")
+
+    def _get(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, len(ctx.captured_queries)
+
+    def test_filter_by_post(self):
+        response, _ = self._get(f"/api/comments/?post={self.post.id}")
+        self.assertEqual(len(response.data["results"]), 3)
+        self.assertTrue(all(c["post"] == self.post.id for c in response.data["results"]))
+
+    def test_filtered_cost_ignores_other_posts(self):
+        url = f"/api/comments/?post={self.post.id}"
+        response, queries = self._get(url)
+        size = len(response.content)
+
+        # Muchos comentarios en otro post no deben afectar al listado filtrado
+        for i in range(20):
+            Comment.objects.create(post=self.other_post, author=self.user2, content=f"Noise {i}")
+
+        response, queries_after = self._get(url)
+        self.assertEqual(queries_after, queries)
+        self.assertEqual(len(response.content), size)
+
+    def test_filter_by_author_and_date_range(self):
+        comment = Comment.objects.create(post=self.other_post, author=self.user2, content="Late")
+        response, _ = self._get(f"/api/comments/?author={self.user2.id}")
+        self.assertEqual([c["id"] for c in response.data["results"]], [comment.id])
+
+        since = comment.created_at.isoformat().replace("+00:00", "Z")
+        response, _ = self._get(f"/api/comments/?created_after={since}")
+        self.assertEqual([c["id"] for c in response.data["results"]], [comment.id])
+        response, _ = self._get(f"/api/comments/?created_before={since}")
+        self.assertEqual(len(response.data["results"]), 3)
+
+    def test_invalid_filter_returns_400(self):
+        response = self.client.get("/api/comments/?post=abc")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get("/api/comments/?created_after=yesterday")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class CursorPaginationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="user", password="pass123")
+        self.posts = [
+            Post.objects.create(title=f"Post {i}", content="Content", author=self.user)
+            for i in range(5)
+        ]
+
+    def test_posts_are_paginated_newest_first(self):
+        response = self.client.get("/api/posts/?page_size=2")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [p["id"] for p in response.data["results"]],
+            [self.posts[4].id, self.posts[3].id],
+        )
+        self.assertIsNotNone(response.data["next"])
+        self.assertIsNone(response.data["previous"])
+
+    def test_pages_are_stable_under_inserts(self):
+        seen = []
+        url = "/api/posts/?page_size=2"
+        first = True
+        while url:
+            response = self.client.get(url)
+            seen.extend(p["id"] for p in response.data["results"])
+            if first:
+                # Un post nuevo entre páginas no debe duplicar ni saltar resultados
+                Post.objects.create(title="Late", content="Content", author=self.user)
+                first = False
+            url = response.data["next"]
+        self.assertEqual(seen, [p.id for p in reversed(self.posts)])
+
+    def test_page_size_is_capped(self):
+        with mock.patch.object(PostCursorPagination, "max_page_size", 3):
+            response = self.client.get("/api/posts/?page_size=1000")
+        self.assertEqual(len(response.data["results"]), 3)
+
+    def test_comments_are_paginated_oldest_first(self):
+        comments = [
+            Comment.objects.create(post=self.posts[0], author=self.user, content=str(i))
+            for i in range(3)
+        ]
+        response = self.client.get(f"/api/comments/?post={self.posts[0].id}&page_size=2")
+        self.assertEqual([c["id"] for c in response.data["results"]], [comments[0].id, comments[1].id])
+        response = self.client.get(response.data["next"])
+        self.assertEqual([c["id"] for c in response.data["results"]], [comments[2].id])
+        self.assertIsNone(response.data["next"])
+
+
+class FeedTests(QueryCountMixin, APITestCase):
+    def setUp(self):
+        self.users = [User.objects.create_user(username=f"user{i}", password="pass123") for i in range(3)]
+
+    def _seed(self, posts, comments_per_post):
+        for i in range(posts):
+            post = Post.objects.create(title=f"Post {i}", content="Content", author=self.users[i % 3])
+            for j in range(comments_per_post):
+                Comment.objects.create(post=post, author=self.users[j % 3], content=f"Comment {j}")
+
+    def test_feed_embeds_comments(self):
+        self._seed(posts=2, comments_per_post=2)
+        response, _ = self.get_with_query_count("/api/feed/")
+        post = response.data["results"][0]
+        self.assertEqual(len(post["comments"]), 2)
+        self.assertEqual(post["comments"][0]["author"]["username"], "user0")
+        self.assertIn("likes_count", post["comments"][0])
+
+    @override_settings(BLOG_FEED_COMMENTS=2)
+    def test_feed_embeds_first_comments_and_links_the_rest(self):
+        self._seed(posts=1, comments_per_post=5)
+        response, _ = self.get_with_query_count("/api/feed/")
+        post = response.data["results"][0]
+        self.assertEqual([c["content"] for c in post["comments"]], ["Comment 0", "Comment 1"])
+        self.assertEqual(post["comments_count"], 5)
+        response = self.client.get(post["comments_next"])
+        self.assertEqual([c["content"] for c in response.data["results"]], ["Comment 2", "Comment 3", "Comment 4"])
+        self._seed(posts=1, comments_per_post=2)
+        response = self.client.get("/api/feed/")
+        self.assertIsNone(response.data["results"][0]["comments_next"])
+
+    def test_feed_query_count_is_constant(self):
+        self._seed(posts=2, comments_per_post=1)
+        self.assertQueryCountDoesNotScale("/api/feed/", lambda: self._seed(posts=8, comments_per_post=5))
+
+
+class RelatedLoadingTests(QueryCountMixin, APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username="admin", password="pass123")
+        self.post = Post.objects.create(title="Post", content="Content", author=self.admin)
+        self.post_ct = ContentType.objects.get_for_model(Post)
+        self.comment_ct = ContentType.objects.get_for_model(Comment)
+
+    def _add_rows(self):
+        start = User.objects.count()
+        for i in range(start, start + 5):
+            user = User.objects.create(username=f"extra{i}")
+            post = Post.objects.create(title=f"Extra {i}", content="Content", author=user)
+            comment = Comment.objects.create(post=self.post, author=user, content=f"Comment {i}")
+            Reaction.objects.create(user=user, content_type=self.post_ct, object_id=post.id, is_like=True)
+            Reaction.objects.create(user=user, content_type=self.comment_ct, object_id=comment.id, is_like=False)
+
+    def test_api_lists_do_not_scale_with_rows(self):
+        self.client.force_authenticate(user=self.admin)
+        for url in ["/api/posts/", f"/api/comments/?post={self.post.id}", "/api/reactions/?scope=all"]:
+            with self.subTest(url=url):
+                self.assertQueryCountDoesNotScale(url, self._add_rows)
+
+    def test_admin_changelists_do_not_scale_with_rows(self):
+        self.client.force_login(self.admin)
+        for url in ["/admin/blog/post/", "/admin/blog/comment/", "/admin/blog/reaction/"]:
+            with self.subTest(url=url):
+                self.assertQueryCountDoesNotScale(url, self._add_rows)
+
+
+class AdminScalabilityTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username="admin", password="pass123")
+        User.objects.create_user(username="reader", password="pass123")
+        self.posts = [Post.objects.create(title=f"Post {i}", content="C", author=self.admin) for i in range(5)]
+        self.comment = Comment.objects.create(post=self.posts[0], author=self.admin, content="C")
+        toggle_reaction(self.admin, ContentType.objects.get_for_model(Post), self.posts[0].id, True)
+        toggle_reaction(self.admin, ContentType.objects.get_for_model(Comment), self.comment.id, True)
+        self.client.force_login(self.admin)
+
+    def test_count_is_capped_and_not_repeated(self):
+        with mock.patch("blog.admin.EXACT_COUNT_LIMIT", 3):
+            response = self.client.get("/admin/blog/post/")
+        changelist = response.context["cl"]
+        self.assertEqual(changelist.result_count, 3)
+        self.assertIsNone(changelist.full_result_count)
+
+    def test_reaction_target_filter(self):
+        response = self.client.get("/admin/blog/reaction/", {"target": "comment"})
+        self.assertEqual([r.object_id for r in response.context["cl"].result_list], [self.comment.id])
+
+    def test_foreign_key_widgets_do_not_list_every_row(self):
+        for url in ["/admin/blog/comment/add/", "/admin/blog/post/add/", f"/admin/blog/reaction/{Reaction.objects.first().pk}/change/"]:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                # Autocompletado o id en crudo: ni los posts ni los usuarios se listan en un <select>
+                self.assertNotContains(response, "Post 4")
+                self.assertNotContains(response, "reader")
+
+
+class MyReactionTests(QueryCountMixin, APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="user")
+        self.other = User.objects.create(username="other")
+        self.post_ct = ContentType.objects.get_for_model(Post)
+        self.comment_ct = ContentType.objects.get_for_model(Comment)
+        self.liked = Post.objects.create(title="Liked", content="Content", author=self.user)
+        self.disliked = Post.objects.create(title="Disliked", content="Content", author=self.user)
+        self.comment = Comment.objects.create(post=self.liked, author=self.other, content="Hi")
+        Reaction.objects.create(user=self.user, content_type=self.post_ct, object_id=self.liked.id, is_like=True)
+        Reaction.objects.create(user=self.user, content_type=self.post_ct, object_id=self.disliked.id, is_like=False)
+        Reaction.objects.create(user=self.other, content_type=self.comment_ct, object_id=self.comment.id, is_like=True)
+        self.client.force_authenticate(user=self.user)
+
+    def _reaction_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        return response, [q for q in ctx.captured_queries if '"blog_reaction"' in q["sql"]]
+
+    def test_my_reaction_in_post_list(self):
+        response, queries = self._reaction_queries("/api/posts/")
+        by_id = {p["id"]: p["my_reaction"] for p in response.data["results"]}
+        self.assertEqual(by_id, {self.liked.id: "like", self.disliked.id: "dislike"})
+        self.assertEqual(len(queries), 1)
+
+    def test_feed_resolves_posts_and_comments_in_one_query(self):
+        response, queries = self._reaction_queries("/api/feed/")
+        liked = next(p for p in response.data["results"] if p["id"] == self.liked.id)
+        self.assertEqual(liked["my_reaction"], "like")
+        self.assertIsNone(liked["comments"][0]["my_reaction"])
+        self.assertEqual(len(queries), 1)
+
+    def test_my_reaction_on_detail_and_anonymous(self):
+        response = self.client.get(f"/api/posts/{self.disliked.id}/")
+        self.assertEqual(response.data["my_reaction"], "dislike")
+        self.client.force_authenticate(user=None)
+        response, queries = self._reaction_queries("/api/posts/")
+        self.assertTrue(all(p["my_reaction"] is None for p in response.data["results"]))
+        self.assertEqual(queries, [])
+
+    def test_query_count_does_not_scale(self):
+        def add_rows():
+            for i in range(5):
+                post = Post.objects.create(title=f"Extra {i}", content="Content", author=self.other)
+                Reaction.objects.create(user=self.user, content_type=self.post_ct, object_id=post.id, is_like=True)
+        self.assertQueryCountDoesNotScale("/api/posts/", add_rows)
+
+    def test_reaction_list_is_scoped_to_user(self):
+        response = self.client.get("/api/reactions/")
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertTrue(all(r["user"]["id"] == self.user.id for r in response.data["results"]))
+        # Las de todos los usuarios, solo para el personal
+        self.assertEqual(self.client.get("/api/reactions/?scope=all").status_code, status.HTTP_403_FORBIDDEN)
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get("/api/reactions/?scope=all")
+        self.assertEqual(len(response.data["results"]), 3)
+
+    def test_reaction_list_is_paginated(self):
+        response = self.client.get("/api/reactions/?page_size=1")
+        self.assertEqual(len(response.data["results"]), 1)
+        response = self.client.get(response.data["next"])
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertIsNone(response.data["next"])
+
+
 class ReactionViewSetTests(APITestCase):
     def setUp(self):
         self.user = User.objects.create_user(username="user", password="pass123")
@@ -96,6 +411,17 @@ class ReactionViewSetTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertEqual(Reaction.objects.count(), 0)
 
+    def test_reaction_to_missing_object_is_rejected(self):
+        self.client.force_authenticate(user=self.user)
+        comment_ct = ContentType.objects.get_for_model(Comment)
+        for content_type, object_id in [(self.ct.id, self.post.id + 1000), (comment_ct.id, self.post.id)]:
+            with self.subTest(content_type=content_type):
+                data = {"content_type": content_type, "object_id": object_id, "is_like": True}
+                response = self.client.post(self.url, data, format="json")
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn("object_id", response.data)
+        self.assertEqual(Reaction.objects.count(), 0)
+
     def test_toggle_like_to_dislike(self):
         self.client.force_authenticate(user=self.user)
         self.client.post(self.url, self.data, format="json")
@@ -107,6 +433,263 @@ class ReactionViewSetTests(APITestCase):
         self.assertFalse(Reaction.objects.first().is_like)
 
 
+class ReactionCounterTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="user", password="pass123")
+        self.post = Post.objects.create(title="Post", content="Content", author=self.user)
+        self.comment = Comment.objects.create(post=self.post, author=self.user, content="Hi")
+        self.client.force_authenticate(user=self.user)
+
+    def _react(self, obj, is_like):
+        ct = ContentType.objects.get_for_model(obj)
+        data = {"content_type": ct.id, "object_id": obj.id, "is_like": is_like}
+        return self.client.post("/api/reactions/", data, format="json")
+
+    def _counts(self, obj):
+        obj.refresh_from_db()
+        return obj.likes_count, obj.dislikes_count
+
+    def test_create_flip_and_toggle_off_update_counters(self):
+        self._react(self.post, True)
+        self.assertEqual(self._counts(self.post), (1, 0))
+        self._react(self.post, False)
+        self.assertEqual(self._counts(self.post), (0, 1))
+        self._react(self.post, False)
+        self.assertEqual(self._counts(self.post), (0, 0))
+
+    def test_deleting_a_user_releases_their_reactions(self):
+        other = User.objects.create_user(username="other", password="pass123")
+        self._react(self.post, True)
+        self._react(self.comment, False)
+        self.client.force_authenticate(user=other)
+        self._react(self.post, True)
+        self.assertEqual(self._counts(self.post), (2, 0))
+        other.delete()
+        self.assertEqual(self._counts(self.post), (1, 0))
+        self.assertEqual(self._counts(self.comment), (0, 1))
+        self.assertEqual(Reaction.objects.count(), 2)
+
+    def test_destroy_updates_counters(self):
+        response = self._react(self.comment, True)
+        self.assertEqual(self._counts(self.comment), (1, 0))
+        self.client.delete(f"/api/reactions/{response.data['id']}/")
+        self.assertEqual(self._counts(self.comment), (0, 0))
+
+    def test_concurrent_destroy_decrements_once(self):
+        response = self._react(self.post, True)
+        reaction = Reaction.objects.get(pk=response.data["id"])
+        # Dos peticiones que han leído la misma reacción: solo la primera la borra y descuenta
+        self.assertTrue(delete_reaction(reaction))
+        self.assertFalse(delete_reaction(reaction))
+        self.assertEqual(self._counts(self.post), (0, 0))
+
+    def test_destroy_uses_current_reaction_type(self):
+        response = self._react(self.post, True)
+        reaction = Reaction.objects.get(pk=response.data["id"])
+        self._react(self.post, False)  # Un toggle concurrente la cambia a dislike
+        self.assertTrue(delete_reaction(reaction))
+        self.assertEqual(self._counts(self.post), (0, 0))
+
+    def test_list_reads_stored_counters_without_aggregates(self):
+        self._react(self.post, True)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get("/api/posts/")
+        self.assertEqual(response.data["results"][0]["likes_count"], 1)
+        aggregates = [q for q in ctx.captured_queries if "COUNT(" in q["sql"].upper() and '"blog_reaction"' in q["sql"]]
+        self.assertEqual(aggregates, [])
+
+    def test_recount_command_repairs_drift(self):
+        self._react(self.post, True)
+        Post.objects.update(likes_count=7, dislikes_count=3)
+        out = StringIO()
+        call_command("recount_reactions", stdout=out)
+        self.assertIn("posts: 1", out.getvalue())
+        self.assertEqual(self._counts(self.post), (1, 0))
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="user")
+        self.post = Post.objects.create(title="Post", content="Content", author=self.user)
+        self.comment = Comment.objects.create(post=self.post, author=self.user, content="Hi")
+
+    def _revalidate(self, url, response, **extra):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"], **extra)
+
+    def test_unchanged_list_returns_304_with_a_single_query(self):
+        url = "/api/posts/"
+        response = self.client.get(url)
+        self.assertIn("ETag", response)
+        self.assertNotIn("Last-Modified", response)
+        with self.assertNumQueries(1):
+            revalidated = self._revalidate(url, response)
+        self.assertEqual(revalidated.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(revalidated["ETag"], response["ETag"])
+
+    def test_if_modified_since_is_ignored(self):
+        # Ni bajas ni comentarios mueven una fecha: solo el ETag decide
+        url = "/api/posts/"
+        since = http_date(time.time() + 60)
+        other = Post.objects.create(title="Otro", content="Content", author=self.user)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=since).status_code, status.HTTP_200_OK)
+        response = self.client.get(url)
+        other.delete()
+        revalidated = self._revalidate(url, response, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(revalidated.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(revalidated.data["results"]), 1)
+
+    def test_new_comment_revalidates_post_list_and_detail(self):
+        urls = ["/api/posts/", f"/api/posts/{self.post.id}/"]
+        responses = {url: self.client.get(url) for url in urls}
+        Comment.objects.create(post=self.post, author=self.user, content="Otro")
+        for url, response in responses.items():
+            with self.subTest(url=url):
+                revalidated = self._revalidate(url, response, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60))
+                self.assertEqual(revalidated.status_code, status.HTTP_200_OK)
+
+    def test_edits_and_reactions_change_the_etag(self):
+        urls = ["/api/posts/", f"/api/posts/{self.post.id}/", f"/api/comments/?post={self.post.id}", "/api/feed/"]
+        responses = {url: self.client.get(url) for url in urls}
+
+        self.client.force_authenticate(user=self.user)
+        data = {"content_type": "comment", "object_id": self.comment.id, "is_like": True}
+        self.client.post("/api/reactions/", data, format="json")
+        self.client.force_authenticate(user=None)
+
+        for url in [f"/api/comments/?post={self.post.id}", "/api/feed/"]:
+            with self.subTest(url=url):
+                self.assertEqual(self._revalidate(url, responses[url]).status_code, status.HTTP_200_OK)
+
+        Post.objects.get(pk=self.post.pk).save()
+        for url in ["/api/posts/", f"/api/posts/{self.post.id}/"]:
+            with self.subTest(url=url):
+                self.assertEqual(self._revalidate(url, responses[url]).status_code, status.HTTP_200_OK)
+
+    def test_etag_depends_on_user(self):
+        url = "/api/posts/"
+        response = self.client.get(url)
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self._revalidate(url, response).status_code, status.HTTP_200_OK)
+
+    def test_missing_object_is_404(self):
+        response = self.client.get("/api/posts/999999/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(BLOG_RESPONSE_CACHE_STATS=True)
+class ResponseCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="user")
+        self.admin = User.objects.create_superuser(username="admin", password="pass123")
+        self.post = Post.objects.create(title="Post", content="Content", author=self.user)
+        self.comment = Comment.objects.create(post=self.post, author=self.user, content="Hi")
+        self.client.force_authenticate(user=self.user)
+
+    def _stats(self):
+        self.client.force_authenticate(user=self.admin)
+        stats = self.client.get("/api/cache-stats/").data
+        self.client.force_authenticate(user=self.user)
+        return stats
+
+    def test_second_read_is_a_hit(self):
+        self.client.get("/api/posts/")
+        with self.assertNumQueries(1): # Solo la huella para el ETag
+            response = self.client.get("/api/posts/")
+        self.assertEqual(response.data["results"][0]["id"], self.post.id)
+        self.assertEqual(self._stats(), {"hits": 1, "misses": 1, "hit_ratio": 0.5})
+
+    def test_reactions_invalidate_cached_counts(self):
+        for url in ["/api/posts/", f"/api/comments/?post={self.post.id}", "/api/feed/"]:
+            self.client.get(url)
+        for target in [("post", self.post.id), ("comment", self.comment.id)]:
+            data = {"content_type": target[0], "object_id": target[1], "is_like": True}
+            self.client.post("/api/reactions/", data, format="json")
+
+        self.assertEqual(self.client.get("/api/posts/").data["results"][0]["likes_count"], 1)
+        comments = self.client.get(f"/api/comments/?post={self.post.id}").data["results"]
+        self.assertEqual((comments[0]["likes_count"], comments[0]["my_reaction"]), (1, "like"))
+        feed = self.client.get("/api/feed/").data["results"][0]
+        self.assertEqual(feed["comments"][0]["likes_count"], 1)
+
+    def test_cache_is_per_user(self):
+        data = {"content_type": "post", "object_id": self.post.id, "is_like": True}
+        self.client.post("/api/reactions/", data, format="json")
+        self.assertEqual(self.client.get("/api/posts/").data["results"][0]["my_reaction"], "like")
+        self.client.force_authenticate(user=self.admin)
+        self.assertIsNone(self.client.get("/api/posts/").data["results"][0]["my_reaction"])
+
+    def test_generation_bump_invalidates_without_data_changes(self):
+        self.client.get("/api/posts/")
+        invalidate("posts")
+        self.client.get("/api/posts/")
+        self.assertEqual(self._stats()["misses"], 2)
+
+    def test_comment_writes_only_invalidate_their_post(self):
+        other = Post.objects.create(title="Other", content="Content", author=self.user)
+        self.client.get(f"/api/comments/?post={self.post.id}")
+        Comment.objects.create(post=other, author=self.user, content="Elsewhere")
+        self.client.get(f"/api/comments/?post={self.post.id}")
+        self.assertEqual(self._stats()["hits"], 1)
+
+    def test_stats_require_admin(self):
+        response = self.client.get("/api/cache-stats/")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(BLOG_RESPONSE_CACHE_STATS=False)
+    def test_hits_do_not_write_without_stats(self):
+        self.client.get("/api/posts/")
+        with mock.patch.object(cache, "incr") as incr, mock.patch.object(cache, "add") as add:
+            self.client.get("/api/posts/")
+        incr.assert_not_called()
+        add.assert_not_called()
+        self.assertIsNone(self._stats()["hits"])
+
+
+class ConcurrentToggleTests(TransactionTestCase):
+    """Toggles en paralelo desde varios hilos: el resultado debe ser el mismo que en serie."""
+
+    def setUp(self):
+        self.author = User.objects.create(username="author")
+        self.post = Post.objects.create(title="Post", content="Content", author=self.author)
+        self.ct = ContentType.objects.get_for_model(Post)
+
+    def _run_in_threads(self, calls):
+        barrier = threading.Barrier(len(calls))
+        errors = []
+
+        def worker(user, is_like):
+            try:
+                barrier.wait()
+                toggle_reaction(user, self.ct, self.post.id, is_like)
+            except Exception as exc:  # pragma: no cover - se informa abajo
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=call) for call in calls]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def test_parallel_double_clicks_are_serialized(self):
+        user = User.objects.create(username="clicker")
+        # Nueve clics iguales equivalen a nueve toggles en serie: termina con el like puesto
+        self._run_in_threads([(user, True)] * 9)
+        self.assertEqual(Reaction.objects.filter(user=user).count(), 1)
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.likes_count, self.post.dislikes_count), (1, 0))
+
+    def test_parallel_users_all_count(self):
+        users = [User.objects.create(username=f"user{i}") for i in range(8)]
+        self._run_in_threads([(user, i % 2 == 0) for i, user in enumerate(users)])
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.likes_count, self.post.dislikes_count), (4, 4))
+        self.assertEqual(Reaction.objects.count(), 8)
+
+
 class AuthenticationTests(APITestCase):
     def setUp(self):
         self.user = User.objects.create_user(username="authuser", password="pass123")
@@ -121,9 +704,838 @@ class AuthenticationTests(APITestCase):
         self.assertEqual(response.data["author"]["username"], "authuser")
 
 
-class IndexPageTests(SimpleTestCase):
+@override_settings(BLOG_AUTH_CACHE_TIMEOUT=60)
+class CachedTokenAuthenticationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="authuser", password="pass123")
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def get_auth_queries(self, url="/api/posts/"):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        return response, [q["sql"] for q in ctx.captured_queries if "authtoken_token" in q["sql"]]
+
+    def test_warm_cache_authenticates_without_queries(self):
+        response, queries = self.get_auth_queries()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(queries), 1)
+        response, queries = self.get_auth_queries()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(queries, [])
+
+    def test_cached_user_is_the_token_owner(self):
+        self.client.get("/api/posts/")
+        response = self.client.post("/api/posts/", {"title": "T", "content": "C"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["author"]["username"], "authuser")
+
+    def test_logout_revokes_cached_token(self):
+        self.client.get("/api/posts/")
+        response = self.client.post("/api/logout/")
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Token.objects.filter(key=self.token.key).exists())
+        self.assertEqual(self.client.get("/api/posts/").status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_token_rotation_revokes_cached_token(self):
+        self.client.get("/api/posts/")
+        self.token.delete()
+        Token.objects.create(user=self.user)
+        self.assertEqual(self.client.get("/api/posts/").status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_user_changes_invalidate_cache(self):
+        # Desactivación y cambio de contraseña pasan por User.save()
+        for change in ["deactivate", "password"]:
+            with self.subTest(change=change):
+                self.user.is_active = True
+                self.user.save()
+                self.assertEqual(self.client.get("/api/posts/").status_code, status.HTTP_200_OK)
+                if change == "deactivate":
+                    self.user.is_active = False
+                else:
+                    self.user.set_password("other")
+                self.user.save()
+                response, queries = self.get_auth_queries()
+                self.assertEqual(len(queries), 1)
+                expected = status.HTTP_401_UNAUTHORIZED if change == "deactivate" else status.HTTP_200_OK
+                self.assertEqual(response.status_code, expected)
+
+    @override_settings(BLOG_AUTH_CACHE_TIMEOUT=0)
+    def test_cache_can_be_disabled(self):
+        self.client.get("/api/posts/")
+        response, queries = self.get_auth_queries()
+        self.assertEqual(len(queries), 1)
+
+    def test_process_local_cache_is_flagged(self):
+        self.assertEqual([w.id for w in check_auth_cache(None)], ["blog.W001"])
+        with self.settings(BLOG_AUTH_CACHE_TIMEOUT=0):
+            self.assertEqual(check_auth_cache(None), [])
+
+
+class SearchTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="user")
+        self.in_title = Post.objects.create(title="Receta de café", content="Texto", author=self.user)
+        self.in_content = Post.objects.create(title="Otra cosa", content="Hablo del café de la mañana", author=self.user)
+        self.other = Post.objects.create(title="Nada", content="Sin relación", author=self.user)
+        self.comment = Comment.objects.create(post=self.other, author=self.user, content="Prefiero el café solo")
+
+    def search(self, q, **params):
+        response = self.client.get("/api/search/", {"q": q, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_ranks_title_matches_first(self):
+        data = self.search("cafe")  # Sin tilde: el índice ignora los diacríticos
+        self.assertEqual([p["id"] for p in data["posts"]], [self.in_title.id, self.in_content.id])
+        self.assertGreater(data["posts"][0]["rank"], data["posts"][1]["rank"])
+        self.assertEqual([c["id"] for c in data["comments"]], [self.comment.id])
+
+    def test_all_terms_must_match_and_last_is_prefix(self):
+        self.assertEqual([p["id"] for p in self.search("café mañ")["posts"]], [self.in_content.id])
+
+    def test_index_follows_saves_and_deletes(self):
+        self.other.title = "Ahora hablo de té"
+        self.other.save()
+        self.assertEqual([p["id"] for p in self.search("ahora")["posts"]], [self.other.id])
+        self.comment.delete()
+        self.assertEqual(self.search("solo")["comments"], [])
+        self.in_title.delete()
+        self.assertEqual([p["id"] for p in self.search("café")["posts"]], [self.in_content.id])
+
+    def test_user_operators_are_treated_as_words(self):
+        # Comillas, OR o NEAR no deben llegar a la sintaxis FTS
+        for q in ['café" OR nada', "NEAR(café)", "café*", 'café"']:
+            with self.subTest(q=q):
+                self.search(q)
+        self.assertEqual(self.search("café OR nada")["posts"], [])
+
+    def test_query_is_required(self):
+        for q in ["", "  ", "¿?"]:
+            with self.subTest(q=q):
+                response = self.client.get("/api/search/", {"q": q})
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_limit(self):
+        self.assertEqual(len(self.search("café", limit=1)["posts"]), 1)
+
+    def test_rebuild_command(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM blog_post_fts")
+        self.assertEqual(self.search("café")["posts"], [])
+        out = StringIO()
+        call_command("rebuild_search_index", stdout=out)
+        self.assertIn("3 filas", out.getvalue())
+        self.assertEqual(len(self.search("café")["posts"]), 2)
+
+
+class BenchmarkCommandTests(TestCase):
+    def test_generate_data_keeps_counters_consistent(self):
+        call_command("generate_data", users=20, posts=30, max_comments=10, batch_size=10, stdout=StringIO())
+        self.assertEqual(Post.objects.count(), 30)
+        out = StringIO()
+        call_command("recount_reactions", dry_run=True, stdout=out)
+        self.assertIn("posts: 0 desviados", out.getvalue())
+        self.assertIn("comments: 0 desviados", out.getvalue())
+
+    def test_benchmark_fails_on_query_regression(self):
+        call_command("generate_data", users=5, posts=5, max_comments=3, stdout=StringIO())
+        args = ["--only", "posts_list", "reaction_toggle", "--iterations", "3", "--warmup", "0"]
+        baseline = {"results": {"posts_list": {"p95_ms": 10_000, "bytes": 10**9, "queries": 0}}}
+        with tempfile.NamedTemporaryFile("w", suffix=".json") as f:
+            json.dump(baseline, f)
+            f.flush()
+            with self.assertRaisesMessage(CommandError, "posts_list"):
+                call_command("benchmark", *args, "--baseline", f.name, stdout=StringIO())
+        # Toggles impares: se deshace la reacción para no alterar los datos medidos
+        self.assertFalse(Reaction.objects.filter(user__username="benchmark").exists())
+
+
+@override_settings(BLOG_PROFILING=True, BLOG_PROFILING_SAMPLE_RATE=1.0, BLOG_PROFILING_CPROFILE_MS=0)
+class ProfilingMiddlewareTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="user")
+        Post.objects.create(title="Post", content="Content", author=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=self.user).key}")
+
+    def test_server_timing_and_log_line(self):
+        with self.assertLogs("blog.profiling", "INFO") as logs:
+            response = self.client.get("/api/posts/")
+        timing = response["Server-Timing"]
+        for metric in ["total;dur=", "db;dur=", "auth;dur=", "serialize;dur=", "render;dur="]:
+            self.assertIn(metric, timing)
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line["view"], "post-list")
+        self.assertEqual(line["status"], 200)
+        self.assertIn(f'desc="{line["queries"]} queries"', timing)
+        self.assertGreater(line["queries"], 0)
+
+    @override_settings(BLOG_PROFILING_SAMPLE_RATE=0.0)
+    def test_unsampled_requests_are_untouched(self):
+        self.assertNotIn("Server-Timing", self.client.get("/api/posts/"))
+
+    @override_settings(BLOG_PROFILING=False)
+    def test_disabled_middleware_is_removed(self):
+        self.assertNotIn("Server-Timing", self.client.get("/api/posts/"))
+
+    def test_slow_requests_dump_cprofile(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(BLOG_PROFILING_CPROFILE_MS=1, BLOG_PROFILING_DIR=directory):
+                with self.assertLogs("blog.profiling", "INFO"):
+                    self.client.get("/api/posts/", {"page_size": 1})
+            self.assertEqual(len([name for name in os.listdir(directory) if name.endswith(".prof")]), 1)
+
+
+class RenderingTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="user")
+        self.post = Post.objects.create(title="Título", content="Línea\u2028separada", author=self.user)
+        Comment.objects.create(post=self.post, author=self.user, content="Comentario")
+        self.client.force_authenticate(user=self.user)
+
+    def test_fast_read_path_matches_drf(self):
+        # Como FeedViewSet: los comentarios embebidos en feed_comments
+        comments = Prefetch("comments", queryset=Comment.objects.select_related("author"), to_attr="feed_comments")
+        posts = list(Post.objects.select_related("author").prefetch_related(comments))
+        comments = list(Comment.objects.select_related("author"))
+        for serializer_class, rows in [(PostSerializer, posts), (FeedPostSerializer, posts), (CommentSerializer, comments)]:
+            with self.subTest(serializer=serializer_class.__name__):
+                serializer = serializer_class(rows, many=True)
+                generic = [serializers.Serializer.to_representation(serializer.child, row) for row in rows]
+                self.assertEqual(json.loads(json.dumps(serializer.data)), json.loads(json.dumps(generic)))
+
+    def test_renderer_output_matches_drf(self):
+        data = {"text": "a\u2028b ñ", "when": timezone.now(), "amount": Decimal("1.50"), "items": [1, None, True]}
+        fast = FastJSONRenderer().render(data)
+        self.assertEqual(json.loads(fast), json.loads(JSONRenderer().render(data)))
+        self.assertIn(b"\\u2028", fast)
+        self.assertEqual(FastJSONRenderer().render(data, "application/json; indent=2"),
+                         JSONRenderer().render(data, "application/json; indent=2"))
+
+    def test_invalid_json_body_is_rejected(self):
+        response = self.client.post("/api/posts/", "{bad", content_type="application/json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_browsable_api_disabled_without_debug(self):
+        response = self.client.get("/api/posts/", HTTP_ACCEPT="text/html,*/*;q=0.8")
+        self.assertEqual(response["Content-Type"], "application/json")
+
+
+@override_settings(BLOG_RESPONSE_CACHE_TIMEOUT=0)
+class SparseFieldsetTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="user")
+        self.post = Post.objects.create(title="Post", content="Cuerpo   largo\n" * 100, author=self.user)
+        Comment.objects.create(post=self.post, author=self.user, content="Comentario")
+        self.client.force_authenticate(user=self.user)
+
+    def get_with_post_sql(self, url, params=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # La consulta de la página (la de la huella del ETag no lleva ORDER BY)
+        post_sql = [q["sql"] for q in ctx.captured_queries if 'FROM "blog_post"' in q["sql"] and "ORDER BY" in q["sql"]]
+        return response, post_sql[0]
+
+    def test_excerpt_is_stored_on_save(self):
+        self.assertTrue(self.post.excerpt.startswith("Cuerpo largo Cuerpo largo"))
+        self.assertEqual(len(self.post.excerpt), EXCERPT_LENGTH)
+        self.post.content = "Nuevo"
+        self.post.save(update_fields=["content"])
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.excerpt, "Nuevo")
+
+    def test_list_returns_excerpt_without_reading_content(self):
+        response, sql = self.get_with_post_sql("/api/posts/")
+        row = response.data["results"][0]
+        self.assertNotIn("content", row)
+        self.assertEqual(row["excerpt"], self.post.excerpt)
+        self.assertEqual(row["author"]["username"], "user")
+        self.assertNotIn('"blog_post"."content"', sql)
+
+    def test_detail_keeps_full_content(self):
+        response = self.client.get(f"/api/posts/{self.post.id}/")
+        self.assertEqual(response.data["content"], self.post.content)
+
+    def test_fields_trims_payload_and_query(self):
+        response, sql = self.get_with_post_sql("/api/posts/", {"fields": "id,title"})
+        self.assertEqual(set(response.data["results"][0]), {"id", "title"})
+        self.assertNotIn("auth_user", sql)
+        self.assertNotIn('"blog_post"."excerpt"', sql)
+        # La paginación por cursor sigue funcionando con las columnas recortadas
+        self.assertIsNone(response.data["next"])
+
+    def test_fields_on_comments_and_detail(self):
+        response = self.client.get("/api/comments/", {"post": self.post.id, "fields": "id,content,author"})
+        self.assertEqual(set(response.data["results"][0]), {"id", "content", "author"})
+        response = self.client.get(f"/api/posts/{self.post.id}/", {"fields": "content"})
+        self.assertEqual(response.data, {"content": self.post.content})
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get("/api/posts/", {"fields": "id,password"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_empty_fields_are_rejected(self):
+        for fields in ["", ",", " , "]:
+            with self.subTest(fields=fields):
+                response = self.client.get("/api/posts/", {"fields": fields})
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertEqual(self.client.get(f"/api/posts/{self.post.id}/", {"fields": fields}).status_code, 400)
+
+    def test_writes_ignore_fields(self):
+        response = self.client.post("/api/posts/?fields=id", {"title": "T", "content": "C"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["excerpt"], "C")
+
+
+class ExportImportTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="autor")
+        self.reader = User.objects.create(username="lector")
+        self.post = Post.objects.create(title="Post", content="Contenido ñ", author=self.user)
+        self.comment = Comment.objects.create(post=self.post, author=self.reader, content="Comentario")
+        toggle_reaction(self.reader, ContentType.objects.get_for_model(Post), self.post.id, True)
+        toggle_reaction(self.user, ContentType.objects.get_for_model(Comment), self.comment.id, False)
+
+    def export(self):
+        out = StringIO()
+        call_command("export_blog", stdout=out, stderr=StringIO())
+        return out.getvalue()
+
+    def test_export_lines_in_dependency_order(self):
+        rows = [json.loads(line) for line in self.export().splitlines()]
+        self.assertEqual([row["type"] for row in rows], ["user", "user", "post", "comment", "reaction", "reaction"])
+        self.assertEqual(rows[4]["model"], "post")
+        self.assertEqual(rows[2]["content"], "Contenido ñ")
+
+    def test_import_roundtrip_remaps_ids(self):
+        dump = self.export()
+        with tempfile.NamedTemporaryFile("w", suffix=".ndjson") as f:
+            f.write(dump)
+            f.flush()
+            out = StringIO()
+            call_command("import_blog", f.name, stdout=out)
+        self.assertIn("Importados 0 usuarios nuevos, 1 posts, 1 comentarios y 2 reacciones", out.getvalue())
+        copy = Post.objects.exclude(id=self.post.id).get()
+        self.assertEqual((copy.title, copy.author, copy.created_at), ("Post", self.user, self.post.created_at))
+        self.assertEqual((copy.likes_count, copy.excerpt), (1, "Contenido ñ"))
+        copied_comment = copy.comments.get()
+        self.assertEqual(copied_comment.reactions.get().user, self.user)
+        # Los contadores importados cuadran con las reacciones importadas
+        recount = StringIO()
+        call_command("recount_reactions", dry_run=True, stdout=recount)
+        self.assertIn("posts: 0 desviados", recount.getvalue())
+
+    def test_orphan_reactions_are_skipped(self):
+        rows = [json.loads(line) for line in self.export().splitlines()]
+        for row in rows:
+            if row.get("model") == "comment":
+                row["object_id"] = 999999
+        importer = Importer()
+        counts = importer.run(json.dumps(row) for row in rows)
+        self.assertEqual((counts["reaction"], importer.skipped), (1, 1))
+
+    def test_streaming_endpoint_is_admin_only(self):
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.client.get("/api/export/").status_code, status.HTTP_403_FORBIDDEN)
+        admin = User.objects.create(username="admin", is_staff=True)
+        self.client.force_authenticate(user=admin)
+        response = self.client.get("/api/export/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        body = b"".join(response.streaming_content).decode()
+        self.assertEqual(body, self.export())
+
+
+class ReactionBatchTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="user")
+        self.other = User.objects.create(username="other")
+        self.posts = [Post.objects.create(title=f"P{i}", content="C", author=self.user) for i in range(3)]
+        self.comment = Comment.objects.create(post=self.posts[0], author=self.user, content="C")
+        self.client.force_authenticate(user=self.user)
+
+    def batch(self, *operations):
+        data = {"operations": [{"content_type": m, "object_id": i, "is_like": l} for m, i, l in operations]}
+        return self.client.post("/api/reactions/batch/", data, format="json")
+
+    def test_applies_toggles_in_order(self):
+        p0, p1, p2 = (post.id for post in self.posts)
+        toggle_reaction(self.user, ContentType.objects.get_for_model(Post), p1, True)
+        toggle_reaction(self.user, ContentType.objects.get_for_model(Post), p2, True)
+        toggle_reaction(self.other, ContentType.objects.get_for_model(Post), p0, True)
+        response = self.batch(
+            ("post", p0, True),            # crea
+            ("post", p1, False),           # cambia a dislike
+            ("post", p2, True),            # quita
+            ("comment", self.comment.id, True), ("comment", self.comment.id, True),  # crea y quita
+            ("post", p0, False),           # cambia el like recién creado
+            ("post", 999999, True),
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [r["action"] for r in response.data["results"]],
+            ["created", "updated", "deleted", "created", "deleted", "updated", "not_found"],
+        )
+        counts = {(c["content_type"], c["object_id"]): c for c in response.data["counts"]}
+        self.assertEqual(
+            {key: (c["likes_count"], c["dislikes_count"], c["my_reaction"]) for key, c in counts.items()},
+            {
+                ("post", p0): (1, 1, "dislike"),
+                ("post", p1): (0, 1, "dislike"),
+                ("post", p2): (0, 0, None),
+                ("comment", self.comment.id): (0, 0, None),
+            },
+        )
+        self.assertEqual(
+            set(Reaction.objects.filter(user=self.user).values_list("object_id", "is_like")),
+            {(p0, False), (p1, False)},
+        )
+        out = StringIO()
+        call_command("recount_reactions", dry_run=True, stdout=out)
+        self.assertIn("posts: 0 desviados", out.getvalue())
+
+    def test_query_count_does_not_scale_with_operations(self):
+        def run(n):
+            with CaptureQueriesContext(connection) as ctx:
+                self.batch(*[("post", post.id, True) for post in self.posts[:n]])
+            return len(ctx.captured_queries)
+        small = run(1)
+        Reaction.objects.all().delete()
+        Post.objects.update(likes_count=0)
+        self.assertEqual(run(3), small)
+
+    def test_validation(self):
+        self.assertEqual(self.batch().status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.batch(("user", 1, True)).status_code, status.HTTP_400_BAD_REQUEST)
+        # BLOG_REACTION_BATCH_MAX por defecto: 100
+        too_many = [("post", self.posts[0].id, True)] * 101
+        self.assertEqual(self.batch(*too_many).status_code, status.HTTP_400_BAD_REQUEST)
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.batch(("post", self.posts[0].id, True)).status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class RecordingBackend:
+    """Backend de eventos para tests: guarda los mensajes publicados."""
+    messages = []
+
+    def active(self):
+        return True
+
+    def publish(self, message):
+        self.messages.append(message)
+
+
+def decode_events(messages):
+    decoded = []
+    for message in messages:
+        event_line, data_line = message.decode().strip().split('\n')
+        decoded.append((event_line.removeprefix('event: '), json.loads(data_line.removeprefix('data: '))))
+    return decoded
+
+
+@override_settings(BLOG_EVENTS_BACKEND='blog.tests.RecordingBackend')
+class LiveEventsTests(APITestCase):
+    def setUp(self):
+        RecordingBackend.messages.clear()
+        self.user = User.objects.create(username="user")
+        self.post = Post.objects.create(title="T", content="C", author=self.user)
+
+    def test_writes_publish_deltas_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            comment = Comment.objects.create(post=self.post, author=self.user, content="Hola")
+            comment_id = comment.id
+            # Nada se publica antes del commit
+            self.assertEqual(RecordingBackend.messages, [])
+        with self.captureOnCommitCallbacks(execute=True):
+            toggle_reaction(self.user, ContentType.objects.get_for_model(Post), self.post.id, True)
+        with self.captureOnCommitCallbacks(execute=True):
+            comment.delete()
+
+        (created_type, created), (counts_type, counts), (deleted_type, deleted) = decode_events(RecordingBackend.messages)
+        self.assertEqual((created_type, created["action"], created["id"]), ("comment", "created", comment_id))
+        self.assertEqual(created["data"]["content"], "Hola")
+        self.assertNotIn("my_reaction", created["data"])
+        self.assertEqual(counts_type, "counts")
+        self.assertEqual(counts["items"], [
+            {"content_type": "post", "object_id": self.post.id, "likes_count": 1, "dislikes_count": 0},
+        ])
+        self.assertEqual((deleted_type, deleted), ("comment", {"action": "deleted", "id": comment_id, "post": self.post.id}))
+
+    def test_local_backend_only_publishes_with_subscribers(self):
+        with override_settings(BLOG_EVENTS_BACKEND='blog.events.LocalBackend'):
+            with self.captureOnCommitCallbacks() as callbacks:
+                events.publish('post', lambda: self.fail("no debe serializarse sin suscriptores"))
+        self.assertEqual(callbacks, [])
+
+    def test_stream_requires_asgi_and_valid_ticket(self):
+        self.client.force_authenticate(user=self.user)
+        # Bajo WSGI (cliente de tests síncrono) no hay flujo de eventos
+        self.assertEqual(self.client.post("/api/events/ticket/").status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.client.get("/api/events/").status_code, status.HTTP_204_NO_CONTENT)
+
+    async def test_stream_sends_published_messages(self):
+        client = AsyncClient()
+        self.assertEqual((await client.get("/api/events/", {"ticket": "falso"})).status_code, 401)
+
+        with override_settings(BLOG_EVENTS_BACKEND='blog.events.LocalBackend'):
+            response = await client.get("/api/events/", {"ticket": events.issue_ticket(self.user)})
+            self.assertEqual(response["Content-Type"], "text/event-stream")
+            chunks = aiter(response.streaming_content)
+            self.assertEqual(await anext(chunks), b"retry: 3000\n\n")
+            message = events.encode('post', {"action": "updated", "id": self.post.id})
+            threading.Thread(target=events.get_backend().publish, args=(message,)).start()
+            self.assertEqual(await anext(chunks), message)
+            await chunks.aclose()
+
+
+class EventBackendTests(TestCase):
+    async def test_local_subscription_asks_slow_clients_to_resync(self):
+        backend = events.LocalBackend()
+        with backend.subscribe() as subscription:
+            for i in range(events.QUEUE_SIZE + 1):
+                backend.publish(b"%d" % i)
+            self.assertEqual(await subscription.get(1), events.RESYNC)
+            self.assertIsNone(await subscription.get(0.01))
+        self.assertFalse(backend.active())
+
+    @override_settings(BLOG_EVENTS_POLL_INTERVAL=0.01)
+    async def test_cache_backend_delivers_in_order(self):
+        cache.clear()
+        backend = events.CacheBackend()
+        backend.publish(b"anterior")
+        with backend.subscribe() as subscription:
+            self.assertIsNone(await subscription.get(0.01))  # Empieza en la secuencia actual
+            backend.publish(b"uno")
+            backend.publish(b"dos")
+            self.assertEqual([await subscription.get(1), await subscription.get(1)], [b"uno", b"dos"])
+            # Eventos caducados antes de leerlos: se pide recargar
+            backend.publish(b"tres")
+            cache.delete(backend.message_key(cache.get(backend.sequence_key)))
+            self.assertEqual(await subscription.get(1), events.RESYNC)
+
+    async def test_cache_subscription_waits_for_half_published_event(self):
+        cache.clear()
+        backend = events.CacheBackend()
+        with backend.subscribe() as subscription:
+            await subscription._poll()
+            # Número reservado con incr pero evento aún sin guardar
+            cache.add(backend.sequence_key, 0, timeout=None)
+            sequence = cache.incr(backend.sequence_key)
+            await subscription._poll()
+            self.assertEqual(subscription.pending, [])
+            cache.set(backend.message_key(sequence), b"tarde")
+            await subscription._poll()
+            self.assertEqual(subscription.pending, [b"tarde"])
+
+    def test_backends_that_never_deliver_are_errors(self):
+        def ids(backend, mode):
+            with self.settings(BLOG_EVENTS_BACKEND=backend, BLOG_SERVER_MODE=mode):
+                return [error.id for error in check_events_backend(None)]
+        self.assertEqual(ids('blog.events.LocalBackend', 'asgi'), ["blog.E001"])
+        self.assertEqual(ids('blog.events.LocalBackend', 'wsgi'), [])
+        # La caché de los tests es locmem
+        self.assertEqual(ids('blog.events.CacheBackend', 'wsgi'), ["blog.E002"])
+
+
+class WarmupTests(TransactionTestCase):
+    def test_warm_up_primes_caches_without_holding_connections(self):
+        ContentType.objects.clear_cache()
+        # La base de datos en memoria de los tests no se cierra nunca: se comprueba la llamada
+        with mock.patch("django.db.connections.close_all") as close_all:
+            timings = warm_up()
+        self.assertEqual([name for name, _ in timings], [name for name, _ in PHASES])
+        close_all.assert_called_once_with()
+        # ContentType resuelto en memoria: ninguna consulta al pedirlo
+        with self.assertNumQueries(0):
+            ContentType.objects.get_for_model(Post)
+
+    def test_cached_template_loader_when_not_debug(self):
+        from django.template import engines
+        warm_up()
+        loader = engines['django'].engine.template_loaders[0]
+        self.assertIn("blog/html/index.html", loader.get_template_cache)
+
+
+class DeletionTests(APITestCase):
+    def setUp(self):
+        self.author = User.objects.create(username="author")
+        self.readers = [User.objects.create(username=f"reader{i}") for i in range(3)]
+        self.post = Post.objects.create(title="Borrable", content="Texto", author=self.author)
+        self.kept = Post.objects.create(title="Se queda", content="Texto", author=self.author)
+        self.kept_comment = Comment.objects.create(post=self.kept, author=self.author, content="Comentario que sigue")
+        self.add_comments(self.post, 2)
+        toggle_reaction(self.readers[0], ContentType.objects.get_for_model(Post), self.post.id, True)
+        toggle_reaction(self.readers[0], ContentType.objects.get_for_model(Post), self.kept.id, True)
+        toggle_reaction(self.readers[0], ContentType.objects.get_for_model(Comment), self.kept_comment.id, True)
+        self.client.force_authenticate(user=self.author)
+
+    def add_comments(self, post, count):
+        comment_ct = ContentType.objects.get_for_model(Comment)
+        for _ in range(count):
+            comment = Comment.objects.create(post=post, author=self.author, content="Comentario borrable")
+            for reader in self.readers:
+                toggle_reaction(reader, comment_ct, comment.id, False)
+
+    def delete_post(self, post):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.delete(f"/api/posts/{post.id}/")
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        return len(ctx.captured_queries)
+
+    def test_post_delete_removes_comments_and_reactions(self):
+        self.delete_post(self.post)
+        self.assertFalse(Post.objects.filter(pk=self.post.pk).exists())
+        self.assertEqual(list(Comment.objects.all()), [self.kept_comment])
+        self.assertEqual(Reaction.objects.count(), 2)  # Las del post y el comentario que siguen
+        self.assertEqual(self.client.get("/api/search/", {"q": "borrable"}).data["comments"], [])
+        out = StringIO()
+        call_command("purge_orphan_reactions", dry_run=True, stdout=out)
+        self.assertIn("comment: 0", out.getvalue())
+
+    def test_post_delete_query_count_does_not_scale(self):
+        small = self.delete_post(self.post)
+        big = Post.objects.create(title="Grande", content="Texto", author=self.author)
+        self.add_comments(big, 10)
+        self.assertEqual(self.delete_post(big), small)
+
+    def test_comment_delete_removes_its_reactions(self):
+        comment = Comment.objects.filter(post=self.post).first()
+        response = self.client.delete(f"/api/comments/{comment.id}/")
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Reaction.objects.filter(
+            content_type=ContentType.objects.get_for_model(Comment), object_id=comment.id,
+        ).exists())
+        self.assertEqual(Comment.objects.filter(post=self.post).count(), 1)
+
+    def test_raw_delete_api(self):
+        # blog/deletion.py usa QuerySet._raw_delete, privado: si Django lo cambia, esto debe fallar
+        self.assertEqual(list(inspect.signature(QuerySet._raw_delete).parameters), ["self", "using"])
+        receiver = mock.Mock()
+        post_delete.connect(receiver, sender=Comment)
+        self.addCleanup(post_delete.disconnect, receiver, sender=Comment)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(deletion._raw_delete(Comment.objects.filter(post=self.post)), 2)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        receiver.assert_not_called()
+        self.assertEqual(deletion._raw_delete(Comment.objects.filter(pk__in=[])), 0)
+
+    def test_delete_falls_back_without_raw_delete(self):
+        # Si Django retira QuerySet._raw_delete, el borrado sigue funcionando con QuerySet.delete()
+        with mock.patch.object(deletion, "HAS_RAW_DELETE", False):
+            self.delete_post(self.post)
+            comment = Comment.objects.get()
+            self.assertEqual(deletion.delete_comments([comment.pk]), {"reactions": 1, "comments": 1})
+        self.assertFalse(Post.objects.filter(pk=self.post.pk).exists())
+        self.assertFalse(Comment.objects.exists())
+        self.assertEqual(Reaction.objects.count(), 1)  # Solo la del post que sigue
+        self.assertEqual(self.client.get("/api/search/", {"q": "borrable"}).data["comments"], [])
+
+    def test_purge_orphan_reactions(self):
+        # Borrado sin pasar por el Collector: deja huérfanas las reacciones de los comentarios
+        deletion._raw_delete(Comment.objects.filter(post=self.post))
+        out = StringIO()
+        call_command("purge_orphan_reactions", dry_run=True, batch_size=1, stdout=out)
+        self.assertIn("comment: 6 reacciones huérfanas encontradas", out.getvalue())
+        self.assertEqual(Reaction.objects.count(), 9)
+        call_command("purge_orphan_reactions", batch_size=2, stdout=out)
+        self.assertIn("comment: 6 reacciones huérfanas borradas", out.getvalue())
+        self.assertEqual(Reaction.objects.count(), 3)
+
+
+class RankingTests(APITestCase):
+    def setUp(self):
+        self.author = User.objects.create(username="author")
+        self.readers = [User.objects.create(username=f"reader{i}") for i in range(3)]
+        self.post_ct = ContentType.objects.get_for_model(Post)
+        self.old = Post.objects.create(title="Antiguo y popular", content="Texto", author=self.author)
+        self.quiet = Post.objects.create(title="Tranquilo", content="Texto", author=self.author)
+        self.fresh = Post.objects.create(title="Nuevo", content="Texto", author=self.author)
+        Post.objects.filter(pk=self.old.pk).update(created_at=timezone.now() - timezone.timedelta(days=2))
+        Post.objects.filter(pk=self.quiet.pk).update(created_at=timezone.now() - timezone.timedelta(hours=1))
+        for reader in self.readers:
+            toggle_reaction(reader, self.post_ct, self.old.id, True)
+        toggle_reaction(self.readers[0], self.post_ct, self.fresh.id, True)
+
+    def titles(self, ordering, **params):
+        response = self.client.get("/api/posts/", {"ordering": ordering, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [post["title"] for post in response.data["results"]], response.data["next"]
+
+    def test_reactions_update_scores_in_place(self):
+        toggle_reaction(self.readers[1], self.post_ct, self.fresh.id, False)
+        self.fresh.refresh_from_db()
+        self.assertEqual(self.fresh.score, 0)
+        self.assertAlmostEqual(self.fresh.hot_score, hot_score(0, 0), places=3)
+        self.old.refresh_from_db()
+        self.assertEqual(self.old.score, 3)
+        self.assertAlmostEqual(self.old.hot_score, hot_score(3, 48), places=6)
+
+    def test_orderings(self):
+        self.assertEqual(self.titles("top")[0], ["Antiguo y popular", "Nuevo", "Tranquilo"])
+        # Sin actividad, manda la fecha: un like reciente pesa más que tres de hace dos días
+        self.assertEqual(self.titles("trending")[0], ["Nuevo", "Tranquilo", "Antiguo y popular"])
+        self.assertEqual(self.titles("newest")[0], ["Nuevo", "Tranquilo", "Antiguo y popular"])
+        response = self.client.get("/api/posts/", {"ordering": "-likes_count"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_cursor_keeps_the_ordering(self):
+        first, next_url = self.titles("top", page_size=2)
+        response = self.client.get(next_url)
+        self.assertEqual(first + [post["title"] for post in response.data["results"]],
+                         ["Antiguo y popular", "Nuevo", "Tranquilo"])
+
+    def test_cursor_walks_ties_without_offset(self):
+        # Veinte posts más con score 0: las páginas intermedias caen dentro del empate
+        Post.objects.bulk_create(Post(title=f"Empate {i}", content="Texto", author=self.author) for i in range(20))
+        expected = list(Post.objects.order_by("-score", "-id").values_list("id", flat=True))
+        pages, url = [], "/api/posts/?ordering=top&page_size=3"
+        while url:
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url)
+            self.assertFalse([q["sql"] for q in ctx.captured_queries if "OFFSET" in q["sql"]])
+            pages.append([post["id"] for post in response.data["results"]])
+            url = response.data["next"]
+        self.assertEqual(sum(pages, []), expected)
+        # Y hacia atrás desde la última página
+        response = self.client.get(response.data["previous"])
+        self.assertEqual([post["id"] for post in response.data["results"]], pages[-2])
+
+    def test_tampered_cursor_is_rejected(self):
+        response = self.client.get("/api/posts/", {"ordering": "top", "cursor": "cD0x"})  # p=1: una sola columna
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_comments_count_towards_post_trending(self):
+        comment = Comment.objects.create(post=self.quiet, author=self.author, content="Hola")
+        self.assertAlmostEqual(Post.objects.get(pk=self.quiet.pk).hot_score, hot_score(2, 1), places=4)
+        self.client.force_authenticate(user=self.author)
+        self.client.delete(f"/api/comments/{comment.id}/")
+        self.assertAlmostEqual(Post.objects.get(pk=self.quiet.pk).hot_score, hot_score(0, 1), places=4)
+
+    def test_comment_orderings(self):
+        first = Comment.objects.create(post=self.fresh, author=self.author, content="Primero")
+        Comment.objects.create(post=self.fresh, author=self.author, content="Segundo")
+        toggle_reaction(self.readers[0], ContentType.objects.get_for_model(Comment), first.id, False)
+        response = self.client.get("/api/comments/", {"post": self.fresh.id, "ordering": "top"})
+        self.assertEqual([c["content"] for c in response.data["results"]], ["Segundo", "Primero"])
+
+    def test_rerank_decays_recent_rows_only(self):
+        Post.objects.filter(pk=self.fresh.pk).update(created_at=timezone.now() - timezone.timedelta(hours=10))
+        old_hot = Post.objects.get(pk=self.old.pk).hot_score
+        etag = self.client.get("/api/posts/", {"ordering": "trending"})["ETag"]
+        newest_etag = self.client.get("/api/posts/")["ETag"]
+        feed_etag = self.client.get("/api/feed/")["ETag"]
+        out = StringIO()
+        call_command("rerank", hours=24, stdout=out)
+        self.assertIn("posts: 2 reordenados", out.getvalue())
+        self.assertAlmostEqual(Post.objects.get(pk=self.fresh.pk).hot_score, hot_score(1, 10), places=4)
+        self.assertEqual(Post.objects.get(pk=self.old.pk).hot_score, old_hot)
+        self.assertEqual(self.titles("trending")[0], ["Tranquilo", "Nuevo", "Antiguo y popular"])
+        self.assertNotEqual(self.client.get("/api/posts/", {"ordering": "trending"})["ETag"], etag)
+        # El resto de listados no depende de hot_score: siguen respondiendo 304
+        self.assertEqual(self.client.get("/api/posts/", HTTP_IF_NONE_MATCH=newest_etag).status_code, 304)
+        self.assertEqual(self.client.get("/api/feed/", HTTP_IF_NONE_MATCH=feed_etag).status_code, 304)
+
+
+class CommentStatsTests(APITestCase):
+    def setUp(self):
+        self.author = User.objects.create(username="author")
+        self.readers = [User.objects.create(username=f"reader{i}") for i in range(3)]
+        self.busy = Post.objects.create(title="Con comentarios", content="Texto", author=self.author)
+        self.empty = Post.objects.create(title="Sin comentarios", content="Texto", author=self.author)
+        post_ct, comment_ct = ContentType.objects.get_for_model(Post), ContentType.objects.get_for_model(Comment)
+        # Reacciones al post y a los comentarios: con JOIN y Count se multiplicarían con los comentarios
+        for reader in self.readers:
+            toggle_reaction(reader, post_ct, self.busy.id, True)
+        for author in [self.readers[0], self.readers[1], self.readers[0]]:
+            comment = Comment.objects.create(post=self.busy, author=author, content="Comentario")
+            for reader in self.readers:
+                toggle_reaction(reader, comment_ct, comment.id, False)
+        self.last_comment = comment
+
+    def get_posts(self, params=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get("/api/posts/", params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {post["title"]: post for post in response.data["results"]}, ctx.captured_queries
+
+    def test_counts_in_a_single_query(self):
+        posts, queries = self.get_posts()
+        busy, empty = posts["Con comentarios"], posts["Sin comentarios"]
+        self.assertEqual((busy["comments_count"], busy["commenters_count"], busy["likes_count"]), (3, 2, 3))
+        self.assertEqual(busy["last_comment_at"], self.last_comment.created_at.isoformat().replace("+00:00", "Z"))
+        self.assertEqual((empty["comments_count"], empty["last_comment_at"], empty["commenters_count"]), (0, None, 0))
+        # Las estadísticas van dentro de la consulta de la página: ninguna consulta propia a los comentarios
+        comment_sql = [q["sql"] for q in queries if "blog_comment" in q["sql"]]
+        self.assertEqual(len(comment_sql), 1)
+        self.assertTrue(comment_sql[0].startswith('SELECT "blog_post"."id"'))
+
+    def test_subqueries_use_indexes(self):
+        plan = Post.objects.annotate(**comment_stats()).explain()
+        if connection.vendor == "sqlite":
+            self.assertNotRegex(plan, r"SCAN (U\d|blog_comment)")
+            self.assertIn("COVERING INDEX", plan)
+
+    def test_sparse_fields_skip_the_subqueries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get("/api/posts/", {"fields": "id,title"})
+        self.assertFalse([q for q in ctx.captured_queries if "blog_comment" in q["sql"]])
+
+    def test_new_comment_changes_posts_etag(self):
+        response = self.client.get("/api/posts/")
+        Comment.objects.create(post=self.empty, author=self.author, content="Primero")
+        response = self.client.get("/api/posts/", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        posts = {post["title"]: post for post in response.data["results"]}
+        self.assertEqual(posts["Sin comentarios"]["comments_count"], 1)
+
+    def test_feed_and_detail_include_counts(self):
+        feed = self.client.get("/api/feed/").data["results"]
+        self.assertEqual({post["title"]: post["comments_count"] for post in feed}, {"Con comentarios": 3, "Sin comentarios": 0})
+        self.assertEqual(self.client.get(f"/api/posts/{self.busy.id}/").data["commenters_count"], 2)
+
+
+class IndexPageTests(TestCase):
     def test_index_returns_html(self):
         response = self.client.get("/")
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, "Blog Privado")
 
+    def test_index_embeds_content_type_ids(self):
+        response = self.client.get("/")
+        ct = ContentType.objects.get_for_model(Post)
+        self.assertContains(response, '<script id="content-types" type="application/json">')
+        self.assertContains(response, f'"post": {ct.id}')
+
+
+class ContentTypeByNameTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="user")
+        self.post = Post.objects.create(title="Post", content="Content", author=self.user)
+        self.client.force_authenticate(user=self.user)
+
+    def test_react_by_model_name_without_content_type_queries(self):
+        ContentType.objects.get_for_model(Post)  # Caché caliente, como en un proceso ya arrancado
+        data = {"content_type": "post", "object_id": self.post.id, "is_like": True}
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post("/api/reactions/", data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["content_type"], ContentType.objects.get_for_model(Post).id)
+        self.assertFalse(any("django_content_type" in q["sql"] for q in ctx.captured_queries))
+
+    def test_unsupported_content_types_are_rejected(self):
+        user_ct = ContentType.objects.get_for_model(User)
+        for value in ["user", user_ct.id, 999999]:
+            with self.subTest(value=value):
+                data = {"content_type": value, "object_id": self.post.id, "is_like": True}
+                response = self.client.post("/api/reactions/", data, format="json")
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_legacy_endpoint_is_cacheable(self):
+        response = self.client.get("/api/content-types/")
+        self.assertEqual(response.data["comment"], ContentType.objects.get_for_model(Comment).id)
+        self.assertIn("max-age=86400", response["Cache-Control"])
+
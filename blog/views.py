@@ -1,14 +1,31 @@
 # blog/views.py
 
-from rest_framework import viewsets, permissions, status
+from rest_framework import viewsets, mixins, permissions, status
 from rest_framework.response import Response
-from rest_framework.decorators import action, api_view
-from .models import Post, Comment, Reaction
-from .serializers import PostSerializer, CommentSerializer, ReactionSerializer
+from rest_framework.decorators import action, api_view, permission_classes
+from .models import Post, Comment, Reaction, reaction_content_type_ids
+from .serializers import PostSerializer, CommentSerializer, ReactionSerializer, FeedPostSerializer, ReactionBatchSerializer
+from .pagination import CommentCursorPagination, PostCursorPagination, ReactionCursorPagination
+from .counters import comment_stats
+from .conditional import ConditionalGetMixin, fingerprint
+from .cache import CachedListMixin, get_stats
+from .reactions import DELETED, UPDATED, batch_toggle_reactions, delete_reaction, toggle_reaction
+from .search import search as search_objects, search_terms
+from .export import export_lines
+from .deletion import delete_comments, delete_posts
+from . import events as live_events
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from django.contrib.contenttypes.models import ContentType
-from django.db.models import Count, Q
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import require_GET
+from django.views.generic import TemplateView
+from django.db.models import Prefetch
+from django.utils.dateparse import parse_datetime
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import PermissionDenied, ValidationError
 
 # Permisos personalizados
 class IsAuthorOrReadOnly(permissions.BasePermission):
@@ -31,65 +48,212 @@ class IsReactionOwnerOrReadOnly(permissions.BasePermission):
             return True
         return obj.user == request.user
 
-class PostViewSet(viewsets.ModelViewSet):
+class SparseFieldsetMixin:
+    """
+    ?fields=a,b,c en las lecturas: el serializador devuelve solo esos campos y la consulta
+    solo lee sus columnas (QuerySet.only). `default_list_fields` fija los campos del listado
+    cuando no se pide ninguno.
+    """
+    default_list_fields = None
+
+    def get_sparse_fields(self):
+        if not hasattr(self, '_sparse_fields'):
+            self._sparse_fields = None
+            raw = self.request.query_params.get('fields')
+            if self.request.method in permissions.SAFE_METHODS:
+                if raw is not None:
+                    names = [name.strip() for name in raw.split(',') if name.strip()]
+                    if not names:
+                        # ?fields= o ?fields=, devolverían objetos vacíos
+                        raise ValidationError({'fields': 'Indica al menos un campo.'})
+                    unknown = [name for name in names if name not in self.get_serializer_class().Meta.fields]
+                    if unknown:
+                        raise ValidationError({'fields': f"Campos desconocidos: {', '.join(unknown)}."})
+                    self._sparse_fields = names
+                elif self.action == 'list':
+                    self._sparse_fields = self.default_list_fields
+        return self._sparse_fields
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.get_sparse_fields() is None:
+            return queryset
+        only = self.get_serializer().get_only_fields()
+        if only is None:
+            return queryset
+        # Las columnas del orden de paginación también hacen falta para construir el cursor
+        ordering = self.paginator.get_ordering(self.request, queryset, self) if self.paginator else ()
+        only.update(name.lstrip('-') for name in ordering)
+        queryset = queryset.select_related(None)
+        related = {name.split('__')[0] for name in only if '__' in name}
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset.only(*only)
+
+
+class PostViewSet(SparseFieldsetMixin, ConditionalGetMixin, CachedListMixin, viewsets.ModelViewSet):
     queryset = Post.objects.all()
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly]
+    pagination_class = PostCursorPagination
+    # El listado devuelve el extracto y nunca lee el cuerpo completo (pídelo con ?fields=...,content)
+    default_list_fields = [name for name in PostSerializer.Meta.fields if name != 'content']
 
     def get_queryset(self):
-        return Post.objects.annotate(
-            likes_count=Count('reactions', filter=Q(reactions__is_like=True)),
-            dislikes_count=Count('reactions', filter=Q(reactions__is_like=False)),
-        )
+        # Los contadores de reacciones están desnormalizados en la propia fila; los de comentarios
+        # son subconsultas correlacionadas, solo las de los campos pedidos.
+        # Sin huella aparte de los comentarios en el ETag: cada alta o baja marca reactions_updated_at
+        # de su post (blog/ranking.py), que ya forma parte de la huella de los posts
+        return Post.objects.select_related('author').annotate(**comment_stats(self.get_sparse_fields()))
+
+    def get_cache_scopes(self):
+        return ['posts']
 
     def perform_create(self, serializer):
         # Asigna automáticamente el usuario autenticado como autor del post
         serializer.save(author=self.request.user)
 
-class CommentViewSet(viewsets.ModelViewSet):
+    def perform_destroy(self, instance):
+        # Por conjuntos: comentarios y reacciones en unas pocas sentencias (ver blog/deletion.py)
+        delete_posts([instance.pk])
+
+def _int_param(params, name):
+    """Lee un parámetro entero de la query string; None si no viene."""
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValidationError({name: 'Debe ser un número entero.'})
+
+
+def _datetime_param(params, name):
+    """Lee un parámetro de fecha ISO 8601 de la query string; None si no viene."""
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValidationError({name: 'Debe ser una fecha ISO 8601 válida.'})
+    return parsed
+
+
+class CommentViewSet(SparseFieldsetMixin, ConditionalGetMixin, CachedListMixin, viewsets.ModelViewSet):
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly]
+    pagination_class = CommentCursorPagination
 
     def get_queryset(self):
-        return Comment.objects.annotate(
-            likes_count=Count('reactions', filter=Q(reactions__is_like=True)),
-            dislikes_count=Count('reactions', filter=Q(reactions__is_like=False)),
-        )
+        queryset = Comment.objects.select_related('author')
+        if self.action == 'list':
+            queryset = self.filter_comments(queryset)
+        return queryset
+
+    def get_cache_scopes(self):
+        # Solo se cachean los listados de comentarios de un post concreto
+        post_id = _int_param(self.request.query_params, 'post')
+        return None if post_id is None else [f'comments:{post_id}']
+
+    def filter_comments(self, queryset):
+        """
+        Filtra por ?post=, ?author=, ?created_after= y ?created_before=.
+        El índice (post, created_at) cubre el caso habitual: los comentarios de un post en orden.
+        """
+        params = self.request.query_params
+        post_id = _int_param(params, 'post')
+        if post_id is not None:
+            queryset = queryset.filter(post_id=post_id)
+        author_id = _int_param(params, 'author')
+        if author_id is not None:
+            queryset = queryset.filter(author_id=author_id)
+        created_after = _datetime_param(params, 'created_after')
+        if created_after is not None:
+            queryset = queryset.filter(created_at__gte=created_after)
+        created_before = _datetime_param(params, 'created_before')
+        if created_before is not None:
+            queryset = queryset.filter(created_at__lt=created_before)
+        return queryset
 
     def perform_create(self, serializer):
         # Asigna automáticamente el usuario autenticado como autor del comentario
         serializer.save(author=self.request.user)
 
+    def perform_destroy(self, instance):
+        delete_comments([instance.pk])
+
+class FeedViewSet(ConditionalGetMixin, CachedListMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Página de posts con sus primeros comentarios embebidos en una sola petición.
+    El coste es un número fijo de consultas por página: posts + autores, y comentarios + autores.
+    La Prefetch recortada se resuelve con una función de ventana (ROW_NUMBER por post): un post con
+    miles de comentarios no agranda la consulta ni la respuesta; el resto se pide por comments_next.
+    """
+    serializer_class = FeedPostSerializer
+    pagination_class = PostCursorPagination
+
+    def get_queryset(self):
+        comments = Comment.objects.select_related('author').order_by('created_at', 'id')[:settings.BLOG_FEED_COMMENTS]
+        return (
+            Post.objects
+            .select_related('author')
+            .annotate(**comment_stats())
+            .prefetch_related(Prefetch('comments', queryset=comments, to_attr='feed_comments'))
+        )
+
+    def get_cache_scopes(self):
+        return ['posts', 'comments']
+
+    def get_list_fingerprints(self):
+        # El feed embebe comentarios: cualquier cambio en ellos también invalida la página
+        return [fingerprint(Post.objects.all()), fingerprint(Comment.objects.all())]
+
 class ReactionViewSet(viewsets.ModelViewSet):
-    queryset = Reaction.objects.all()
+    queryset = Reaction.objects.select_related('user')
     serializer_class = ReactionSerializer
     permission_classes = [permissions.IsAuthenticated, IsReactionOwnerOrReadOnly] # Solo usuarios autenticados pueden crear reacciones
+    pagination_class = ReactionCursorPagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action != 'list':
+            return queryset
+        # El listado devuelve solo las reacciones del usuario; ?scope=all, las de todos (solo staff)
+        if self.request.query_params.get('scope') != 'all':
+            return queryset.filter(user=self.request.user)
+        if not self.request.user.is_staff:
+            raise PermissionDenied('Solo el personal puede listar las reacciones de todos los usuarios.')
+        return queryset
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    def perform_destroy(self, instance):
+        # Descuenta solo si la borra esta petición (ver blog/reactions.py)
+        delete_reaction(instance)
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        content_type = serializer.validated_data['content_type']
-        object_id = serializer.validated_data['object_id']
-        is_like = serializer.validated_data['is_like']
-
-        reaction, created = Reaction.objects.get_or_create(
-            user=request.user,
-            content_type=content_type,
-            object_id=object_id,
-            defaults={'is_like': is_like}
+        # Crear, cambiar o quitar la reacción es una sola operación atómica (ver blog/reactions.py)
+        action, reaction = toggle_reaction(
+            request.user,
+            serializer.validated_data['content_type'],
+            serializer.validated_data['object_id'],
+            serializer.validated_data['is_like'],
         )
 
-        if not created:
-            if reaction.is_like == is_like:
-                reaction.delete()
-                return Response(status=status.HTTP_204_NO_CONTENT)
-            Reaction.objects.filter(pk=reaction.pk).update(is_like=is_like)
-            reaction.refresh_from_db()
+        if action == DELETED:
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        if action == UPDATED:
             updated_serializer = self.get_serializer(reaction)
             return Response(updated_serializer.data, status=status.HTTP_200_OK)
 
@@ -97,6 +261,59 @@ class ReactionViewSet(viewsets.ModelViewSet):
         headers = self.get_success_headers(created_serializer.data)
         return Response(created_serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """
+        Aplica en orden una lista de toggles ({"operations": [{content_type, object_id, is_like}, ...]})
+        en una sola transacción. Devuelve el resultado de cada operación ('created', 'updated',
+        'deleted' o 'not_found') y los contadores actualizados de los objetos afectados.
+        """
+        serializer = ReactionBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        operations = serializer.validated_data['operations']
+
+        # Una consulta por modelo para descartar los objetos que no existen
+        requested = {}
+        for item in operations:
+            requested.setdefault(item['content_type'], set()).add(item['object_id'])
+        existing = {
+            content_type: set(content_type.model_class().objects.filter(pk__in=ids).values_list('pk', flat=True))
+            for content_type, ids in requested.items()
+        }
+        valid = [item for item in operations if item['object_id'] in existing[item['content_type']]]
+
+        actions, states = [], {}
+        if valid:
+            actions, states = batch_toggle_reactions(
+                request.user, [(item['content_type'], item['object_id'], item['is_like']) for item in valid],
+            )
+
+        names = {content_type_id: name for name, content_type_id in reaction_content_type_ids().items()}
+        pending_actions = iter(actions)
+        results = []
+        for item in operations:
+            found = item['object_id'] in existing[item['content_type']]
+            results.append({
+                'content_type': names[item['content_type'].id],
+                'object_id': item['object_id'],
+                'is_like': item['is_like'],
+                'action': next(pending_actions) if found else 'not_found',
+            })
+
+        counts = []
+        for content_type, ids in existing.items():
+            rows = content_type.model_class().objects.filter(pk__in=ids).values('pk', 'likes_count', 'dislikes_count')
+            for row in rows:
+                final = states.get((content_type.id, row['pk']))
+                counts.append({
+                    'content_type': names[content_type.id],
+                    'object_id': row['pk'],
+                    'likes_count': row['likes_count'],
+                    'dislikes_count': row['dislikes_count'],
+                    'my_reaction': None if final is None else ('like' if final else 'dislike'),
+                })
+        return Response({'results': results, 'counts': counts})
+
     # Solo permitimos eliminar reacciones, no actualizarlas directamente por PUT/PATCH
     # La lógica de "cambiar tipo de reacción" se maneja en el `create`
     def update(self, request, *args, **kwargs):
@@ -106,11 +323,100 @@ class ReactionViewSet(viewsets.ModelViewSet):
         return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED) # Método no permitido
 
 
+@cache_control(public=True, max_age=86400)
 @api_view(['GET'])
 def content_type_ids(request):
-    """Retorna los IDs de ContentType para Post y Comment."""
-    data = {
-        'post': ContentType.objects.get_for_model(Post).id,
-        'comment': ContentType.objects.get_for_model(Comment).id,
-    }
+    """
+    Retorna los IDs de ContentType para Post y Comment.
+    Se mantiene por compatibilidad: la SPA los recibe embebidos en index.html y la API
+    de reacciones acepta el nombre del modelo. Los IDs no cambian, así que se cachean un día.
+    """
+    return Response(reaction_content_type_ids())
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def cache_stats(request):
+    """Aciertos y fallos de la caché de respuestas de los listados (con RESPONSE_CACHE_STATS=1)."""
+    return Response(get_stats())
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def export(request):
+    """Volcado NDJSON del blog completo, generado en streaming (ver blog/export.py)."""
+    response = StreamingHttpResponse(export_lines(), content_type='application/x-ndjson')
+    response['Content-Disposition'] = 'attachment; filename="blog.ndjson"'
+    return response
+
+
+@api_view(['GET'])
+def search(request):
+    """
+    Búsqueda de texto completo: /api/search/?q=texto[&limit=N]. Devuelve posts y comentarios
+    ordenados por relevancia, cada uno con su `rank` (null si el motor no lo calcula).
+    """
+    query = request.query_params.get('q', '')
+    if not search_terms(query):
+        raise ValidationError({'q': 'Indica al menos una palabra a buscar.'})
+    limit = _int_param(request.query_params, 'limit') or settings.BLOG_PAGE_SIZE
+    limit = max(1, min(limit, settings.BLOG_MAX_PAGE_SIZE))
+    context = {'request': request}
+    data = {'query': query}
+    for key, model, serializer_class in [('posts', Post, PostSerializer), ('comments', Comment, CommentSerializer)]:
+        results = search_objects(model, query, limit)
+        rows = serializer_class(results, many=True, context=context).data
+        for row, obj in zip(rows, results):
+            row['rank'] = obj.search_rank
+        data[key] = rows
     return Response(data)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def logout(request):
+    """Revoca el token de la petición; la señal de borrado lo descarta también de la caché."""
+    if isinstance(request.auth, Token):
+        request.auth.delete()
+    return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def events_ticket(request):
+    """Ticket de corta duración para abrir el flujo de eventos: /api/events/?ticket=..."""
+    if not isinstance(request._request, ASGIRequest):
+        # Sin flujo de eventos bajo WSGI (ver events)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    return Response({'ticket': live_events.issue_ticket(request.user)})
+
+
+@require_GET
+async def events(request):
+    """
+    Flujo Server-Sent Events con los cambios del blog (ver blog/events.py). Vista asíncrona:
+    bajo ASGI cada conexión abierta es solo una corrutina en espera.
+    """
+    if not isinstance(request, ASGIRequest):
+        # Bajo WSGI cada conexión ocuparía un hilo indefinidamente. 204 indica a EventSource que no reconecte
+        return HttpResponse(status=204)
+    user_id = live_events.read_ticket(request.GET.get('ticket', ''))
+    is_active = user_id is not None and await User.objects.filter(pk=user_id, is_active=True).aexists()
+    if not is_active:
+        return HttpResponse(status=401)
+
+    subscription = live_events.get_backend().subscribe()
+    response = StreamingHttpResponse(live_events.stream(subscription), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Sin búfer en nginx y proxies compatibles
+    return response
+
+
+class IndexView(TemplateView):
+    """Sirve la SPA con los IDs de ContentType embebidos, para ahorrar una petición al arrancar."""
+    template_name = 'blog/html/index.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['content_types'] = reaction_content_type_ids()
+        return context
@@ -0,0 +1,184 @@
+# blog/warmup.py
+
+"""
+Calentamiento del proceso antes de aceptar peticiones, para que la primera petición tras un
+arranque en frío (Cloud Run escala a cero) no pague la carga perezosa de Django y DRF.
+
+Con preload_app, gunicorn lo ejecuta una vez en el proceso maestro antes de abrir el puerto
+(ver gunicorn.conf.py) y los workers heredan todo al hacer fork: URLconf resuelta, campos de
+los serializadores, caché de ContentType y plantillas compiladas por el loader cacheado.
+
+Solo importa la biblioteca estándar a nivel de módulo: el comando startup_profile lo usa para
+medir también la importación y la configuración de Django.
+"""
+
+import logging
+import time
+
+logger = logging.getLogger('blog.warmup')
+
+# Rutas que se resuelven para poblar el URLconf y las rutas del router de DRF
+WARM_PATHS = ['/', '/api/posts/', '/api/posts/1/', '/api/comments/', '/api/feed/', '/api/reactions/batch/']
+WARM_TEMPLATES = ['blog/html/index.html']
+
+
+def warm_urls():
+    from django.urls import get_resolver, resolve
+
+    for path in WARM_PATHS:
+        resolve(path)
+    # reverse() construye sus tablas aparte, la primera vez que se usa
+    get_resolver().reverse_dict
+
+
+def warm_content_types():
+    from django.db import DatabaseError
+
+    from .models import reaction_content_type_ids
+
+    try:
+        reaction_content_type_ids()
+    except DatabaseError as exc:
+        # Sin base de datos todavía: se resolverán en la primera petición
+        logger.warning('ContentType sin precargar: %s', exc)
+
+
+def warm_serializers():
+    from django.contrib.auth.models import User
+    from django.utils import timezone
+
+    from .models import Post, Comment
+    from .renderers import FastJSONRenderer
+    from .serializers import CommentSerializer, FeedPostSerializer, PostSerializer
+
+    # Objetos sin guardar, sin my_reaction (depende del usuario): no tocan la base de datos
+    now = timezone.now()
+    author = User(pk=1, username='warmup')
+    post = Post(pk=1, title='', content='', author=author, created_at=now, updated_at=now)
+    post.comments_count, post.last_comment_at, post.commenters_count = 0, None, 0  # Anotaciones de la vista
+    comment = Comment(pk=1, post=post, author=author, content='', created_at=now)
+    for serializer_class, obj in [(PostSerializer, post), (CommentSerializer, comment)]:
+        fields = [name for name in serializer_class.Meta.fields if name != 'my_reaction']
+        FastJSONRenderer().render(serializer_class([obj], many=True, fields=fields).data)
+    FeedPostSerializer().fields
+
+
+def warm_templates():
+    from django.template.loader import get_template
+
+    for name in WARM_TEMPLATES:
+        get_template(name)
+
+
+PHASES = [
+    ('urls', warm_urls),
+    ('content_types', warm_content_types),
+    ('serializers', warm_serializers),
+    ('templates', warm_templates),
+]
+
+
+def warm_up():
+    """
+    Ejecuta las fases de calentamiento y devuelve la duración de cada una, en segundos.
+    Cierra después las conexiones a la base de datos: un socket abierto antes del fork
+    acabaría compartido entre workers.
+    """
+    from django.db import connections
+
+    timings = []
+    for name, phase in PHASES:
+        start = time.perf_counter()
+        phase()
+        timings.append((name, time.perf_counter() - start))
+    connections.close_all()
+    return timings
+
+
+def _first_request_wsgi(application, path, host):
+    import io
+
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '', 'SERVER_NAME': host,
+        'SERVER_PORT': '80', 'HTTP_HOST': host, 'wsgi.input': io.BytesIO(), 'wsgi.url_scheme': 'http',
+    }
+    statuses = []
+    response = application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+    b''.join(response)
+    response.close()
+    return int(statuses[0].split()[0])
+
+
+def _first_request_asgi(application, path, host):
+    import asyncio
+
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+        'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+        'headers': [(b'host', host.encode())], 'server': (host, 80), 'client': ('127.0.0.1', 0),
+    }
+    statuses = []
+
+    async def run():
+        # Tras la respuesta completa se anuncia la desconexión, que es lo que espera Django para terminar
+        done = asyncio.Event()
+        messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            await done.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                statuses.append(message['status'])
+            elif not message.get('more_body'):
+                done.set()
+
+        await application(scope, receive, send)
+
+    asyncio.run(run())
+    return statuses[0]
+
+
+def profile_startup(server_mode, warm):
+    """
+    Arranca Django desde cero en este proceso (recién creado) midiendo cada fase, calienta si
+    `warm` y sirve una primera y una segunda petición. Escribe el resultado en JSON por stdout.
+    Lo ejecuta el comando startup_profile en un intérprete nuevo.
+    """
+    import json
+    import sys
+
+    timings = []
+
+    def measure(name, function):
+        start = time.perf_counter()
+        result = function()
+        timings.append((name, time.perf_counter() - start))
+        return result
+
+    measure('import django', lambda: __import__('django.core.handlers.wsgi'))
+    from django.conf import settings
+    measure('settings', lambda: settings.INSTALLED_APPS)
+    if server_mode == 'asgi':
+        from django.core.asgi import get_asgi_application as get_application
+        serve = _first_request_asgi
+    else:
+        from django.core.wsgi import get_wsgi_application as get_application
+        serve = _first_request_wsgi
+    # get_*_application() llama a django.setup() (aplicaciones y modelos) y carga los middleware
+    application = measure('application', get_application)
+    if warm:
+        for name, seconds in warm_up():
+            timings.append((f'warmup: {name}', seconds))
+
+    # Proceso desechable: se admite un host propio para no depender de la configuración de ALLOWED_HOSTS
+    host = 'startup-profile'
+    settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, host]
+    statuses = {}
+    for label in ('first', 'second'):
+        for path in ('/', '/api/posts/'):
+            statuses[f'{label} {path}'] = measure(f'{label} request {path}', lambda: serve(application, path, host))
+    json.dump({'timings': timings, 'statuses': statuses}, sys.stdout)
@@ -1,6 +1,5 @@
+#!/bin/sh
 # my_private_blog/entrypoint.sh
-
-#!/bin/bash
 set -e
 
 # Variable de entorno de Cloud Run que tendrá el nombre de conexión
@@ -11,6 +10,34 @@ set -e
 # o si no estás en un ambiente de Cloud Run.
 CLOUD_SQL_CONNECTION_NAME="${CLOUD_SQL_CONNECTION_NAME}"
 
+# Segundos máximos de espera a que la base de datos acepte conexiones (DB_WAIT_TIMEOUT)
+DB_WAIT_TIMEOUT="${DB_WAIT_TIMEOUT:-30}"
+
+# Espera activa, cada 0,1 s, a que la base de datos acepte conexiones: en lugar de una pausa fija,
+# se arranca en cuanto está lista. $1 es "tcp HOST PUERTO" o "socket RUTA".
+# POSIX sh (el contenedor puede ejecutarlo con dash): el puerto se prueba con Python.
+db_ready() {
+    case "$1" in
+        tcp) python -c 'import socket, sys; socket.create_connection((sys.argv[1], int(sys.argv[2])), 1).close()' \
+                 "$2" "$3" 2>/dev/null ;;
+        socket) [ -S "$2" ] ;;
+        *) return 1 ;;
+    esac
+}
+
+wait_for_db() {
+    # Sin $SECONDS de bash: reloj en segundos de date (cada prueba tarda lo que arranca Python)
+    started=$(date +%s)
+    until db_ready "$@"; do
+        if [ $(($(date +%s) - started)) -ge "$DB_WAIT_TIMEOUT" ]; then
+            echo "La base de datos no responde tras ${DB_WAIT_TIMEOUT}s; se arranca igualmente."
+            return 0
+        fi
+        sleep 0.1
+    done
+    echo "Base de datos lista en $(($(date +%s) - started))s."
+}
+
 # Solo inicia el proxy si la variable CLOUD_SQL_CONNECTION_NAME está presente
 # y si no estamos en DEBUG (o si la DATABASE_URL no es SQLite).
 # Aquí estamos asumiendo que si CLOUD_SQL_CONNECTION_NAME existe, queremos usar Cloud SQL.
@@ -18,12 +45,22 @@ if [ -n "$CLOUD_SQL_CONNECTION_NAME" ]; then
     echo "Iniciando Cloud SQL Proxy para $CLOUD_SQL_CONNECTION_NAME..."
     # El proxy escucha en 127.0.0.1:5432 por defecto
     /usr/local/bin/cloud_sql_proxy -instances="${CLOUD_SQL_CONNECTION_NAME}"=tcp:5432 &
-    # Pequeña pausa para dar tiempo al proxy a iniciar
-    sleep 3
+    wait_for_db tcp 127.0.0.1 5432
     echo "Cloud SQL Proxy iniciado."
+else
+    # Conector integrado de Cloud Run: DATABASE_URL=postgres://...?host=/cloudsql/<instancia>
+    case "$DATABASE_URL" in
+        *host=/cloudsql/*)
+            socket_dir="${DATABASE_URL##*host=}"
+            wait_for_db socket "${socket_dir%%&*}/.s.PGSQL.5432"
+            ;;
+    esac
 fi
 
 # Ejecutar Gunicorn
-# Asegúrate de que Gunicorn escuche en el puerto definido por la variable de entorno PORT de Cloud Run
-echo "Iniciando Gunicorn en puerto $PORT..."
-exec gunicorn --bind "0.0.0.0:${PORT}" private_blog_project.wsgi:application
+# gunicorn.conf.py escucha en el puerto PORT de Cloud Run y elige workers e hilos según
+# SERVER_MODE (wsgi para la API; asgi solo para el servicio de /api/events/) y las CPUs
+# disponibles. Con GUNICORN_PRELOAD=1 (por defecto) carga y calienta la aplicación antes de abrir
+# el puerto, así que la primera petición ya la encuentra lista.
+echo "Iniciando Gunicorn (${SERVER_MODE:-wsgi}) en puerto $PORT..."
+exec gunicorn --config /app/gunicorn.conf.py
@@ -0,0 +1,68 @@
+# my_private_blog/gunicorn.conf.py
+
+# Perfil de producción de Gunicorn. Todo se puede ajustar con variables de entorno:
+#   SERVER_MODE             'wsgi' (workers gthread, la API y la SPA) o 'asgi' (workers uvicorn sobre
+#                           asgi.py, solo para el flujo de eventos /api/events/)
+#   GUNICORN_WORKERS        número de procesos (por defecto derivado de las CPUs)
+#   GUNICORN_THREADS        hilos por proceso en modo wsgi (por defecto 4)
+#   GUNICORN_TIMEOUT        segundos antes de reiniciar un worker bloqueado (por defecto 30)
+#   GUNICORN_MAX_REQUESTS   reinicia cada worker tras N peticiones (0 lo desactiva)
+#   GUNICORN_PRELOAD        '1' (por defecto) carga y calienta la aplicación en el maestro antes del fork
+
+import multiprocessing
+import os
+
+SERVER_MODE = os.environ.get('SERVER_MODE', 'wsgi')
+CPUS = multiprocessing.cpu_count()
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+
+if SERVER_MODE == 'asgi':
+    # Solo para /api/events/ (SSE): las conexiones abiertas son corrutinas en espera. Las vistas de
+    # lectura de DRF son síncronas y bajo ASGI corren en el pool de hilos de asgiref, sin conexiones
+    # persistentes y más lentas que con gthread, así que se despliega como un servicio aparte y el
+    # proxy le envía solo el prefijo /api/events/ (flujo y ticket); el resto va al servicio wsgi.
+    wsgi_app = 'private_blog_project.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+    workers = int(os.environ.get('GUNICORN_WORKERS', CPUS + 1))
+else:
+    # Las peticiones pasan casi todo el tiempo esperando a PostgreSQL: con hilos un mismo proceso
+    # atiende varias a la vez sin multiplicar la memoria
+    wsgi_app = 'private_blog_project.wsgi:application'
+    worker_class = 'gthread'
+    workers = int(os.environ.get('GUNICORN_WORKERS', CPUS * 2 + 1))
+    threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = timeout
+keepalive = 5
+
+# Reciclar workers de vez en cuando acota las fugas de memoria; el jitter evita que reinicien a la vez
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = max_requests // 10
+
+accesslog = '-'
+errorlog = '-'
+
+# Arranque en frío: con preload la aplicación se importa una sola vez en el maestro y se calienta
+# (ver blog/warmup.py) antes de abrir el puerto; los workers la heredan ya lista al hacer fork.
+# Sin preload, cada worker se calienta por su cuenta antes de atender peticiones.
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+
+
+def _warm_up(log):
+    from blog.warmup import warm_up
+
+    timings = warm_up()
+    log.info('Calentamiento: %s', ', '.join(f'{name} {seconds * 1000:.0f} ms' for name, seconds in timings))
+
+
+def on_starting(server):
+    # Con preload_app la aplicación ya está cargada aquí, y aún no se ha abierto el puerto
+    if preload_app:
+        _warm_up(server.log)
+
+
+def post_worker_init(worker):
+    if not preload_app:
+        _warm_up(worker.log)
@@ -21,19 +21,25 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from blog import views as blog_views # Importa las vistas de tu app 'blog'
 from rest_framework.authtoken.views import obtain_auth_token # Para la autenticación por token
-from django.views.generic import TemplateView
 
 # Crea un router para tus ViewSets
 router = DefaultRouter()
 router.register(r'posts', blog_views.PostViewSet)
 router.register(r'comments', blog_views.CommentViewSet)
 router.register(r'reactions', blog_views.ReactionViewSet)
+router.register(r'feed', blog_views.FeedViewSet, basename='feed')
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/content-types/', blog_views.content_type_ids),
+    path('api/cache-stats/', blog_views.cache_stats),
+    path('api/search/', blog_views.search),
+    path('api/export/', blog_views.export), # Volcado NDJSON para administradores
+    path('api/events/', blog_views.events), # Cambios en vivo (Server-Sent Events, solo bajo ASGI)
+    path('api/events/ticket/', blog_views.events_ticket),
     path('api/', include(router.urls)), # Incluye las URLs generadas por el router de DRF
     path('api-auth/', include('rest_framework.urls')), # Opcional: URLs para el login/logout en el navegador de DRF
     path('api/token-auth/', obtain_auth_token), # Endpoint para obtener un token de autenticación
-    path('', TemplateView.as_view(template_name='blog/html/index.html')), # ¡Nueva ruta para servir tu index.html!
+    path('api/logout/', blog_views.logout), # Revoca el token actual
+    path('', blog_views.IndexView.as_view()), # Sirve index.html con los IDs de ContentType embebidos
 ]